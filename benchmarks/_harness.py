@@ -0,0 +1,285 @@
+"""Shared helpers for the offline benchmarks.
+
+The benchmarks run against the same ``tests/stubs`` tree as the unit tests, so
+they need no browser, network or API keys. Only the framework's own work
+(prompt building, message management, parsing, bookkeeping) is measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field, is_dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTS_DIR = os.path.join(ROOT_DIR, "tests")
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+
+def install_stubs() -> None:
+    """Put the test stubs and ``src`` on ``sys.path`` exactly like the tests do."""
+
+    if TESTS_DIR not in sys.path:
+        sys.path.insert(0, TESTS_DIR)
+    # ``conftest`` inserts the stub and source directories and registers the
+    # provider shims; importing it outside pytest has the same effect.
+    importlib.import_module("conftest")
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing (and optionally memory) statistics for one benchmark case."""
+
+    name: str
+    iterations: int
+    mean_ms: float
+    median_ms: float
+    min_ms: float
+    p95_ms: float
+    stdev_ms: float
+    params: Dict[str, Any] = field(default_factory=dict)
+    peak_memory_kb: Optional[float] = None
+    rss_mb: Optional[float] = None
+
+
+def summarise(
+    name: str, samples: List[float], params: Dict[str, Any]
+) -> BenchmarkResult:
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return BenchmarkResult(
+        name=name,
+        iterations=len(samples),
+        mean_ms=statistics.fmean(samples),
+        median_ms=statistics.median(samples),
+        min_ms=ordered[0],
+        p95_ms=ordered[p95_index],
+        stdev_ms=statistics.pstdev(samples),
+        params=params,
+    )
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    iterations: int,
+    warmup: int = 1,
+    params: Optional[Dict[str, Any]] = None,
+    track_memory: bool = False,
+    setup: Optional[Callable[[], Any]] = None,
+    divisor: int = 1,
+) -> BenchmarkResult:
+    """Time ``func`` over ``iterations`` calls after ``warmup`` untimed calls.
+
+    When ``setup`` is given its return value is passed to ``func`` and its own
+    cost is not timed. ``divisor`` reports the time per unit of work, e.g. per
+    agent step when ``func`` runs a whole task.
+    """
+
+    def call() -> Any:
+        return func(setup()) if setup is not None else func()
+
+    for _ in range(warmup):
+        call()
+
+    samples: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            argument = setup() if setup is not None else None
+            started = time.perf_counter()
+            if setup is not None:
+                func(argument)
+            else:
+                func()
+            samples.append((time.perf_counter() - started) * 1000 / divisor)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    result = summarise(name, samples, params or {})
+    if track_memory:
+        # Measured in a separate call: tracemalloc slows allocation down a lot.
+        argument = setup() if setup is not None else None
+        tracemalloc.start()
+        try:
+            if setup is not None:
+                func(argument)
+            else:
+                func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result.peak_memory_kb = peak / 1024
+    return result
+
+
+def write_report(
+    benchmark: str,
+    results: Iterable[Any],
+    output: Optional[str],
+    **extra: Any,
+) -> Dict[str, Any]:
+    """Write results (dataclasses or dicts) as JSON and return the report."""
+
+    report = {
+        "benchmark": benchmark,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [
+            asdict(result) if is_dataclass(result) else result for result in results
+        ],
+        **extra,
+    }
+    path = output or os.path.join(RESULTS_DIR, f"{benchmark}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    return report
+
+
+def compare_to_baseline(
+    report: Dict[str, Any], baseline_path: str, max_regression: float
+) -> List[str]:
+    """Return a message for every case whose median regressed past the limit."""
+
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+
+    def key(entry: Dict[str, Any]) -> str:
+        return json.dumps([entry["name"], entry.get("params", {})], sort_keys=True)
+
+    previous = {key(entry): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in report["results"]:
+        old = previous.get(key(entry))
+        if not old or old["median_ms"] <= 0:
+            continue
+        ratio = entry["median_ms"] / old["median_ms"]
+        if ratio > 1 + max_regression:
+            regressions.append(
+                f"{entry['name']} {entry.get('params', {})}: "
+                f"{old['median_ms']:.3f} ms -> {entry['median_ms']:.3f} ms "
+                f"(+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def build_arg_parser(description: str, default_iterations: int) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--iterations", type=int, default=default_iterations)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="Where to write the JSON report.")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against.")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown of the median before failing (0.25 = 25%%).",
+    )
+    return parser
+
+
+def finish(
+    benchmark: str, results: List[BenchmarkResult], args: argparse.Namespace
+) -> int:
+    """Print, persist and optionally check results; return the exit code."""
+
+    for result in results:
+        memory = (
+            f"  peak {result.peak_memory_kb:,.0f} KiB"
+            if result.peak_memory_kb is not None
+            else ""
+        )
+        if result.rss_mb is not None:
+            memory += f"  rss {result.rss_mb:,.0f} MB"
+        print(
+            f"{result.name:<36} {json.dumps(result.params):<40} "
+            f"median {result.median_ms:9.3f} ms  p95 {result.p95_ms:9.3f} ms{memory}"
+        )
+
+    report = write_report(benchmark, results, args.output)
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.max_regression)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+    return 0
+
+
+class SyntheticElementTree:
+    """Element tree exposing the ``clickable_elements_to_string`` API.
+
+    The rendering mirrors browser-use's format so the string building cost
+    scales the same way as on a real page with ``size`` elements.
+    """
+
+    _TAGS = ("a", "button", "input", "div", "span", "li", "select", "textarea")
+
+    def __init__(self, size: int, interactive_ratio: float = 0.6):
+        self.size = size
+        interactive_every = max(1, int(round(1 / interactive_ratio)))
+        self.elements = [
+            {
+                "index": index if index % interactive_every == 0 else None,
+                "tag": self._TAGS[index % len(self._TAGS)],
+                "attributes": {
+                    "title": f"Element {index}",
+                    "type": "text" if index % 3 == 0 else "button",
+                    "name": f"field_{index}",
+                    "role": "button",
+                    "aria-label": f"Action number {index}",
+                    "placeholder": "Search" if index % 5 == 0 else "",
+                },
+                "text": f"Item {index} of the synthetic page listing",
+            }
+            for index in range(size)
+        ]
+
+    def clickable_elements_to_string(self, include_attributes: Optional[List[str]] = None) -> str:
+        lines = []
+        for element in self.elements:
+            attributes = ""
+            if include_attributes:
+                attributes = " ".join(
+                    f'{name}="{element["attributes"][name]}"'
+                    for name in include_attributes
+                    if element["attributes"].get(name)
+                )
+            index = element["index"]
+            prefix = f"{index}[:]" if index is not None else "_[:]"
+            tag = element["tag"]
+            lines.append(f"{prefix}<{tag} {attributes}>{element['text']}</{tag}>")
+        return "\n".join(lines)
+
+
+def make_tabs(count: int) -> List[Dict[str, Any]]:
+    return [
+        {"page_id": index, "url": f"https://example.com/page/{index}", "title": f"Tab {index}"}
+        for index in range(count)
+    ]
+
+
+def make_browser_state(elements: int, tabs: int = 3, screenshot: Optional[str] = None):
+    from browser_use.browser.views import BrowserState
+
+    return BrowserState(
+        url="https://example.com/listing",
+        title="Synthetic listing",
+        tabs=make_tabs(tabs),
+        element_tree=SyntheticElementTree(elements),
+        screenshot=screenshot,
+    )
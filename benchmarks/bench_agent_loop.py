@@ -0,0 +1,266 @@
+"""Per-step overhead of the agent loop, driven by a scripted LLM and browser.
+
+Run with ``python -m benchmarks.bench_agent_loop``. Results are written as
+JSON to ``benchmarks/results/agent_loop.json`` (or ``--output``); pass an
+earlier report via ``--baseline`` to fail on regressions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import logging
+import sys
+from typing import Any, Dict, List, Optional
+
+from benchmarks._harness import (
+    BenchmarkResult,
+    build_arg_parser,
+    finish,
+    install_stubs,
+    make_browser_state,
+    measure,
+)
+
+install_stubs()
+
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from mcp_browser_use.agent.custom_agent import CustomAgent, build_action_models  # noqa: E402
+from mcp_browser_use.agent.custom_massage_manager import CustomMassageManager  # noqa: E402
+from mcp_browser_use.agent.custom_prompts import (  # noqa: E402
+    CustomAgentMessagePrompt,
+    CustomSystemPrompt,
+)
+from mcp_browser_use.agent.custom_views import CustomAgentStepInfo  # noqa: E402
+from mcp_browser_use.controller.custom_controller import CustomController  # noqa: E402
+
+INCLUDE_ATTRIBUTES = ["title", "type", "name", "role", "aria-label", "placeholder"]
+
+
+def step_payload(step: int, actions: int = 3, done: bool = False) -> Dict[str, Any]:
+    """Model output as a provider would return it before validation."""
+
+    action: List[Dict[str, Any]]
+    if done:
+        action = [{"done": {"text": f"Finished after {step} steps"}}]
+    else:
+        action = [
+            {"copy_to_clipboard": {"text": f"value {step}-{index}"}}
+            for index in range(actions)
+        ]
+    return {
+        "current_state": {
+            "prev_action_evaluation": "Success - the page shows the expected listing.",
+            "important_contents": f"Listing item {step} has price {step * 3} EUR.",
+            "completed_contents": f"1. Opened listing. 2. Read {step} items.",
+            "thought": "Continue reading the listing until every item is recorded.",
+            "summary": f"Record item {step}.",
+        },
+        "action": action,
+    }
+
+
+class _ScriptedStructuredLLM:
+    def __init__(self, llm: "ScriptedLLM", schema: Any):
+        self._llm = llm
+        self._schema = schema
+
+    async def ainvoke(self, input_messages: Any, **kwargs: Any) -> Dict[str, Any]:
+        if self._llm.latency:
+            await asyncio.sleep(self._llm.latency)
+        payload = self._llm.next_payload()
+        return {
+            "parsed": self._schema.model_validate(payload),
+            "raw": AIMessage(content=json.dumps(payload)),
+        }
+
+
+class ScriptedLLM(BaseChatModel):
+    """Returns a fixed sequence of model outputs, ending with ``done``.
+
+    ``latency`` (seconds) simulates the provider's response time.
+    """
+
+    def __init__(self, steps: int, actions_per_step: int = 3, latency: float = 0.0):
+        self._payloads = [
+            step_payload(step, actions_per_step) for step in range(1, steps)
+        ] + [step_payload(steps, done=True)]
+        self._position = 0
+        self.latency = latency
+
+    def next_payload(self) -> Dict[str, Any]:
+        payload = self._payloads[min(self._position, len(self._payloads) - 1)]
+        self._position += 1
+        return payload
+
+    def with_structured_output(self, schema: Any, include_raw: bool = False) -> Any:
+        return _ScriptedStructuredLLM(self, schema)
+
+
+class FakeBrowser:
+    """Serves the same synthetic page for every ``get_state`` call."""
+
+    def __init__(self, elements: int, tabs: int = 3, screenshot: Optional[str] = None):
+        self._state = make_browser_state(elements, tabs, screenshot)
+
+    async def get_state(self, use_vision: bool = True) -> Any:
+        return copy.copy(self._state)
+
+    async def close(self) -> None:
+        return None
+
+
+def make_agent(steps: int, elements: int) -> CustomAgent:
+    return CustomAgent(
+        task="Record every item of the synthetic listing",
+        llm=ScriptedLLM(steps),
+        browser_session=FakeBrowser(elements),
+        controller=CustomController(),
+        use_vision=False,
+        max_actions_per_step=5,
+        system_prompt_class=CustomSystemPrompt,
+    )
+
+
+def make_step_info(step: int = 1) -> CustomAgentStepInfo:
+    return CustomAgentStepInfo(
+        step_number=step,
+        max_steps=30,
+        task="Record every item of the synthetic listing",
+        add_infos="",
+        memory="Listing item 1 has price 3 EUR.\n" * 5,
+        task_progress="1. Opened listing.",
+    )
+
+
+def run(iterations: int, warmup: int, steps: int, elements: int) -> List[BenchmarkResult]:
+    loop = asyncio.new_event_loop()
+    params = {"steps": steps, "elements": elements}
+    results: List[BenchmarkResult] = []
+
+    try:
+        results.append(
+            measure(
+                "execute_agent_task_per_step",
+                lambda agent: loop.run_until_complete(
+                    agent.execute_agent_task(max_steps=steps + 1)
+                ),
+                iterations,
+                warmup,
+                params,
+                setup=lambda: make_agent(steps, elements),
+                divisor=steps,
+            )
+        )
+        results.append(
+            measure(
+                "agent_construction",
+                lambda: make_agent(steps, elements),
+                iterations,
+                warmup,
+                params,
+            )
+        )
+
+        state = make_browser_state(elements)
+        results.append(
+            measure(
+                "prompt_building",
+                lambda: CustomAgentMessagePrompt(
+                    state,
+                    include_attributes=INCLUDE_ATTRIBUTES,
+                    step_info=make_step_info(),
+                ).get_user_message(),
+                iterations,
+                warmup,
+                params,
+            )
+        )
+
+        controller = CustomController()
+        _, agent_output = build_action_models(controller)
+        model_output = agent_output.model_validate(step_payload(1))
+
+        def make_manager() -> CustomMassageManager:
+            return CustomMassageManager(
+                llm=ScriptedLLM(steps),
+                task="Record every item of the synthetic listing",
+                action_descriptions=controller.registry.get_prompt_description(),
+                system_prompt_class=CustomSystemPrompt,
+                include_attributes=INCLUDE_ATTRIBUTES,
+            )
+
+        def manage_messages(manager: CustomMassageManager) -> None:
+            manager.add_state_message(state, None, make_step_info())
+            manager.get_messages()
+            manager._remove_last_state_message()
+            manager.add_model_output(model_output)
+
+        results.append(
+            measure(
+                "message_management",
+                manage_messages,
+                iterations,
+                warmup,
+                params,
+                setup=make_manager,
+            )
+        )
+
+        payload = step_payload(1, actions=5)
+        results.append(
+            measure(
+                "output_parsing",
+                lambda: agent_output.model_validate(payload),
+                iterations,
+                warmup,
+                {"actions": 5},
+            )
+        )
+
+        def bookkeeping(agent: CustomAgent) -> None:
+            step_info = make_step_info()
+            for _ in range(steps):
+                agent.update_step_info(model_output, step_info)
+                agent._make_history_item(model_output, state, [])
+
+        results.append(
+            measure(
+                "history_bookkeeping_per_step",
+                bookkeeping,
+                iterations,
+                warmup,
+                params,
+                setup=lambda: make_agent(steps, elements),
+                divisor=steps,
+            )
+        )
+    finally:
+        loop.close()
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_arg_parser(__doc__.splitlines()[0], default_iterations=50)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--elements", type=int, default=300)
+    parser.add_argument(
+        "--with-logging",
+        action="store_true",
+        help="Keep the agent's INFO logging on; it is disabled by default.",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.with_logging:
+        logging.disable(logging.CRITICAL)
+
+    results = run(args.iterations, args.warmup, args.steps, args.elements)
+    return finish("agent_loop", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
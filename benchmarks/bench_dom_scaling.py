@@ -0,0 +1,134 @@
+"""Prompt construction cost as the page's element tree and tab list grow.
+
+Run with ``python -m benchmarks.bench_dom_scaling``. Times and peak memory of
+``CustomAgentMessagePrompt.get_user_message`` and
+``CustomMassageManager.add_state_message`` are recorded for every size and
+written to ``benchmarks/results/dom_scaling.json`` (or ``--output``).
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from typing import List, Optional, Sequence
+
+from benchmarks._harness import (
+    BenchmarkResult,
+    build_arg_parser,
+    finish,
+    install_stubs,
+    make_browser_state,
+    measure,
+)
+
+install_stubs()
+
+from mcp_browser_use.agent.custom_massage_manager import CustomMassageManager  # noqa: E402
+from mcp_browser_use.agent.custom_prompts import (  # noqa: E402
+    CustomAgentMessagePrompt,
+    CustomSystemPrompt,
+)
+from mcp_browser_use.agent.custom_views import CustomAgentStepInfo  # noqa: E402
+
+from benchmarks.bench_agent_loop import INCLUDE_ATTRIBUTES, ScriptedLLM  # noqa: E402
+
+DEFAULT_SIZES = (100, 1_000, 5_000, 10_000, 50_000)
+DEFAULT_TAB_COUNTS = (3, 200)
+
+
+def _step_info() -> CustomAgentStepInfo:
+    return CustomAgentStepInfo(
+        step_number=4,
+        max_steps=30,
+        task="Collect every product on the page",
+        add_infos="",
+        memory="",
+        task_progress="",
+    )
+
+
+def _iterations_for(size: int, iterations: int) -> int:
+    # Keep the largest trees affordable; their variance is low anyway.
+    return max(3, min(iterations, iterations * 1_000 // max(size, 1)))
+
+
+def run(
+    iterations: int,
+    warmup: int,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    tab_counts: Sequence[int] = DEFAULT_TAB_COUNTS,
+) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+
+    for tabs in tab_counts:
+        for size in sizes:
+            state = make_browser_state(size, tabs)
+            params = {"elements": size, "tabs": tabs}
+            runs = _iterations_for(size, iterations)
+
+            results.append(
+                measure(
+                    "get_user_message",
+                    lambda: CustomAgentMessagePrompt(
+                        state,
+                        include_attributes=INCLUDE_ATTRIBUTES,
+                        step_info=_step_info(),
+                    ).get_user_message(),
+                    runs,
+                    warmup,
+                    params,
+                    track_memory=True,
+                )
+            )
+
+            def make_manager() -> CustomMassageManager:
+                return CustomMassageManager(
+                    llm=ScriptedLLM(1),
+                    task="Collect every product on the page",
+                    action_descriptions="",
+                    system_prompt_class=CustomSystemPrompt,
+                    include_attributes=INCLUDE_ATTRIBUTES,
+                )
+
+            results.append(
+                measure(
+                    "add_state_message",
+                    lambda manager: manager.add_state_message(state, None, _step_info()),
+                    runs,
+                    warmup,
+                    params,
+                    track_memory=True,
+                    setup=make_manager,
+                )
+            )
+
+    return results
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_arg_parser(__doc__.splitlines()[0], default_iterations=20)
+    parser.add_argument(
+        "--sizes",
+        type=_int_list,
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated element counts.",
+    )
+    parser.add_argument(
+        "--tabs",
+        type=_int_list,
+        default=list(DEFAULT_TAB_COUNTS),
+        help="Comma-separated tab counts.",
+    )
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    results = run(args.iterations, args.warmup, args.sizes, args.tabs)
+    return finish("dom_scaling", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""Start-up time, memory and page-load time of the Chromium launch presets.
+
+Run with ``python -m benchmarks.bench_launch_presets``. Unlike the other
+benchmarks this one needs a real Chromium: pass ``--chrome`` or set
+``CHROME_PATH``, otherwise common install locations are searched. Every
+iteration launches a fresh browser with a preset's flags, viewport and scale
+factor, then loads a few fixture pages served from localhost. It reports the
+time until DevTools answers, the load time of each page and the RSS of the
+browser's process tree after the pages have loaded. The results are written
+to ``benchmarks/results/launch_presets.json`` (or ``--output``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import glob
+import http.server
+import json
+import logging
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import websockets
+
+from benchmarks._harness import (
+    BenchmarkResult,
+    build_arg_parser,
+    finish,
+    install_stubs,
+    summarise,
+)
+
+install_stubs()
+
+from mcp_browser_use.browser.browser_manager import (  # noqa: E402
+    LAUNCH_PRESETS,
+    LaunchPreset,
+)
+from mcp_browser_use.browser.memory_watchdog import process_tree, rss_bytes  # noqa: E402
+
+# Baseline without any preset: Chromium's defaults plus headless.
+PRESETS: Dict[str, LaunchPreset] = {"default": LaunchPreset(), **LAUNCH_PRESETS}
+
+_CHROME_NAMES = ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable", "chrome")
+_CHROME_GLOBS = (
+    "~/.cache/ms-playwright/chromium-*/chrome-linux*/chrome",
+    "~/.cache/puppeteer/chrome/*/chrome-linux*/chrome",
+)
+
+_ARTICLE_HTML = """<!doctype html>
+<html><head><title>Article</title>
+<style>body {{ font: 16px/1.5 serif; max-width: 42em; margin: auto; }}</style>
+</head><body><h1>Fixture article</h1>{paragraphs}</body></html>
+"""
+
+_APP_HTML = """<!doctype html>
+<html><head><title>App</title></head><body>
+<main id="app">Loading...</main>
+<script>
+  fetch("data.json").then((response) => response.json()).then((rows) => {
+    const table = document.createElement("table");
+    for (const row of rows) {
+      const tr = table.insertRow();
+      for (const value of row) tr.insertCell().textContent = value;
+    }
+    const app = document.getElementById("app");
+    app.replaceChildren(table);
+  });
+</script>
+</body></html>
+"""
+
+_GALLERY_HTML = """<!doctype html>
+<html><head><title>Gallery</title>
+<style>img {{ width: 160px; height: 120px; margin: 4px; }}</style>
+</head><body>{images}</body></html>
+"""
+
+_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="320" height="240">'
+    '<rect width="320" height="240" fill="hsl({hue}, 60%, 50%)"/>'
+    '<circle cx="160" cy="120" r="{radius}" fill="white"/></svg>'
+)
+
+FIXTURE_PAGES = ("article.html", "app.html", "gallery.html")
+
+
+def write_fixtures(directory: str) -> None:
+    """Write the fixture pages and their assets to ``directory``."""
+
+    paragraphs = "".join(
+        f"<h2>Section {index}</h2><p>{'Lorem ipsum dolor sit amet. ' * 40}</p>"
+        for index in range(200)
+    )
+    rows = [[f"row {row}", row, row * 3.5, "ok" if row % 2 else "pending"] for row in range(2000)]
+    images = "".join(f'<img src="img/{index}.svg" alt="Image {index}">' for index in range(60))
+
+    os.makedirs(os.path.join(directory, "img"), exist_ok=True)
+    files = {
+        "article.html": _ARTICLE_HTML.format(paragraphs=paragraphs),
+        "app.html": _APP_HTML,
+        "data.json": json.dumps(rows),
+        "gallery.html": _GALLERY_HTML.format(images=images),
+    }
+    for index in range(60):
+        files[f"img/{index}.svg"] = _SVG.format(hue=index * 6, radius=20 + index)
+    for name, content in files.items():
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as handle:
+            handle.write(content)
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return None
+
+
+@contextlib.contextmanager
+def serve_fixtures() -> Iterator[str]:
+    """Serve freshly written fixture pages; yields the base URL."""
+
+    with tempfile.TemporaryDirectory(prefix="mcp-fixtures-") as directory:
+        write_fixtures(directory)
+        handler = functools.partial(_QuietHandler, directory=directory)
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_address[1]}/"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def find_chrome() -> Optional[str]:
+    """``CHROME_PATH``, a Chromium on ``PATH`` or a Playwright/Puppeteer download."""
+
+    if os.getenv("CHROME_PATH"):
+        return os.environ["CHROME_PATH"]
+    for name in _CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    for pattern in _CHROME_GLOBS:
+        matches = sorted(glob.glob(os.path.expanduser(pattern)))
+        if matches:
+            return matches[-1]
+    return None
+
+
+class _CdpConnection:
+    """Just enough of the DevTools protocol to navigate one page."""
+
+    def __init__(self, websocket: Any):
+        self._websocket = websocket
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._events: Dict[str, asyncio.Queue] = {}
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        async for raw in self._websocket:
+            message = json.loads(raw)
+            if "id" in message:
+                future = self._pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    if "error" in message:
+                        future.set_exception(RuntimeError(message["error"].get("message")))
+                    else:
+                        future.set_result(message.get("result", {}))
+            elif message.get("method") in self._events:
+                self._events[message["method"]].put_nowait(message.get("params", {}))
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        await self._websocket.send(
+            json.dumps({"id": self._next_id, "method": method, "params": params or {}})
+        )
+        return await future
+
+    def events(self, method: str) -> asyncio.Queue:
+        return self._events.setdefault(method, asyncio.Queue())
+
+    async def close(self) -> None:
+        self._reader.cancel()
+        await self._websocket.close()
+
+
+def _http_json(port: int, path: str) -> Any:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=1) as response:
+        return json.load(response)
+
+
+def _launch_args(
+    chrome: str, preset: LaunchPreset, profile_dir: str, headless: bool
+) -> List[str]:
+    args = [chrome, f"--user-data-dir={profile_dir}", "--remote-debugging-port=0"]
+    args.extend(preset.args)
+    if headless or preset.headless:
+        args.append("--headless=new")
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        # Chromium refuses to sandbox itself as root, e.g. in containers.
+        args.append("--no-sandbox")
+    args.append("about:blank")
+    return args
+
+
+async def _wait_for_devtools(process: subprocess.Popen, profile_dir: str, timeout: float) -> int:
+    """Port of the browser's DevTools endpoint once it answers requests."""
+
+    port_file = os.path.join(profile_dir, "DevToolsActivePort")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Chromium exited with code {process.returncode}")
+        try:
+            with open(port_file, encoding="utf-8") as handle:
+                port = int(handle.readline())
+            await asyncio.to_thread(_http_json, port, "/json/version")
+            return port
+        except (OSError, ValueError):
+            await asyncio.sleep(0.01)
+    raise TimeoutError(f"Chromium did not open DevTools within {timeout:.0f}s")
+
+
+async def _load(cdp: _CdpConnection, url: str, timeout: float) -> float:
+    loaded = cdp.events("Page.loadEventFired")
+    while not loaded.empty():
+        loaded.get_nowait()
+    started = time.perf_counter()
+    await cdp.send("Page.navigate", {"url": url})
+    await asyncio.wait_for(loaded.get(), timeout)
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_once(
+    chrome: str, preset: LaunchPreset, base_url: str, headless: bool, timeout: float
+) -> Tuple[float, Dict[str, float], int]:
+    """Launch, load every fixture page and shut down one browser.
+
+    :return: Start-up time in ms, load time per page in ms, and RSS in bytes.
+    """
+
+    profile_dir = tempfile.mkdtemp(prefix="mcp-preset-")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        _launch_args(chrome, preset, profile_dir, headless),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    cdp: Optional[_CdpConnection] = None
+    try:
+        port = await _wait_for_devtools(process, profile_dir, timeout)
+        startup_ms = (time.perf_counter() - started) * 1000
+
+        targets = await asyncio.to_thread(_http_json, port, "/json/list")
+        page = next(target for target in targets if target.get("type") == "page")
+        cdp = _CdpConnection(
+            await websockets.connect(page["webSocketDebuggerUrl"], max_size=None)
+        )
+        await cdp.send("Page.enable")
+        if preset.viewport is not None:
+            await cdp.send(
+                "Emulation.setDeviceMetricsOverride",
+                {
+                    "width": preset.viewport[0],
+                    "height": preset.viewport[1],
+                    "deviceScaleFactor": preset.device_scale_factor or 0,
+                    "mobile": False,
+                },
+            )
+        load_ms = {name: await _load(cdp, base_url + name, timeout) for name in FIXTURE_PAGES}
+        rss = rss_bytes(process_tree(process.pid))
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(cdp.send("Browser.close"), 2)
+        return startup_ms, load_ms, rss
+    finally:
+        if cdp is not None:
+            await cdp.close()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+async def run(
+    chrome: str,
+    presets: Sequence[str],
+    iterations: int,
+    warmup: int,
+    headless: bool,
+    timeout: float,
+) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+    with serve_fixtures() as base_url:
+        for name in presets:
+            preset = PRESETS[name]
+            startups: List[float] = []
+            loads: Dict[str, List[float]] = {page: [] for page in FIXTURE_PAGES}
+            rss_mb: List[float] = []
+            for iteration in range(warmup + iterations):
+                startup_ms, load_ms, rss = await run_once(
+                    chrome, preset, base_url, headless, timeout
+                )
+                if iteration < warmup:
+                    continue
+                startups.append(startup_ms)
+                rss_mb.append(rss / (1024 * 1024))
+                for page, value in load_ms.items():
+                    loads[page].append(value)
+
+            launch = summarise("launch", startups, {"preset": name})
+            launch.rss_mb = statistics.median(rss_mb)
+            results.append(launch)
+            results.extend(
+                summarise("page_load", samples, {"preset": name, "page": page})
+                for page, samples in loads.items()
+            )
+    return results
+
+
+def _preset_list(value: str) -> List[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in PRESETS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown preset(s): {', '.join(unknown)}")
+    return names
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_arg_parser(__doc__.splitlines()[0], default_iterations=5)
+    parser.add_argument(
+        "--presets",
+        type=_preset_list,
+        default=list(PRESETS),
+        help=f"Comma-separated presets out of {', '.join(PRESETS)}.",
+    )
+    parser.add_argument("--chrome", help="Chromium executable (default: CHROME_PATH or a search).")
+    parser.add_argument(
+        "--headful",
+        action="store_true",
+        help="Let presets without a headless setting open a window.",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds per launch or load.")
+    args = parser.parse_args(argv)
+
+    chrome = args.chrome or find_chrome()
+    if not chrome:
+        print("No Chromium found; pass --chrome or set CHROME_PATH.", file=sys.stderr)
+        return 2
+
+    logging.disable(logging.CRITICAL)
+    results = asyncio.run(
+        run(chrome, args.presets, args.iterations, args.warmup, not args.headful, args.timeout)
+    )
+    return finish("launch_presets", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Concurrency load test of the in-process FastMCP app.
+
+Run with ``python -m benchmarks.load_test``. For each concurrency level N the
+load generator opens N clients through ``create_client_session`` and fires
+``run_browser_agent`` calls against a stubbed LLM and browser backend. It
+reports throughput, p50/p95/p99 latency, event-loop lag and peak RSS, and marks
+the level where adding clients stops adding throughput.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from benchmarks._harness import install_stubs, write_report
+
+install_stubs()
+
+from mcp_browser_use import server  # noqa: E402
+from mcp_browser_use.client import create_client_session  # noqa: E402
+
+from benchmarks.bench_agent_loop import FakeBrowser, ScriptedLLM  # noqa: E402
+
+DEFAULT_CONCURRENCY = (1, 2, 4, 8, 16, 32, 64)
+
+# A level "scales" while it keeps at least this share of ideal linear speed-up
+# and still adds throughput over the previous level.
+SCALING_EFFICIENCY_FLOOR = 0.5
+MIN_THROUGHPUT_GAIN = 0.1
+
+
+class LoadTestBrowser(FakeBrowser):
+    """Fake browser with a simulated launch and shutdown time."""
+
+    def __init__(self, elements: int, start_latency: float):
+        super().__init__(elements)
+        self._start_latency = start_latency
+
+    async def start(self) -> "LoadTestBrowser":
+        await asyncio.sleep(self._start_latency)
+        return self
+
+    async def stop(self) -> None:
+        return None
+
+
+@contextmanager
+def stubbed_backend(
+    steps: int, elements: int, llm_latency: float, browser_latency: float
+) -> Iterator[None]:
+    """Point the server at scripted LLMs and fake browsers for the duration."""
+
+    originals = (server._get_llm, server.create_browser_session)
+    # The fake browsers have no CDP session to settle pages on.
+    overrides = {"MCP_MAX_STEPS": str(steps + 1), "BROWSER_USE_SETTLE": "false"}
+    previous_env = {name: os.environ.get(name) for name in overrides}
+    server._get_llm = lambda settings: ScriptedLLM(steps, latency=llm_latency)
+    server.create_browser_session = lambda: LoadTestBrowser(elements, browser_latency)
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        server._get_llm, server.create_browser_session = originals
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _current_rss_mb() -> float:
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is the lifetime peak: KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def _monitor_loop(
+    interval: float, lags: List[float], rss: List[float], stop: asyncio.Event
+) -> None:
+    """Sample scheduling delay of a periodic wake-up, plus the process RSS."""
+
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected) * 1000)
+        rss.append(_current_rss_mb())
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_level(concurrency: int, requests_per_client: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    lags: List[float] = []
+    rss: List[float] = [_current_rss_mb()]
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop(0.01, lags, rss, stop))
+
+    async def client_worker(worker: int) -> None:
+        nonlocal errors
+        async with create_client_session() as client:
+            for request in range(requests_per_client):
+                started = time.perf_counter()
+                try:
+                    await client.call_tool(
+                        "run_browser_agent",
+                        {"task": f"load test {worker}-{request}"},
+                    )
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_worker(worker) for worker in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    return {
+        "concurrency": concurrency,
+        "requests": concurrency * requests_per_client,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "loop_lag_p99_ms": _percentile(lags, 0.99),
+        "loop_lag_max_ms": max(lags, default=0.0),
+        "peak_rss_mb": max(rss),
+    }
+
+
+def find_saturation(levels: List[Dict[str, Any]]) -> Optional[int]:
+    """Annotate levels with scaling efficiency; return the first saturated one."""
+
+    if not levels or not levels[0]["throughput_rps"]:
+        return None
+    base = levels[0]
+    saturated: Optional[int] = None
+    previous = base
+    for level in levels:
+        ideal = base["throughput_rps"] * level["concurrency"] / base["concurrency"]
+        level["scaling_efficiency"] = level["throughput_rps"] / ideal if ideal else 0.0
+        gain = (
+            level["throughput_rps"] / previous["throughput_rps"] - 1
+            if previous["throughput_rps"]
+            else 0.0
+        )
+        if saturated is None and level is not base and (
+            level["scaling_efficiency"] < SCALING_EFFICIENCY_FLOOR
+            or gain < MIN_THROUGHPUT_GAIN
+        ):
+            saturated = level["concurrency"]
+        previous = level
+    return saturated
+
+
+async def run(
+    concurrency_levels: Sequence[int],
+    requests_per_client: int,
+    steps: int,
+    elements: int,
+    llm_latency: float,
+    browser_latency: float,
+) -> Dict[str, Any]:
+    levels = []
+    with stubbed_backend(steps, elements, llm_latency, browser_latency):
+        # One untimed call so imports and model caches do not skew level 1.
+        await run_level(1, 1)
+        for concurrency in concurrency_levels:
+            levels.append(await run_level(concurrency, requests_per_client))
+    return {"levels": levels, "saturation_concurrency": find_saturation(levels)}
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Where to write the JSON report.")
+    parser.add_argument("--requests-per-client", type=int, default=3)
+    parser.add_argument(
+        "--concurrency",
+        type=_int_list,
+        default=list(DEFAULT_CONCURRENCY),
+        help="Comma-separated numbers of concurrent clients.",
+    )
+    parser.add_argument("--steps", type=int, default=5, help="Agent steps per call.")
+    parser.add_argument("--elements", type=int, default=300)
+    parser.add_argument(
+        "--llm-latency-ms", type=float, default=50.0, help="Simulated LLM latency."
+    )
+    parser.add_argument(
+        "--browser-latency-ms",
+        type=float,
+        default=100.0,
+        help="Simulated browser start-up time.",
+    )
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    summary = asyncio.run(
+        run(
+            args.concurrency,
+            args.requests_per_client,
+            args.steps,
+            args.elements,
+            args.llm_latency_ms / 1000,
+            args.browser_latency_ms / 1000,
+        )
+    )
+
+    print(
+        f"{'clients':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'lag p99':>8} {'lag max':>8} {'RSS MB':>8} {'eff':>5} {'errors':>6}"
+    )
+    for level in summary["levels"]:
+        print(
+            f"{level['concurrency']:>7} {level['throughput_rps']:>9.1f} "
+            f"{level['p50_ms']:>9.1f} {level['p95_ms']:>9.1f} {level['p99_ms']:>9.1f} "
+            f"{level['loop_lag_p99_ms']:>8.1f} {level['loop_lag_max_ms']:>8.1f} "
+            f"{level['peak_rss_mb']:>8.1f} {level.get('scaling_efficiency', 0):>5.2f} "
+            f"{level['errors']:>6}"
+        )
+    saturation = summary["saturation_concurrency"]
+    print(
+        f"Stops scaling at {saturation} concurrent clients."
+        if saturation
+        else "Scaled across every tested level."
+    )
+
+    write_report(
+        "load_test",
+        summary["levels"],
+        args.output,
+        saturation_concurrency=saturation,
+        parameters={
+            "requests_per_client": args.requests_per_client,
+            "steps": args.steps,
+            "elements": args.elements,
+            "llm_latency_ms": args.llm_latency_ms,
+            "browser_latency_ms": args.browser_latency_ms,
+        },
+    )
+    return 1 if any(level["errors"] for level in summary["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,9 @@
 
 import json
 import logging
+import time
 import traceback
-from typing import Any, List, Optional, Type
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type
 
 import base64
 import io
@@ -30,11 +31,110 @@ from langchain_openai import ChatOpenAI
 from langchain_openai.chat_models.base import _convert_message_to_dict
 
 from mcp_browser_use.utils.agent_state import AgentState
+from mcp_browser_use.utils.metrics import (
+    LLM_SECONDS,
+    LLM_TOKENS,
+    STEP_SECONDS,
+    TOO_MANY_FAILURES,
+)
+from mcp_browser_use.utils.tracing import current_span, span, traced
 from mcp_browser_use.agent.custom_massage_manager import CustomMassageManager
-from mcp_browser_use.agent.custom_views import CustomAgentOutput, CustomAgentStepInfo
+from mcp_browser_use.browser.network_guard import NetworkGuard
+from mcp_browser_use.browser.page_reader import PageSettler
+from mcp_browser_use.agent.custom_views import (
+    CustomAgentOutput,
+    CustomAgentStepInfo,
+    RunMetrics,
+    StepMetrics,
+)
 
 logger = logging.getLogger(__name__)
 
+# Dynamic action/output models keyed by controller type and registered action
+# names. Building them means one ``create_model`` call per action, so reusing
+# them across runs keeps that cost off the per-call startup path.
+_ACTION_MODEL_CACHE: Dict[Tuple[type, FrozenSet[str]], Tuple[Any, Any]] = {}
+
+
+def build_action_models(controller: Controller) -> Tuple[Any, Any]:
+    """
+    Return the ``(ActionModel, AgentOutput)`` pair for ``controller``.
+
+    Models are cached per controller class and set of registered actions, so
+    every controller exposing the same actions shares one schema.
+    """
+    registered = getattr(getattr(controller.registry, "registry", None), "actions", None)
+    key = (type(controller), frozenset(registered or ()))
+    cached = _ACTION_MODEL_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    action_model = controller.registry.create_action_model()
+    models = (action_model, CustomAgentOutput.type_with_custom_actions(action_model))
+    if registered is not None:
+        # Without the action names we cannot tell controllers apart safely.
+        _ACTION_MODEL_CACHE[key] = models
+    return models
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _extract_token_usage(raw: Any) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Return ``(input_tokens, output_tokens)`` reported for a raw LLM response.
+
+    Understands LangChain messages (``usage_metadata`` or provider
+    ``response_metadata``) and OpenAI SDK responses (``usage``).
+    """
+    if raw is None:
+        return None, None
+
+    usage_metadata = getattr(raw, "usage_metadata", None)
+    if usage_metadata:
+        return usage_metadata.get("input_tokens"), usage_metadata.get("output_tokens")
+
+    usage = getattr(raw, "usage", None)
+    if usage is not None:
+        return (
+            getattr(usage, "prompt_tokens", None),
+            getattr(usage, "completion_tokens", None),
+        )
+
+    metadata = getattr(raw, "response_metadata", None) or {}
+    token_usage = metadata.get("token_usage") or metadata.get("usage") or {}
+    if token_usage:
+        return (
+            token_usage.get("prompt_tokens", token_usage.get("input_tokens")),
+            token_usage.get("completion_tokens", token_usage.get("output_tokens")),
+        )
+    return None, None
+
+
+def _extract_time_to_first_token_ms(raw: Any) -> Optional[float]:
+    """Time to first token for providers that report it (Ollama, in ns)."""
+    metadata = getattr(raw, "response_metadata", None) or {}
+    load = metadata.get("load_duration")
+    prompt_eval = metadata.get("prompt_eval_duration")
+    if load is None and prompt_eval is None:
+        return None
+    return ((load or 0) + (prompt_eval or 0)) / 1_000_000
+
+
+def _count_images(messages: List[BaseMessage]) -> int:
+    """Count image parts across multi-part message contents."""
+    count = 0
+    for message in messages:
+        content = getattr(message, "content", None)
+        if isinstance(content, list):
+            count += sum(
+                1
+                for part in content
+                if isinstance(part, dict) and part.get("type") == "image_url"
+            )
+    return count
+
 
 class CustomAgent(Agent):
     """
@@ -173,6 +273,14 @@ class CustomAgent(Agent):
             raise TypeError("Unable to initialise base Agent with provided arguments")
         self.add_infos = add_infos
         self.agent_state = agent_state
+        self.run_metrics = RunMetrics(
+            model=getattr(llm, "model_name", None) or getattr(llm, "model", None)
+        )
+        # Raw provider response of the latest LLM call, used for token metrics
+        self._last_llm_raw: Any = None
+        # Optional request blocking, re-applied each step in case of new tabs
+        self.network_guard: Optional[NetworkGuard] = None
+        self.page_settler: Optional[PageSettler] = None
 
         # Custom message manager
         self.message_manager = CustomMassageManager(
@@ -192,10 +300,8 @@ class CustomAgent(Agent):
         Setup dynamic action models from the controller's registry.
         This ensures the agent's output schema matches all possible actions.
         """
-        # Get the dynamic action model from controller's registry
-        self.ActionModel = self.controller.registry.create_action_model()
-        # Create output model with the dynamic actions
-        self.AgentOutput = CustomAgentOutput.type_with_custom_actions(self.ActionModel)
+        # Get the dynamic action model and the output model wrapping it
+        self.ActionModel, self.AgentOutput = build_action_models(self.controller)
 
     def _log_response(self, response: CustomAgentOutput) -> None:
         """
@@ -250,6 +356,7 @@ class CustomAgent(Agent):
             step_info.task_progress = completed_contents
 
     @time_execution_async("--get_next_action")
+    @traced("llm.get_next_action")
     async def get_next_action(self, input_messages: List[BaseMessage]) -> AgentOutput:
         """
         Get the next action from the LLM, attempting structured output parsing.
@@ -257,6 +364,7 @@ class CustomAgent(Agent):
         """
         logger.info("Getting next action from LLM")
         logger.debug(f"Input messages: {input_messages}")
+        self._last_llm_raw = None
 
         try:
             if isinstance(self.llm, ChatOpenAI):
@@ -302,6 +410,7 @@ class CustomAgent(Agent):
                 response_model=self.AgentOutput,
             )
             logger.debug(f"Raw OpenAI response: {parsed_response}")
+            self._last_llm_raw = getattr(parsed_response, "_raw_response", None)
 
             return parsed_response
 
@@ -315,6 +424,7 @@ class CustomAgent(Agent):
             )
             response: dict[str, Any] = await structured_llm.ainvoke(input_messages)
             logger.debug(f"Raw LLM response (default approach): {response}")
+            self._last_llm_raw = response.get("raw")
             return response["parsed"]  # type: ignore
 
     async def _handle_non_openai_structured_output(
@@ -328,6 +438,7 @@ class CustomAgent(Agent):
         )
         response: dict[str, Any] = await structured_llm.ainvoke(input_messages)
         logger.debug(f"Raw LLM response: {response}")
+        self._last_llm_raw = response.get("raw")
         return response["parsed"]  # type: ignore
 
     async def _fallback_parse(self, input_messages: List[BaseMessage]) -> AgentOutput:
@@ -338,6 +449,7 @@ class CustomAgent(Agent):
         try:
             ret = await self.llm.ainvoke(input_messages)
             logger.debug(f"Raw fallback response: {ret}")
+            self._last_llm_raw = ret
 
             content = ret.content
             if isinstance(content, list):
@@ -421,6 +533,7 @@ class CustomAgent(Agent):
             return False
 
     @time_execution_async("--execute-agent-step")
+    @traced("agent.step")
     async def execute_agent_step(
         self, step_info: Optional[CustomAgentStepInfo] = None
     ) -> None:
@@ -440,19 +553,45 @@ class CustomAgent(Agent):
         state = None
         model_output = None
         result: List[ActionResult] = []
+        step_started = time.perf_counter()
+        step_metrics = StepMetrics(step_number=self.n_steps)
+        self.run_metrics.steps.append(step_metrics)
+        current_span().set_attribute("step", self.n_steps)
 
         try:
-            try:
-                state = await self.browser_context.get_state(use_vision=self.use_vision)
-            except TypeError:
-                logger.warning(
-                    "get_state does not support 'use_vision' argument, falling back."
-                )
-                state = await self.browser_context.get_state()
+            await self._attach_network_guard()
+            await self._settle_page(step_metrics)
+            phase_started = time.perf_counter()
+            with span("browser.get_state", use_vision=self.use_vision):
+                try:
+                    state = await self.browser_context.get_state(
+                        use_vision=self.use_vision
+                    )
+                except TypeError:
+                    logger.warning(
+                        "get_state does not support 'use_vision' argument, falling back."
+                    )
+                    state = await self.browser_context.get_state()
+            step_metrics.state_capture_ms = _elapsed_ms(phase_started)
+
             self.message_manager.add_state_message(state, self._last_result, step_info)
             input_messages = self.message_manager.get_messages()
+            step_metrics.estimated_input_tokens = getattr(
+                self.message_manager.history, "total_tokens", None
+            )
+            step_metrics.image_count = _count_images(input_messages)
 
+            phase_started = time.perf_counter()
             model_output = await self.get_next_action(input_messages)
+            step_metrics.llm_latency_ms = _elapsed_ms(phase_started)
+            step_metrics.input_tokens, step_metrics.output_tokens = (
+                _extract_token_usage(self._last_llm_raw)
+            )
+            step_metrics.time_to_first_token_ms = _extract_time_to_first_token_ms(
+                self._last_llm_raw
+            )
+            step_metrics.action_count = len(model_output.action)
+
             self.update_step_info(model_output, step_info)
             logger.info(f"🧠 All Memory: {getattr(step_info, 'memory', '')}")
 
@@ -462,9 +601,12 @@ class CustomAgent(Agent):
             self.message_manager.add_model_output(model_output)
 
             # Execute the requested actions
+            phase_started = time.perf_counter()
             result = await self.controller.multi_act(
                 model_output.action, self.browser_context
             )
+            step_metrics.action_execution_ms = _elapsed_ms(phase_started)
+            result.extend(self._denied_navigation_results())
             self._last_result = result
 
             # If the last action indicates "is_done", we can log the extracted content
@@ -474,10 +616,13 @@ class CustomAgent(Agent):
             self.consecutive_failures = 0
 
         except Exception as e:
+            step_metrics.error = str(e)
             result = self._handle_step_error(e)
             self._last_result = result
 
         finally:
+            step_metrics.step_total_ms = _elapsed_ms(step_started)
+            self._export_step_metrics(step_metrics)
             if not result:
                 return
 
@@ -487,6 +632,58 @@ class CustomAgent(Agent):
             if state:
                 self._make_history_item(model_output, state, result)
 
+    async def _attach_network_guard(self) -> None:
+        """Apply request blocking to the current tab; failures never stop the step."""
+        if self.network_guard is None:
+            return
+        try:
+            await self.network_guard.ensure_attached()
+        except Exception as e:
+            logger.warning(f"Could not apply network blocking: {e}")
+
+    async def _settle_page(self, step_metrics: StepMetrics) -> None:
+        """Wait for the page to go quiet before its state is captured."""
+        if self.page_settler is None:
+            return
+        with span("browser.settle"):
+            settle = await self.page_settler.settle()
+        step_metrics.settle_ms = settle.elapsed_ms
+        step_metrics.settled = settle.settled
+        if not settle.settled:
+            logger.debug(
+                f"Page still busy after {settle.elapsed_ms:.0f} ms "
+                f"({settle.inflight} requests in flight)"
+            )
+
+    def _denied_navigation_results(self) -> List[ActionResult]:
+        """Tell the model which page loads the domain policy refused."""
+        if self.network_guard is None:
+            return []
+        denied = self.network_guard.take_denied_navigations()
+        if not denied:
+            return []
+        return [
+            ActionResult(
+                error=(
+                    f"Navigation to {', '.join(dict.fromkeys(denied))} was blocked: "
+                    "the domain is not allowed. Stay on the allowed domains."
+                ),
+                include_in_memory=True,
+            )
+        ]
+
+    def _export_step_metrics(self, step_metrics: StepMetrics) -> None:
+        """Feed a finished step into the process-wide metrics."""
+        STEP_SECONDS.observe(step_metrics.step_total_ms / 1000)
+        if step_metrics.llm_latency_ms is None:
+            return
+        labels = (self.run_metrics.provider or "unknown", self.run_metrics.model or "unknown")
+        LLM_SECONDS.observe(step_metrics.llm_latency_ms / 1000, labels)
+        if step_metrics.input_tokens:
+            LLM_TOKENS.inc(step_metrics.input_tokens, labels + ("input",))
+        if step_metrics.output_tokens:
+            LLM_TOKENS.inc(step_metrics.output_tokens, labels + ("output",))
+
     def create_history_gif(
         self,
         output_path: str = "agent_history.gif",
@@ -769,11 +966,15 @@ class CustomAgent(Agent):
         image.alpha_composite(overlay)
         return image.convert("RGB")
 
+    @traced("agent.task")
     async def execute_agent_task(self, max_steps: int = 100) -> AgentHistoryList:
         """
         Execute the entire agent task for up to max_steps or until 'done'.
         Checks for external stop signals and logs each step in self.history.
+        The run's :class:`RunMetrics` are attached to the returned history as
+        ``run_metrics``.
         """
+        task_started = time.perf_counter()
         try:
             logger.info(f"🚀 Starting task: {self.task}")
             self.telemetry.capture(
@@ -808,6 +1009,7 @@ class CustomAgent(Agent):
 
                 # 3) Check for too many failures
                 if self._too_many_failures():
+                    TOO_MANY_FAILURES.inc()
                     break
 
                 # 4) Execute one detailed agent step
@@ -823,6 +1025,10 @@ class CustomAgent(Agent):
             else:
                 logger.info("❌ Failed to complete task within maximum steps")
 
+            self.run_metrics.total_ms = _elapsed_ms(task_started)
+            if self.network_guard is not None:
+                self.run_metrics.network = self.network_guard.stats()
+            self._attach_run_metrics()
             return self.history
 
         finally:
@@ -846,6 +1052,15 @@ class CustomAgent(Agent):
             if self.generate_gif:
                 self.create_history_gif()
 
+    def _attach_run_metrics(self) -> None:
+        """Expose the run metrics on the history object returned to callers."""
+        try:
+            self.history.run_metrics = self.run_metrics
+        except (AttributeError, ValueError):
+            # Upstream history models are pydantic and reject unknown fields;
+            # store it on the instance directly so it travels with the history.
+            object.__setattr__(self.history, "run_metrics", self.run_metrics)
+
     def _create_stop_history_item(self) -> None:
         """
         Create a final 'stop' history item indicating the agent has halted by request.
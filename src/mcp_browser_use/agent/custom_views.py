@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
-from dataclasses import dataclass
-from typing import List, Type
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Type
 
 from browser_use.agent.views import AgentOutput
 from browser_use.controller.registry.views import ActionModel
@@ -29,6 +29,92 @@ class CustomAgentStepInfo:
     task_progress: str
 
 
+@dataclass
+class StepMetrics:
+    """
+    Timings and token counts for a single agent step.
+
+    Durations are in milliseconds and stay ``None`` when a phase did not run
+    (e.g. no LLM call because the state capture failed).
+
+    :param step_number: Step the metrics belong to.
+    :param settle_ms: Time spent waiting for the page to settle.
+    :param settled: Whether the page settled before the ceiling.
+    :param state_capture_ms: Time spent capturing the browser state.
+    :param llm_latency_ms: Wall time of the LLM call, including parsing.
+    :param time_to_first_token_ms: Time to first token, if the provider reports it.
+    :param action_execution_ms: Time spent executing the step's actions.
+    :param step_total_ms: Wall time of the whole step.
+    :param estimated_input_tokens: Message-manager estimate of the prompt size.
+    :param input_tokens: Prompt tokens reported by the provider.
+    :param output_tokens: Completion tokens reported by the provider.
+    :param image_count: Number of images sent with the prompt.
+    :param action_count: Number of actions the model requested.
+    :param error: Error message if the step failed.
+    """
+
+    step_number: int
+    settle_ms: Optional[float] = None
+    settled: Optional[bool] = None
+    state_capture_ms: Optional[float] = None
+    llm_latency_ms: Optional[float] = None
+    time_to_first_token_ms: Optional[float] = None
+    action_execution_ms: Optional[float] = None
+    step_total_ms: Optional[float] = None
+    estimated_input_tokens: Optional[int] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    image_count: int = 0
+    action_count: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class RunMetrics:
+    """
+    Per-run collection of :class:`StepMetrics` plus run-level timings.
+
+    :param provider: LLM provider name, when known.
+    :param model: Model name used for the run.
+    :param setup_ms: Time spent preparing the browser, LLM and agent.
+    :param total_ms: Wall time of the agent task.
+    :param steps: Metrics for every executed step, in order.
+    :param network: Blocked-request counts and byte estimates, when request
+        blocking is enabled.
+    """
+
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    setup_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+    steps: List[StepMetrics] = field(default_factory=list)
+    network: Optional[Dict[str, Any]] = None
+
+    def totals(self) -> Dict[str, Any]:
+        """Sum the per-step values that are meaningful across the run."""
+
+        def total(name: str) -> Optional[float]:
+            values = [getattr(step, name) for step in self.steps]
+            known = [value for value in values if value is not None]
+            return sum(known) if known else None
+
+        return {
+            "steps": len(self.steps),
+            "state_capture_ms": total("state_capture_ms"),
+            "llm_latency_ms": total("llm_latency_ms"),
+            "action_execution_ms": total("action_execution_ms"),
+            "input_tokens": total("input_tokens"),
+            "output_tokens": total("output_tokens"),
+            "estimated_input_tokens": total("estimated_input_tokens"),
+            "image_count": total("image_count"),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["totals"] = self.totals()
+        return data
+
+
 class CustomAgentBrain(BaseModel):
     """
     Represents the agent's 'thinking' or ephemeral state during processing.
@@ -10,14 +10,39 @@ variables to ``BrowserSession`` keyword arguments.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
 
 from browser_use import BrowserSession
 from browser_use.browser.profile import ProxySettings
 
+from mcp_browser_use.browser.cdp_pool import CdpEndpointPool, get_cdp_pool
+from mcp_browser_use.browser.disk_cache import CacheLease, DiskCachePool
+from mcp_browser_use.browser.memory_watchdog import (
+    find_browser_pid,
+    kill_process_tree,
+    process_tree,
+    snapshot_processes,
+)
+from mcp_browser_use.browser.page_reader import SettleConfig
+from mcp_browser_use.browser.profile_clone import ProfileCloner
+from mcp_browser_use.browser.storage_state import (
+    apply_storage_state,
+    load_storage_state,
+    storage_state_path,
+)
+from mcp_browser_use.utils.metrics import (
+    BROWSER_LAUNCH_FAILURES,
+    BROWSER_LAUNCH_SECONDS,
+    BROWSER_LAUNCHES,
+    ORPHANED_BROWSER_PROCESSES,
+)
+
 logger = logging.getLogger(__name__)
 
 _BOOL_TRUE = {"1", "true", "yes", "on"}
@@ -63,6 +88,181 @@ class BrowserPersistenceConfig:
         )
 
 
+# URL patterns (``Network.setBlockedURLs`` syntax) for common ad and tracking
+# hosts. Blocking them in the browser costs nothing per request.
+_AD_URL_PATTERNS = (
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*googleadservices.com*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*adservice.google.*",
+    "*facebook.net/*/fbevents.js*",
+    "*connect.facebook.net*",
+    "*amazon-adsystem.com*",
+    "*adnxs.com*",
+    "*criteo.com*",
+    "*taboola.com*",
+    "*outbrain.com*",
+    "*scorecardresearch.com*",
+    "*hotjar.com*",
+    "*segment.io*",
+    "*mixpanel.com*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+)
+
+# Named block profiles for ``BROWSER_USE_BLOCK_PROFILE``: resource types
+# (CDP ``Network.ResourceType`` names) and URL patterns.
+BLOCK_PROFILES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "ads": ((), _AD_URL_PATTERNS),
+    "media": (("Media",), ()),
+    "fonts": (("Font",), ()),
+    "images": (("Image",), ()),
+    "lean": (("Media", "Font"), _AD_URL_PATTERNS),
+}
+
+
+_RESOURCE_TYPES = {
+    name.lower(): name
+    for name in (
+        "Document",
+        "Stylesheet",
+        "Image",
+        "Media",
+        "Font",
+        "Script",
+        "TextTrack",
+        "XHR",
+        "Fetch",
+        "Prefetch",
+        "EventSource",
+        "WebSocket",
+        "Manifest",
+        "Ping",
+        "Other",
+    )
+}
+
+
+def _split_env_list(value: Optional[str]) -> list[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+@dataclass(slots=True)
+class NetworkBlockingConfig:
+    """Requests to block while an agent browses, by resource type or URL pattern."""
+
+    resource_types: frozenset[str] = frozenset()
+    url_patterns: Tuple[str, ...] = ()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.url_patterns)
+
+    @classmethod
+    def from_env(cls, use_vision: bool = False) -> "NetworkBlockingConfig":
+        """
+        Read ``BROWSER_USE_BLOCK_*``. Images are never blocked when the agent
+        uses vision, since screenshots would lose them.
+        """
+        resource_types: set[str] = set()
+        url_patterns: list[str] = []
+        for name in _split_env_list(os.getenv("BROWSER_USE_BLOCK_PROFILE")):
+            profile = BLOCK_PROFILES.get(name.lower())
+            if profile is None:
+                logger.warning("Unknown BROWSER_USE_BLOCK_PROFILE entry %r, ignoring.", name)
+                continue
+            resource_types.update(profile[0])
+            url_patterns.extend(profile[1])
+
+        for kind in _split_env_list(os.getenv("BROWSER_USE_BLOCK_RESOURCE_TYPES")):
+            resource_type = _RESOURCE_TYPES.get(kind.lower())
+            if resource_type is None:
+                logger.warning("Unknown resource type %r in BROWSER_USE_BLOCK_RESOURCE_TYPES.", kind)
+                continue
+            resource_types.add(resource_type)
+        url_patterns.extend(_split_env_list(os.getenv("BROWSER_USE_BLOCK_URL_PATTERNS")))
+        if os.getenv("BROWSER_USE_BLOCK_IMAGES", "false").lower() in _BOOL_TRUE:
+            resource_types.add("Image")
+
+        if use_vision and "Image" in resource_types:
+            logger.info("Not blocking images because vision is enabled.")
+            resource_types.discard("Image")
+
+        return cls(
+            resource_types=frozenset(resource_types),
+            url_patterns=tuple(dict.fromkeys(url_patterns)),
+        )
+
+
+# Switches that stop Chromium's background services from competing with the
+# page for CPU, network and memory.
+_QUIET_BROWSER_ARGS = (
+    "--no-first-run",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class LaunchPreset:
+    """Chromium flags, viewport, scale factor and process model for one workload."""
+
+    args: Tuple[str, ...] = ()
+    headless: Optional[bool] = None
+    viewport: Optional[Tuple[int, int]] = None
+    device_scale_factor: Optional[float] = None
+
+
+# Named presets for ``BROWSER_USE_LAUNCH_PRESET``.
+LAUNCH_PRESETS: Dict[str, LaunchPreset] = {
+    # Throughput: no GPU, no throttling of background tabs or timers.
+    "fast-headless": LaunchPreset(
+        args=_QUIET_BROWSER_ARGS
+        + (
+            "--disable-gpu",
+            "--disable-renderer-backgrounding",
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+        ),
+        headless=True,
+        viewport=(1280, 720),
+        device_scale_factor=1.0,
+    ),
+    # Density: few renderer processes shared per site, a capped V8 heap and a
+    # small viewport. Site isolation is relaxed, so only use it for trusted sites.
+    "low-memory": LaunchPreset(
+        args=_QUIET_BROWSER_ARGS
+        + (
+            "--disable-gpu",
+            "--disable-dev-shm-usage",
+            "--process-per-site",
+            "--renderer-process-limit=2",
+            "--disable-site-isolation-trials",
+            "--js-flags=--max-old-space-size=512",
+        ),
+        headless=True,
+        viewport=(1024, 768),
+        device_scale_factor=1.0,
+    ),
+    # Screenshots: large HiDPI viewport with stable colours and glyphs.
+    "vision-quality": LaunchPreset(
+        args=_QUIET_BROWSER_ARGS
+        + (
+            "--force-color-profile=srgb",
+            "--font-render-hinting=none",
+            "--hide-scrollbars",
+        ),
+        viewport=(1440, 900),
+        device_scale_factor=2.0,
+    ),
+}
+
+
 @dataclass(slots=True)
 class BrowserEnvironmentConfig:
     """All runtime settings required for instantiating ``BrowserSession``."""
@@ -75,6 +275,8 @@ class BrowserEnvironmentConfig:
     proxy: Optional[ProxySettings] = None
     cdp_url: Optional[str] = None
     user_data_dir: Optional[str] = None
+    viewport: Optional[Tuple[int, int]] = None
+    device_scale_factor: Optional[float] = None
 
     def to_kwargs(self) -> Dict[str, Any]:
         """Convert to keyword arguments understood by :class:`BrowserSession`."""
@@ -88,24 +290,53 @@ class BrowserEnvironmentConfig:
             "proxy": self.proxy,
             "cdp_url": self.cdp_url,
             "user_data_dir": self.user_data_dir,
+            "device_scale_factor": self.device_scale_factor,
         }
+        if self.viewport is not None:
+            kwargs["viewport"] = {"width": self.viewport[0], "height": self.viewport[1]}
         # Remove ``None`` values so BrowserSession can rely on its defaults.
         return {key: value for key, value in kwargs.items() if value is not None}
 
     @classmethod
     def from_env(cls) -> "BrowserEnvironmentConfig":
+        """
+        Read the ``BROWSER_USE_*`` and ``CHROME_*`` variables.
+
+        A ``BROWSER_USE_LAUNCH_PRESET`` supplies defaults. An explicit
+        ``BROWSER_USE_HEADLESS`` wins over the preset, and
+        ``BROWSER_USE_EXTRA_CHROMIUM_ARGS`` are passed after its flags, so
+        they override switches given twice.
+        """
         persistence = BrowserPersistenceConfig.from_env()
 
-        headless = os.getenv("BROWSER_USE_HEADLESS", "false").lower() in _BOOL_TRUE
+        preset = LaunchPreset()
+        preset_name = os.getenv("BROWSER_USE_LAUNCH_PRESET", "").strip().lower()
+        if preset_name:
+            if preset_name in LAUNCH_PRESETS:
+                preset = LAUNCH_PRESETS[preset_name]
+            else:
+                logger.warning(
+                    "Unknown BROWSER_USE_LAUNCH_PRESET %r, expected one of %s.",
+                    preset_name,
+                    ", ".join(LAUNCH_PRESETS),
+                )
+
+        headless_env = os.getenv("BROWSER_USE_HEADLESS")
+        if headless_env is None and preset.headless is not None:
+            headless = preset.headless
+        else:
+            headless = (headless_env or "false").lower() in _BOOL_TRUE
         disable_security = (
             os.getenv("BROWSER_USE_DISABLE_SECURITY", "false").lower() in _BOOL_TRUE
         )
         executable_path = os.getenv("CHROME_PATH") or None
 
         extra_args_env = os.getenv("BROWSER_USE_EXTRA_CHROMIUM_ARGS")
-        args = None
+        args = list(preset.args) or None
         if extra_args_env:
-            args = [arg.strip() for arg in extra_args_env.split(",") if arg.strip()]
+            args = (args or []) + [
+                arg.strip() for arg in extra_args_env.split(",") if arg.strip()
+            ]
 
         allowed_domains_env = os.getenv("BROWSER_USE_ALLOWED_DOMAINS")
         allowed_domains = None
@@ -126,7 +357,9 @@ class BrowserEnvironmentConfig:
                 password=os.getenv("BROWSER_USE_PROXY_PASSWORD"),
             )
 
-        cdp_url = os.getenv("BROWSER_USE_CDP_URL") or None
+        # With several endpoints the first stands in here; sessions are
+        # spread over all of them by the CDP endpoint pool.
+        cdp_url = next(iter(_split_env_list(os.getenv("BROWSER_USE_CDP_URL"))), None)
         if not cdp_url and (persistence.debugging_host or persistence.debugging_port):
             host = persistence.debugging_host or "127.0.0.1"
             port = persistence.debugging_port or 9222
@@ -150,9 +383,18 @@ class BrowserEnvironmentConfig:
             proxy=proxy,
             cdp_url=cdp_url,
             user_data_dir=user_data_dir,
+            viewport=preset.viewport,
+            device_scale_factor=preset.device_scale_factor,
         )
 
 
+# browser-use wait settings replaced by the adaptive settle detector.
+_SETTLED_PAGE_WAITS = {
+    "minimum_wait_page_load_time": 0.05,
+    "wait_for_network_idle_page_load_time": 0.0,
+}
+
+
 def create_browser_session(
     overrides: Optional[Dict[str, Any]] = None,
 ) -> BrowserSession:
@@ -164,6 +406,10 @@ def create_browser_session(
 
     config = BrowserEnvironmentConfig.from_env()
     kwargs = config.to_kwargs()
+    if SettleConfig.from_env().enabled:
+        # The agent waits for pages to settle itself; drop browser-use's
+        # fixed pre-state waits so fast pages are not held up.
+        kwargs.update(_SETTLED_PAGE_WAITS)
 
     if overrides:
         for key, value in overrides.items():
@@ -174,8 +420,298 @@ def create_browser_session(
                 # fall back to its internal default.
                 kwargs.pop(key)
 
-    logger.debug(
-        "Creating BrowserSession with kwargs: %s",
-        {k: v for k, v in kwargs.items() if k != "proxy"},
-    )
-    return BrowserSession(**kwargs)
+    resources = _SessionResources(local=not kwargs.get("cdp_url"))
+    try:
+        pool = get_cdp_pool()
+        if pool is not None and kwargs.get("cdp_url") == config.cdp_url:
+            kwargs["cdp_url"] = pool.acquire()
+            resources.endpoint = (kwargs["cdp_url"], pool)
+
+        resources.lease = _lease_disk_cache(kwargs)
+        resources.cloner = _profile_cloner(kwargs)
+        logger.debug(
+            "Creating BrowserSession with kwargs: %s",
+            {k: v for k, v in kwargs.items() if k != "proxy"},
+        )
+        browser_session = BrowserSession(**kwargs)
+    except BaseException:
+        resources.release()
+        raise
+    _track_resources(browser_session, resources)
+    return browser_session
+
+
+@dataclass(slots=True)
+class _SessionResources:
+    """What :func:`create_browser_session` acquired for one session."""
+
+    # Pooled CDP endpoint the session connects to.
+    endpoint: Optional[Tuple[str, CdpEndpointPool]] = None
+    # Shared disk cache slot; its flock is held until released.
+    lease: Optional[Tuple[CacheLease, DiskCachePool]] = None
+    # Cloner of CHROME_PROFILE_TEMPLATE; the clone is made when the session starts.
+    cloner: Optional[ProfileCloner] = None
+    # Cloned profile directory, removed on close.
+    clone: Optional[Tuple[str, ProfileCloner]] = None
+    # The session launches its own Chromium rather than connecting to a
+    # configured CDP URL; only such processes are ever killed on close.
+    local: bool = False
+    # Objects that live as long as the browser rather than one run.
+    attachments: Dict[str, Any] = field(default_factory=dict)
+    session: Optional[weakref.ref] = None
+
+    def release_endpoint(self) -> None:
+        if self.endpoint is not None:
+            url, pool = self.endpoint
+            pool.release(url)
+            self.endpoint = None
+
+    def release(self) -> None:
+        """Give everything back; blocks while a profile clone is removed."""
+        self.release_endpoint()
+        if self.lease is not None:
+            self.lease[0].release()
+            self.lease = None
+        if self.clone is not None:
+            path, cloner = self.clone
+            try:
+                cloner.remove(path)
+            except OSError as error:
+                logger.warning("Could not remove profile clone %s: %s", path, error)
+            self.clone = None
+
+
+# Resources of live sessions by ``id(session)``. BrowserSession is an
+# unhashable pydantic model, so a WeakKeyDictionary cannot hold it; each
+# entry keeps a weak reference instead, so an ``id`` reused after garbage
+# collection never matches another session's entry.
+_SESSION_RESOURCES: Dict[int, _SessionResources] = {}
+
+
+def _track_resources(browser_session: BrowserSession, resources: _SessionResources) -> None:
+    key = id(browser_session)
+    resources.session = weakref.ref(browser_session)
+    _SESSION_RESOURCES[key] = resources
+    weakref.finalize(browser_session, _release_collected, key)
+
+
+def _resources_of(browser_session: BrowserSession) -> Optional[_SessionResources]:
+    resources = _SESSION_RESOURCES.get(id(browser_session))
+    if resources is None or resources.session is None or resources.session() is not browser_session:
+        return None
+    return resources
+
+
+def session_attachments(browser_session: BrowserSession) -> Dict[str, Any]:
+    """
+    Objects tied to ``browser_session`` for as long as it stays open, such as
+    its network guard. A named session serves many runs, so anything a run
+    sets up on the browser belongs here rather than on the run's agent or
+    controller. Dropped when the session is closed.
+    """
+    resources = _resources_of(browser_session)
+    if resources is None:
+        resources = _SessionResources()
+        _track_resources(browser_session, resources)
+    return resources.attachments
+
+
+def _take_resources(browser_session: BrowserSession) -> Optional[_SessionResources]:
+    """Remove and return the resources of ``browser_session``, if it has any."""
+    resources = _resources_of(browser_session)
+    if resources is not None:
+        del _SESSION_RESOURCES[id(browser_session)]
+    return resources
+
+
+def _release_collected(key: int) -> None:
+    """Release what a session that was never closed still held."""
+    resources = _SESSION_RESOURCES.get(key)
+    if resources is None or resources.session is None or resources.session() is not None:
+        # Closed already, or the id now belongs to a newer session.
+        return
+    del _SESSION_RESOURCES[key]
+    logger.debug("Releasing resources of a browser session that was never closed")
+    resources.release()
+
+
+def _profile_cloner(kwargs: Dict[str, Any]) -> Optional[ProfileCloner]:
+    """
+    The cloner that gives a launched browser its own copy of
+    ``CHROME_PROFILE_TEMPLATE``, if one is configured.
+
+    Copying the profile blocks, so it happens in a worker thread when the
+    session starts, see :func:`_clone_profile`.
+    """
+    if kwargs.get("cdp_url"):
+        return None
+    cloner = ProfileCloner.from_env()
+    if cloner is None:
+        return None
+    if kwargs.get("user_data_dir"):
+        logger.debug("CHROME_PROFILE_TEMPLATE takes precedence over CHROME_USER_DATA.")
+    return cloner
+
+
+async def _clone_profile(browser_session: BrowserSession, resources: _SessionResources) -> None:
+    """Point ``browser_session`` at a fresh profile clone before it launches."""
+    cloner, resources.cloner = resources.cloner, None
+    copying = asyncio.ensure_future(asyncio.to_thread(cloner.clone))
+    try:
+        clone = await asyncio.shield(copying)
+    except asyncio.CancelledError:
+        # The copy cannot be interrupted; record it so closing removes it.
+        clone = await copying
+        resources.clone = clone.path, cloner
+        raise
+    resources.clone = clone.path, cloner
+    browser_session.browser_profile.user_data_dir = clone.path
+
+
+def _lease_disk_cache(
+    kwargs: Dict[str, Any],
+) -> Optional[Tuple[CacheLease, DiskCachePool]]:
+    """
+    Point a freshly launched browser at a shared cache slot, if configured.
+
+    Persistent profiles keep their own cache, and a CDP connection does not
+    launch Chromium, so neither is given a slot.
+    """
+    if kwargs.get("cdp_url") or kwargs.get("user_data_dir"):
+        return None
+    pool = DiskCachePool.from_env()
+    if pool is None:
+        return None
+    try:
+        lease = pool.acquire()
+    except OSError as error:
+        logger.warning("Shared disk cache unavailable: %s", error)
+        return None
+    if lease is None:
+        return None
+    kwargs["args"] = list(kwargs.get("args") or []) + [
+        f"--disk-cache-dir={lease.path}",
+        f"--disk-cache-size={pool.slot_bytes}",
+    ]
+    return lease, pool
+
+
+# Sessions started ahead of time by the server warm-up. ``run_browser_agent``
+# takes one from here before falling back to launching a new browser.
+_PRELAUNCHED_SESSIONS: list[BrowserSession] = []
+
+
+async def start_browser_session(browser_session: BrowserSession) -> BrowserSession:
+    """
+    Start ``browser_session``, counting launches and failures in the metrics.
+
+    A session with a ``CHROME_PROFILE_TEMPLATE`` gets its profile clone here,
+    off the event loop. When ``BROWSER_USE_STORAGE_STATE`` names a state file,
+    its cookies and localStorage are loaded into the new browser. If starting
+    fails, the caller still closes the session to give back what it holds.
+    """
+
+    resources = _resources_of(browser_session)
+    endpoint = resources.endpoint if resources is not None else None
+    started = time.perf_counter()
+    try:
+        if resources is not None and resources.cloner is not None:
+            await _clone_profile(browser_session, resources)
+        await browser_session.start()
+    except Exception as error:
+        BROWSER_LAUNCH_FAILURES.inc()
+        if endpoint is not None:
+            url, pool = endpoint
+            pool.mark_failed(url, error)
+        raise
+    if endpoint is not None:
+        url, pool = endpoint
+        pool.mark_healthy(url)
+    BROWSER_LAUNCHES.inc()
+    BROWSER_LAUNCH_SECONDS.observe(time.perf_counter() - started)
+
+    state_path = storage_state_path()
+    if state_path:
+        try:
+            state = await asyncio.to_thread(load_storage_state, state_path)
+            await apply_storage_state(browser_session, state)
+        except Exception as error:
+            logger.warning("Could not load storage state %s: %s", state_path, error)
+    return browser_session
+
+
+async def prelaunch_browser_session() -> BrowserSession:
+    """Start a browser session from the environment and keep it for later use."""
+
+    browser_session = create_browser_session()
+    try:
+        await start_browser_session(browser_session)
+    except BaseException:
+        await close_browser_session(browser_session, force=True)
+        raise
+    _PRELAUNCHED_SESSIONS.append(browser_session)
+    logger.info("Pre-launched a browser session for the next agent run.")
+    return browser_session
+
+
+def take_prelaunched_browser_session() -> Optional[BrowserSession]:
+    """Return a pre-launched, already started session if one is available."""
+
+    if _PRELAUNCHED_SESSIONS:
+        return _PRELAUNCHED_SESSIONS.pop()
+    return None
+
+
+async def close_browser_session(browser_session: BrowserSession, force: bool = False) -> None:
+    """
+    Stop ``browser_session``, killing it if a graceful stop fails.
+
+    Chromium processes of a locally launched browser that are still running
+    afterwards are killed and reaped.
+
+    :param force: Kill the browser instead of stopping it. ``stop()`` leaves
+        a ``keep_alive`` session's browser running, so owners of such
+        sessions must pass ``True``.
+    """
+
+    resources = _take_resources(browser_session)
+    processes: Dict[int, float] = {}
+    if resources is not None and resources.local:
+        pid = await asyncio.to_thread(find_browser_pid, browser_session)
+        if pid is not None:
+            tree = await asyncio.to_thread(process_tree, pid)
+            processes = await asyncio.to_thread(snapshot_processes, tree)
+    try:
+        if force and hasattr(browser_session, "kill"):
+            await browser_session.kill()
+        else:
+            await browser_session.stop()
+    except Exception as browser_error:
+        logger.warning(
+            "Failed to stop browser session gracefully, killing it: %s",
+            browser_error,
+        )
+        if hasattr(browser_session, "kill"):
+            await browser_session.kill()
+    finally:
+        if processes:
+            killed = await asyncio.to_thread(kill_process_tree, processes)
+            if killed:
+                ORPHANED_BROWSER_PROCESSES.inc(killed)
+        if resources is not None:
+            # The pool's metrics are written on the loop; the rest may block.
+            resources.release_endpoint()
+            cache_pool = resources.lease[1] if resources.lease is not None else None
+            await asyncio.to_thread(resources.release)
+            if cache_pool is not None:
+                try:
+                    await asyncio.to_thread(cache_pool.prune)
+                except OSError as error:
+                    logger.warning("Could not prune the shared disk cache: %s", error)
+
+
+async def close_prelaunched_browser_sessions() -> None:
+    """Close every pre-launched session that was never handed out."""
+
+    while _PRELAUNCHED_SESSIONS:
+        await close_browser_session(_PRELAUNCHED_SESSIONS.pop())
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Spread browser sessions over several remote CDP endpoints.
+
+``BROWSER_USE_CDP_URL`` may list several endpoints, for example Chromium
+workers on other hosts or in containers. Each new browser session is assigned
+one of them, either the endpoint with the fewest open sessions
+(``least-loaded``) or the next one in turn (``round-robin``).
+
+An endpoint is ejected when a browser fails to connect to it or when a
+health check fails. Health checks request ``/json/version`` in the
+background. An ejected endpoint gets no sessions until its backoff has
+passed. The backoff doubles with every consecutive failure, up to a limit.
+After that the endpoint is tried again, and one success restores it. If
+every endpoint is ejected, the one due back first is used anyway, so runs
+fail with the real connection error rather than a pool error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import urllib.request
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from mcp_browser_use.utils.metrics import CDP_ENDPOINT_EJECTIONS, CDP_ENDPOINT_SESSIONS
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("least-loaded", "round-robin")
+
+
+def endpoint_label(url: str) -> str:
+    """``scheme://host:port`` of ``url``; paths and queries may hold tokens."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc.rpartition('@')[2]}"
+
+
+def _version_url(url: str) -> str:
+    parts = urlsplit(url)
+    scheme = {"ws": "http", "wss": "https"}.get(parts.scheme, parts.scheme)
+    return f"{scheme}://{parts.netloc}/json/version"
+
+
+def probe_endpoint(url: str, timeout: float) -> None:
+    """Raise unless the endpoint's DevTools HTTP interface answers."""
+    with urllib.request.urlopen(_version_url(url), timeout=timeout) as response:
+        response.read()
+
+
+@dataclass(slots=True)
+class CdpEndpoint:
+    """One CDP endpoint with its load and health."""
+
+    url: str
+    active: int = 0
+    assigned: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+    last_error: Optional[str] = None
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def describe(self, now: float) -> Dict[str, Any]:
+        return {
+            "endpoint": endpoint_label(self.url),
+            "active": self.active,
+            "assigned": self.assigned,
+            "healthy": self.failures == 0,
+            "ejected_for_s": round(max(0.0, self.ejected_until - now), 1),
+            "last_error": self.last_error,
+        }
+
+
+class CdpEndpointPool:
+    """
+    Assign browser sessions to CDP endpoints and track their health.
+
+    :param urls: The endpoints.
+    :param strategy: ``"least-loaded"`` or ``"round-robin"``.
+    :param health_interval: Seconds between background health checks; ``0`` disables them.
+    :param probe_timeout: Timeout of one health check.
+    :param base_backoff: Ejection time after the first failure.
+    :param max_backoff: Upper bound of the doubling ejection time.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        strategy: str = "least-loaded",
+        health_interval: float = 15.0,
+        probe_timeout: float = 2.0,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+    ):
+        if not urls:
+            raise ValueError("A CDP endpoint pool needs at least one endpoint.")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown CDP strategy {strategy!r}, expected one of {STRATEGIES}")
+        self.endpoints = {url: CdpEndpoint(url) for url in dict.fromkeys(urls)}
+        self.strategy = strategy
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._cursor = 0
+        self._health_task: Optional[asyncio.Task] = None
+
+    def acquire(self) -> str:
+        """Pick the endpoint for a new browser session and count it as active."""
+        now = time.monotonic()
+        endpoints = list(self.endpoints.values())
+        candidates = [endpoint for endpoint in endpoints if endpoint.available(now)]
+        if not candidates:
+            endpoint = min(endpoints, key=lambda item: item.ejected_until)
+            logger.warning(
+                "All %d CDP endpoints are ejected; trying %s",
+                len(endpoints),
+                endpoint_label(endpoint.url),
+            )
+        elif self.strategy == "round-robin":
+            endpoint = candidates[self._cursor % len(candidates)]
+            self._cursor += 1
+        else:
+            endpoint = min(candidates, key=lambda item: (item.active, item.assigned))
+        endpoint.active += 1
+        endpoint.assigned += 1
+        CDP_ENDPOINT_SESSIONS.inc(labels=(endpoint_label(endpoint.url),))
+        self._ensure_health_checks()
+        return endpoint.url
+
+    def release(self, url: str) -> None:
+        """A session on ``url`` has closed."""
+        endpoint = self.endpoints.get(url)
+        if endpoint is not None and endpoint.active > 0:
+            endpoint.active -= 1
+            CDP_ENDPOINT_SESSIONS.dec(labels=(endpoint_label(url),))
+
+    def mark_failed(self, url: str, error: BaseException | str) -> None:
+        """Eject ``url`` for a backoff that doubles with each consecutive failure."""
+        endpoint = self.endpoints.get(url)
+        if endpoint is None:
+            return
+        endpoint.failures += 1
+        endpoint.last_error = str(error)
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (endpoint.failures - 1))
+        endpoint.ejected_until = time.monotonic() + backoff
+        CDP_ENDPOINT_EJECTIONS.inc(labels=(endpoint_label(url),))
+        logger.warning(
+            "Ejected CDP endpoint %s for %.0fs after %d failure(s): %s",
+            endpoint_label(url),
+            backoff,
+            endpoint.failures,
+            error,
+        )
+
+    def mark_healthy(self, url: str) -> None:
+        endpoint = self.endpoints.get(url)
+        if endpoint is None or endpoint.failures == 0:
+            return
+        logger.info("CDP endpoint %s is healthy again", endpoint_label(url))
+        endpoint.failures = 0
+        endpoint.ejected_until = 0.0
+        endpoint.last_error = None
+
+    async def check_health(self) -> Dict[str, bool]:
+        """Probe every endpoint that is not serving an ejection backoff."""
+        now = time.monotonic()
+        due = [endpoint.url for endpoint in self.endpoints.values() if endpoint.available(now)]
+        outcomes = await asyncio.gather(
+            *(asyncio.to_thread(probe_endpoint, url, self.probe_timeout) for url in due),
+            return_exceptions=True,
+        )
+        results = {}
+        for url, outcome in zip(due, outcomes):
+            if isinstance(outcome, Exception):
+                self.mark_failed(url, outcome)
+            else:
+                self.mark_healthy(url)
+            results[url] = not isinstance(outcome, Exception)
+        return results
+
+    def _ensure_health_checks(self) -> None:
+        if self.health_interval <= 0:
+            return
+        if self._health_task is not None and not self._health_task.done():
+            return
+        try:
+            self._health_task = asyncio.get_running_loop().create_task(self._check_periodically())
+        except RuntimeError:
+            # No running loop: the next acquire inside one starts the checks.
+            return
+
+    async def _check_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    def describe(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [endpoint.describe(now) for endpoint in self.endpoints.values()]
+
+    @classmethod
+    def from_env(cls) -> Optional["CdpEndpointPool"]:
+        """Return a pool when ``BROWSER_USE_CDP_URL`` lists more than one endpoint."""
+        urls = [url.strip() for url in os.getenv("BROWSER_USE_CDP_URL", "").split(",") if url.strip()]
+        if len(urls) < 2:
+            return None
+
+        def _number(env_var: str, default: float) -> float:
+            try:
+                return float(os.getenv(env_var, str(default)))
+            except ValueError:
+                logger.warning(f"Invalid number for {env_var}, using default={default}")
+                return default
+
+        strategy = os.getenv("BROWSER_USE_CDP_STRATEGY", "least-loaded").strip().lower()
+        if strategy not in STRATEGIES:
+            logger.warning(
+                "Unknown BROWSER_USE_CDP_STRATEGY %r, using least-loaded.", strategy
+            )
+            strategy = "least-loaded"
+        return cls(
+            urls,
+            strategy=strategy,
+            health_interval=_number("BROWSER_USE_CDP_HEALTH_INTERVAL", 15.0),
+            max_backoff=_number("BROWSER_USE_CDP_MAX_BACKOFF", 300.0),
+        )
+
+
+_POOL: Optional[CdpEndpointPool] = None
+_POOL_SOURCE: Optional[str] = None
+
+
+def get_cdp_pool() -> Optional[CdpEndpointPool]:
+    """The process-wide pool for ``BROWSER_USE_CDP_URL``, rebuilt when it changes."""
+    global _POOL, _POOL_SOURCE
+    source = os.getenv("BROWSER_USE_CDP_URL", "")
+    if _POOL is None or source != _POOL_SOURCE:
+        if _POOL is not None and _POOL._health_task is not None:
+            _POOL._health_task.cancel()
+        _POOL = CdpEndpointPool.from_env()
+        _POOL_SOURCE = source
+    return _POOL
+
+
+async def close_cdp_pool() -> None:
+    """Stop the background health checks of the process-wide pool."""
+    if _POOL is not None:
+        await _POOL.close()
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""Concurrent breadth-first crawler on top of :mod:`page_reader`.
+
+Each worker owns one browser session, started on first use and reused for
+every page it fetches; browser-use tracks a single focused tab per session,
+so parallel lanes are separate sessions rather than tabs of one. When a fetch
+fails and the browser no longer answers, the worker closes that session and
+retries the page once in a new one. URLs are normalised before they enter the
+frontier and a URL is never scheduled twice. Requests to one host are limited
+in concurrency and spaced apart.
+Sessions come from :func:`create_browser_session`, so the proxy follows
+:class:`BrowserEnvironmentConfig`, and links are filtered by the same
+:class:`DomainPolicy` the agent browsers use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from browser_use import BrowserSession
+
+from mcp_browser_use.browser.browser_manager import (
+    close_browser_session,
+    create_browser_session,
+    start_browser_session,
+)
+from mcp_browser_use.browser.domain_policy import DomainPolicy
+from mcp_browser_use.browser.page_reader import browser_alive, read_page
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """
+    Return a canonical form of ``url`` for de-duplication, or ``None``.
+
+    Lower-cases scheme and host, drops default ports, fragments and empty
+    query values, sorts the query and gives empty paths a ``/``. Only
+    ``http`` and ``https`` URLs are kept.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port and port != _DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+@dataclass(slots=True)
+class CrawlOptions:
+    """Limits for one crawl."""
+
+    max_depth: int = 1
+    max_pages: int = 50
+    concurrency: int = 4
+    same_host: bool = True
+    allowed_domains: Optional[List[str]] = None
+    per_host_concurrency: int = 1
+    per_host_delay: float = 0.5
+    max_chars: int = 5_000
+    selector: Optional[str] = None
+
+
+@dataclass(slots=True)
+class CrawlResult:
+    """One fetched page."""
+
+    url: str
+    depth: int
+    title: str = ""
+    text: str = ""
+    links: List[str] = field(default_factory=list)
+    matches: List[Dict[str, str]] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class _HostGate:
+    """Per-host concurrency limit and minimum spacing between requests."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._delay = delay
+        self._next_at = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._slots:
+            wait = self._next_at - time.monotonic()
+            self._next_at = max(self._next_at, time.monotonic()) + self._delay
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+
+
+class Crawler:
+    """
+    Crawl breadth-first from ``seeds`` within ``options``.
+
+    :param seeds: Start URLs (depth 0).
+    :param options: Depth, page, domain and concurrency limits.
+    :param session_factory: Creates unstarted browser sessions; defaults to
+        :func:`create_browser_session`.
+    """
+
+    def __init__(
+        self,
+        seeds: Sequence[str],
+        options: Optional[CrawlOptions] = None,
+        session_factory: Optional[Callable[[], BrowserSession]] = None,
+    ):
+        self.options = options or CrawlOptions()
+        self._session_factory = session_factory or create_browser_session
+        self._visited: Set[str] = set()
+        self._frontier: asyncio.Queue[Tuple[str, int]] = asyncio.Queue()
+        self._results: asyncio.Queue[Optional[CrawlResult]] = asyncio.Queue()
+        self._gates: Dict[str, _HostGate] = {}
+        self._sessions: List[BrowserSession] = []
+
+        self._policies = [DomainPolicy.from_env()]
+        if self.options.allowed_domains:
+            self._policies.append(DomainPolicy(self.options.allowed_domains))
+
+        self._seed_hosts = set()
+        self._seeds = []
+        for seed in seeds:
+            url = normalize_url(seed)
+            if url:
+                self._seed_hosts.add(urlsplit(url).hostname)
+                self._seeds.append(url)
+
+    @property
+    def visited(self) -> Set[str]:
+        return set(self._visited)
+
+    def _allowed(self, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        if self.options.same_host and host not in self._seed_hosts:
+            return False
+        return all(policy.allows_host(host) for policy in self._policies)
+
+    def _enqueue(self, raw_url: str, depth: int) -> None:
+        url = normalize_url(raw_url)
+        if (
+            url is None
+            or url in self._visited
+            or len(self._visited) >= self.options.max_pages
+            or not self._allowed(url)
+        ):
+            return
+        self._visited.add(url)
+        self._frontier.put_nowait((url, depth))
+
+    def _gate(self, url: str) -> _HostGate:
+        host = urlsplit(url).netloc
+        gate = self._gates.get(host)
+        if gate is None:
+            gate = self._gates[host] = _HostGate(
+                self.options.per_host_concurrency, self.options.per_host_delay
+            )
+        return gate
+
+    async def _start_session(self) -> BrowserSession:
+        session = self._session_factory()
+        try:
+            await start_browser_session(session)
+        except BaseException:
+            # Also on cancellation: the session is not in ``_sessions`` yet,
+            # so ``run`` would never close it.
+            await close_browser_session(session, force=True)
+            raise
+        self._sessions.append(session)
+        return session
+
+    async def _discard_session(self, session: BrowserSession) -> None:
+        if session in self._sessions:
+            self._sessions.remove(session)
+        try:
+            await close_browser_session(session)
+        except Exception as error:
+            logger.debug("Closing a dead crawl session failed: %s", error)
+
+    async def _fetch(
+        self, session: Optional[BrowserSession], url: str, depth: int
+    ) -> Tuple[Optional[BrowserSession], CrawlResult]:
+        started = time.perf_counter()
+        result = CrawlResult(url=url, depth=depth)
+        for attempt in range(2):
+            try:
+                if session is None:
+                    session = await self._start_session()
+                async with self._gate(url).slot():
+                    page = await read_page(
+                        session,
+                        url,
+                        selector=self.options.selector,
+                        max_chars=self.options.max_chars,
+                    )
+            except Exception as error:
+                logger.debug("Crawl of %s failed: %s", url, error)
+                result.error = str(error)
+                if session is None or await browser_alive(session):
+                    break
+                # The browser itself is gone: replace it rather than failing
+                # every page left for this worker, and retry this page once.
+                logger.warning("Crawl browser stopped responding; starting a new one")
+                await self._discard_session(session)
+                session = None
+                continue
+            result.title = page.title
+            result.text = page.text
+            result.links = [link["href"] for link in page.links]
+            result.matches = page.matches
+            result.error = None
+            break
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        return session, result
+
+    async def _worker(self) -> None:
+        session: Optional[BrowserSession] = None
+        while True:
+            url, depth = await self._frontier.get()
+            try:
+                session, result = await self._fetch(session, url, depth)
+                if depth < self.options.max_depth:
+                    for link in result.links:
+                        self._enqueue(link, depth + 1)
+                await self._results.put(result)
+            finally:
+                self._frontier.task_done()
+
+    async def _supervise(self, workers: List[asyncio.Task]) -> None:
+        await self._frontier.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await self._results.put(None)
+
+    async def run(self) -> AsyncIterator[CrawlResult]:
+        """Yield each page as soon as it has been fetched."""
+        for seed in self._seeds:
+            self._enqueue(seed, 0)
+
+        workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(max(1, min(self.options.concurrency, self.options.max_pages)))
+        ]
+        supervisor = asyncio.create_task(self._supervise(workers))
+        try:
+            while True:
+                result = await self._results.get()
+                if result is None:
+                    break
+                yield result
+        finally:
+            supervisor.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(supervisor, *workers, return_exceptions=True)
+            sessions, self._sessions = self._sessions, []
+            await asyncio.gather(
+                *(close_browser_session(session) for session in sessions),
+                return_exceptions=True,
+            )
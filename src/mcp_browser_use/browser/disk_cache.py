@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Chromium HTTP cache shared between ephemeral browser sessions.
+
+Two Chromium processes must not write to one cache directory at the same
+time. The shared cache is therefore a fixed set of slot directories. A
+browser leases a free slot, holding an exclusive ``flock`` on the slot's
+lock file, and passes it to Chromium as ``--disk-cache-dir``. Later browsers
+reuse warm slots, so repeat visits hit the cache. The lock is released by
+the kernel if the process dies.
+
+Only the HTTP cache lives here. Cookies and storage stay in each session's
+own profile, so sessions remain isolated. Chromium evicts entries inside a
+slot once it reaches its share of the size cap (``--disk-cache-size``). When
+a browser closes, whole slots are removed, least recently used first, until
+the cache fits the cap again.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+try:  # POSIX only; the shared cache is disabled elsewhere.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_LOCK_FILE = ".lock"
+_SLOT_PREFIX = "slot-"
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _try_lock(path: str) -> Optional[int]:
+    """Open and exclusively lock ``path`` without blocking; ``None`` if taken."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+@dataclass(slots=True)
+class CacheLease:
+    """Exclusive use of one cache slot until :meth:`release`."""
+
+    path: str
+    fd: Optional[int]
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+        fd, self.fd = self.fd, None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class DiskCachePool:
+    """
+    Lease cache slots under ``directory`` and keep their total size capped.
+
+    :param directory: Root of the shared cache.
+    :param max_bytes: Size cap for all slots together.
+    :param slots: Number of browsers that can use the cache at the same time.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, slots: int = 4):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max(1, max_bytes)
+        self.slots = max(1, slots)
+
+    @property
+    def slot_bytes(self) -> int:
+        """Cache size handed to each Chromium via ``--disk-cache-size``."""
+        return self.max_bytes // self.slots
+
+    def _slot_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"{_SLOT_PREFIX}{index}")
+
+    def acquire(self) -> Optional[CacheLease]:
+        """Lease the most recently used free slot, or ``None`` if all are busy."""
+        if fcntl is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+
+        def _last_used(index: int) -> float:
+            try:
+                return os.path.getmtime(os.path.join(self._slot_path(index), _LOCK_FILE))
+            except OSError:
+                return 0.0
+
+        # Warm slots first, so repeat visits find their entries.
+        for index in sorted(range(self.slots), key=_last_used, reverse=True):
+            path = self._slot_path(index)
+            os.makedirs(path, exist_ok=True)
+            lock_path = os.path.join(path, _LOCK_FILE)
+            fd = _try_lock(lock_path)
+            if fd is None:
+                continue
+            os.utime(lock_path)
+            return CacheLease(path=path, fd=fd)
+        logger.debug("All %d disk cache slots are in use.", self.slots)
+        return None
+
+    def _slot_dirs(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in names
+            if name.startswith(_SLOT_PREFIX)
+        ]
+
+    def prune(self) -> List[str]:
+        """Empty idle slots, least recently used first, until the cap is met."""
+        if fcntl is None:
+            return []
+        slots: List[Tuple[float, int, str]] = []
+        for path in self._slot_dirs():
+            lock_path = os.path.join(path, _LOCK_FILE)
+            try:
+                last_used = os.path.getmtime(lock_path)
+            except OSError:
+                last_used = 0.0
+            slots.append((last_used, _directory_size(path), path))
+
+        total = sum(size for _used, size, _path in slots)
+        valid = {self._slot_path(index) for index in range(self.slots)}
+        pruned = []
+        for last_used, size, path in sorted(slots):
+            # Slots beyond the configured count are always removed.
+            if total <= self.max_bytes and path in valid:
+                continue
+            fd = _try_lock(os.path.join(path, _LOCK_FILE))
+            if fd is None:
+                continue
+            try:
+                for name in os.listdir(path):
+                    if name == _LOCK_FILE:
+                        continue
+                    target = os.path.join(path, name)
+                    if os.path.isdir(target) and not os.path.islink(target):
+                        shutil.rmtree(target, ignore_errors=True)
+                    else:
+                        os.unlink(target)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+            total -= size
+            pruned.append(path)
+            logger.debug(
+                "Emptied disk cache slot %s (%d bytes, idle %.0fs)",
+                path,
+                size,
+                time.time() - last_used,
+            )
+        return pruned
+
+    @classmethod
+    def from_env(cls) -> Optional["DiskCachePool"]:
+        """Return a pool when ``BROWSER_USE_DISK_CACHE_DIR`` is set."""
+        directory = os.getenv("BROWSER_USE_DISK_CACHE_DIR")
+        if not directory:
+            return None
+        if fcntl is None:
+            logger.warning("BROWSER_USE_DISK_CACHE_DIR needs file locking (POSIX); ignoring.")
+            return None
+
+        def _int(env_var: str, default: int) -> int:
+            try:
+                return int(os.getenv(env_var, str(default)))
+            except ValueError:
+                logger.warning(f"Invalid int for {env_var}, using default={default}")
+                return default
+
+        return cls(
+            directory,
+            max_bytes=_int("BROWSER_USE_DISK_CACHE_SIZE_MB", 512) * 1024 * 1024,
+            slots=_int("BROWSER_USE_DISK_CACHE_SLOTS", 4),
+        )
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Compiled allow/deny rules for the hosts a browser may contact.
+
+Patterns follow ``BROWSER_USE_ALLOWED_DOMAINS``: ``example.com`` matches that
+host only, ``*.example.com`` matches it and every subdomain, a bare ``*``
+matches everything and a scheme (``https://example.com``) is ignored. Each
+pattern list is compiled once into a trie keyed by reversed host labels
+(``com`` -> ``example`` -> ``www``), so a lookup costs one dict step per label
+however many patterns there are. Answers are memoised per host, because a
+page asks about the same few hosts over and over.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Schemes that reach the network; anything else (about:, data:, blob:,
+# chrome:) never leaves the browser and is always allowed.
+_NETWORK_SCHEMES = {"http", "https", "ws", "wss", "ftp"}
+
+# Trie node flags. Labels never start with a NUL byte, so these cannot clash.
+_EXACT = "\0exact"
+_SUBTREE = "\0subtree"
+
+POLICY_SCOPES = ("navigation", "all")
+
+
+def _normalize_host(host: str) -> str:
+    return host.strip().lower().rstrip(".")
+
+
+def _compile(patterns: Iterable[str]) -> Dict[str, Any]:
+    root: Dict[str, Any] = {}
+    for raw in patterns:
+        pattern = raw.strip().lower()
+        if "://" in pattern:
+            pattern = urlsplit(pattern).hostname or ""
+        pattern = pattern.rstrip(".")
+        if not pattern:
+            continue
+        if pattern == "*":
+            root[_SUBTREE] = True
+            continue
+        flag = _EXACT
+        if pattern.startswith("*."):
+            flag, pattern = _SUBTREE, pattern[2:]
+        if "*" in pattern:
+            logger.warning(
+                "Domain pattern %r: only a leading '*.' wildcard is supported, ignoring.",
+                raw,
+            )
+            continue
+        node = root
+        for label in reversed(pattern.split(".")):
+            node = node.setdefault(label, {})
+        node[flag] = True
+    return root
+
+
+def _lookup(trie: Dict[str, Any], host: str) -> bool:
+    node = trie
+    if _SUBTREE in node:
+        return True
+    for label in reversed(host.split(".")):
+        node = node.get(label)
+        if node is None:
+            return False
+        if _SUBTREE in node:
+            return True
+    return _EXACT in node
+
+
+class DomainPolicy:
+    """
+    Decide whether a host or URL may be loaded.
+
+    :param allowed: Patterns a host must match; ``None`` allows every host.
+    :param denied: Patterns that are refused even when also allowed.
+    :param scope: ``navigation`` applies the allow list to page loads only;
+        ``all`` applies it to every request. The deny list always applies to
+        every request.
+    :param cache_size: Number of host answers to remember.
+    """
+
+    def __init__(
+        self,
+        allowed: Optional[Iterable[str]] = None,
+        denied: Iterable[str] = (),
+        scope: str = "navigation",
+        cache_size: int = 4096,
+    ):
+        allowed = list(allowed) if allowed is not None else None
+        denied = list(denied)
+        self._allow = _compile(allowed) if allowed is not None else None
+        self._deny = _compile(denied)
+        self.scope = scope if scope in POLICY_SCOPES else "navigation"
+        self._cache: Dict[str, bool] = {}
+        self._cache_size = cache_size
+        self.patterns = {"allowed": allowed, "denied": denied}
+
+    @property
+    def restricts(self) -> bool:
+        """Whether any host can be refused at all."""
+        return self._allow is not None or bool(self._deny)
+
+    @property
+    def filters_all_requests(self) -> bool:
+        """Whether sub-resources, not only page loads, must be checked."""
+        return bool(self._deny) or (self._allow is not None and self.scope == "all")
+
+    def allows_host(self, host: str) -> bool:
+        host = _normalize_host(host)
+        answer = self._cache.get(host)
+        if answer is None:
+            answer = not _lookup(self._deny, host) and (
+                self._allow is None or _lookup(self._allow, host)
+            )
+            if len(self._cache) >= self._cache_size:
+                self._cache.clear()
+            self._cache[host] = answer
+        return answer
+
+    def allows_url(self, url: str, navigation: bool = True) -> bool:
+        """
+        Check ``url``. Sub-resource requests (``navigation=False``) only hit the
+        allow list when the scope is ``all``.
+        """
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return False
+        if parts.scheme.lower() not in _NETWORK_SCHEMES:
+            return True
+        host = parts.hostname or ""
+        if navigation or self.scope == "all":
+            return self.allows_host(host)
+        return not self._deny or not _lookup(self._deny, _normalize_host(host))
+
+    @classmethod
+    def from_env(cls) -> "DomainPolicy":
+        """
+        Read ``BROWSER_USE_ALLOWED_DOMAINS``, ``BROWSER_USE_BLOCKED_DOMAINS``
+        and ``BROWSER_USE_DOMAIN_POLICY_SCOPE``.
+        """
+
+        def _patterns(env_var: str) -> list[str]:
+            return [item.strip() for item in os.getenv(env_var, "").split(",") if item.strip()]
+
+        scope = os.getenv("BROWSER_USE_DOMAIN_POLICY_SCOPE", "navigation").strip().lower()
+        if scope not in POLICY_SCOPES:
+            logger.warning(
+                f"Invalid BROWSER_USE_DOMAIN_POLICY_SCOPE {scope!r}, using 'navigation'."
+            )
+            scope = "navigation"
+        return cls(
+            allowed=_patterns("BROWSER_USE_ALLOWED_DOMAINS") or None,
+            denied=_patterns("BROWSER_USE_BLOCKED_DOMAINS"),
+            scope=scope,
+        )
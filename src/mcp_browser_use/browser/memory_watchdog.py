@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""Memory accounting for local Chromium processes.
+
+The browser's main process is found by its ``--remote-debugging-port``
+switch, which browser-use sets on every browser it launches. Its RSS is
+summed over the whole process tree: renderers, GPU and utility processes.
+Browsers reached through a configured CDP URL may run anywhere, even on this
+host, so they are neither measured nor killed.
+
+Processes are identified by pid and start time, so a pid reused by an
+unrelated process is never signalled. Killed processes that are children of
+this process are reaped; others are left to their parent.
+
+Process information comes from ``/proc`` on Linux. Elsewhere it comes from
+``psutil`` when that is installed; without either, the watchdog is inactive.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from browser_use import BrowserSession
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is optional
+    psutil = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_PROC = "/proc"
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _has_proc() -> bool:
+    return os.path.isdir(os.path.join(_PROC, "self"))
+
+
+def _proc_pids() -> List[int]:
+    return [int(name) for name in os.listdir(_PROC) if name.isdigit()]
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def _stat_fields(pid: int) -> Optional[List[bytes]]:
+    """Fields of ``/proc/<pid>/stat`` from the state on (field 3 of proc(5))."""
+    stat = _read(os.path.join(_PROC, str(pid), "stat"))
+    if not stat:
+        return None
+    # The command name may contain spaces; fields resume after its ")".
+    return stat[stat.rfind(b")") + 2 :].split()
+
+
+def _parent_map() -> Dict[int, int]:
+    """Map every pid to its parent pid."""
+    if not _has_proc():
+        if psutil is None:
+            return {}
+        return {proc.pid: proc.ppid() for proc in psutil.process_iter()}
+    parents = {}
+    for pid in _proc_pids():
+        fields = _stat_fields(pid)
+        if fields:
+            parents[pid] = int(fields[1])
+    return parents
+
+
+def process_tree(pid: int) -> List[int]:
+    """``pid`` and all of its descendants."""
+    children: Dict[int, List[int]] = {}
+    for child, parent in _parent_map().items():
+        children.setdefault(parent, []).append(child)
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, ()))
+    return tree
+
+
+def rss_bytes(pids: Iterable[int]) -> int:
+    """Sum of the resident set sizes of ``pids`` that still exist."""
+    total = 0
+    for pid in pids:
+        if _has_proc():
+            statm = _read(os.path.join(_PROC, str(pid), "statm"))
+            if statm:
+                total += int(statm.split()[1]) * _PAGE_SIZE
+        elif psutil is not None:
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                continue
+    return total
+
+
+def _cmdline(pid: int) -> List[str]:
+    if _has_proc():
+        raw = _read(os.path.join(_PROC, str(pid), "cmdline")) or b""
+        return [part.decode("utf-8", "replace") for part in raw.split(b"\0") if part]
+    try:
+        return psutil.Process(pid).cmdline()
+    except psutil.Error:
+        return []
+
+
+def find_browser_pid(browser_session: BrowserSession) -> Optional[int]:
+    """
+    Pid of the Chromium main process that ``browser_session`` launched.
+
+    Sessions given a CDP URL (``is_local`` false) are skipped: a browser
+    listening on the same localhost port is not theirs to measure.
+    """
+    if not getattr(browser_session, "is_local", False):
+        return None
+    cdp_url = getattr(browser_session, "cdp_url", None)
+    if not cdp_url or (not _has_proc() and psutil is None):
+        return None
+    port = urlsplit(cdp_url).port
+    host = urlsplit(cdp_url).hostname
+    if port is None or host not in {"127.0.0.1", "localhost", "::1"}:
+        return None
+    switch = f"--remote-debugging-port={port}"
+    pids = _proc_pids() if _has_proc() else psutil.pids()
+    for pid in pids:
+        args = _cmdline(pid)
+        if switch in args and not any(arg.startswith("--type=") for arg in args):
+            return pid
+    return None
+
+
+def browser_rss_bytes(browser_session: BrowserSession) -> Optional[int]:
+    """RSS of the session's whole browser process tree, if it runs locally."""
+    pid = find_browser_pid(browser_session)
+    if pid is None:
+        return None
+    return rss_bytes(process_tree(pid))
+
+
+def process_start_time(pid: int) -> Optional[float]:
+    """
+    When ``pid`` started, or ``None`` if it is gone. Only compared with
+    another reading, so the unit (clock ticks or seconds) does not matter.
+    """
+    if _has_proc():
+        fields = _stat_fields(pid)
+        return float(fields[19]) if fields else None
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).create_time()
+        except psutil.Error:
+            return None
+    return None
+
+
+def snapshot_processes(pids: Iterable[int]) -> Dict[int, float]:
+    """
+    ``pids`` with their start times, so that a process started later under a
+    reused pid is never mistaken for one of them.
+    """
+    snapshot = {}
+    for pid in pids:
+        started = process_start_time(pid)
+        if started is not None:
+            snapshot[pid] = started
+    return snapshot
+
+
+def _alive(pid: int, started: Optional[float] = None) -> bool:
+    """Whether ``pid`` still runs and, given ``started``, is still that process."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    if started is not None and process_start_time(pid) != started:
+        return False
+    # A zombie still answers kill(0); it is dead for our purposes.
+    if _has_proc():
+        fields = _stat_fields(pid)
+        return not (fields and fields[0] == b"Z")
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+    return True
+
+
+def _parent(pid: int) -> Optional[int]:
+    if _has_proc():
+        fields = _stat_fields(pid)
+        return int(fields[1]) if fields else None
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).ppid()
+        except psutil.Error:
+            return None
+    return None
+
+
+def _reap(processes: Dict[int, float]) -> None:
+    """
+    Collect the exit status of those ``processes`` that are direct children of
+    this process. Other processes are reaped by their own parent.
+    """
+    me = os.getpid()
+    for pid, started in processes.items():
+        if process_start_time(pid) != started or _parent(pid) != me:
+            continue
+        try:
+            os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            continue
+
+
+def _wait_for_exit(processes: Dict[int, float], timeout: float) -> Dict[int, float]:
+    deadline = time.monotonic() + timeout
+    while True:
+        processes = {pid: started for pid, started in processes.items() if _alive(pid, started)}
+        if not processes or time.monotonic() >= deadline:
+            return processes
+        time.sleep(0.05)
+
+
+def _signal(processes: Dict[int, float], signum: int) -> None:
+    for pid, started in processes.items():
+        # Checked right before signalling: the pid may belong to a new process.
+        if not _alive(pid, started):
+            continue
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            continue
+
+
+def kill_process_tree(processes: Dict[int, float], grace: float = 2.0) -> int:
+    """
+    Make sure ``processes`` exit once their browser has been told to stop.
+
+    ``processes`` comes from :func:`snapshot_processes`, taken before the
+    stop. Processes still running after ``grace`` seconds get ``SIGTERM``,
+    then ``SIGKILL`` after another ``grace``. A pid whose start time no longer
+    matches the snapshot belongs to another process and is left alone.
+    Signalled processes that are children of this process are reaped; the
+    rest count as exited once they are zombies.
+
+    :return: How many processes had to be signalled.
+    """
+    survivors = _wait_for_exit(dict(processes), grace)
+    if not survivors:
+        return 0
+    _signal(survivors, signal.SIGTERM)
+    _signal(_wait_for_exit(survivors, grace), getattr(signal, "SIGKILL", signal.SIGTERM))
+    _wait_for_exit(survivors, grace)
+    _reap(survivors)
+    logger.warning(
+        "Killed %d Chromium process(es) left behind by a closed session", len(survivors)
+    )
+    return len(survivors)
+
+
+@dataclass(slots=True)
+class RecyclePolicy:
+    """When a reused browser session should be replaced by a fresh one."""
+
+    max_rss_mb: float = 0.0
+    max_uses: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rss_mb > 0 or self.max_uses > 0
+
+    def reason(self, uses: int, rss: Optional[int]) -> Optional[str]:
+        """``"uses"`` or ``"memory"`` when the session is due, else ``None``."""
+        if self.max_uses > 0 and uses >= self.max_uses:
+            return "uses"
+        if self.max_rss_mb > 0 and rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+            logger.info(
+                "Browser process tree uses %.0f MB, over the %.0f MB limit",
+                rss / (1024 * 1024),
+                self.max_rss_mb,
+            )
+            return "memory"
+        return None
+
+    @classmethod
+    def from_env(cls) -> "RecyclePolicy":
+        def _number(env_var: str, default: float) -> float:
+            try:
+                return float(os.getenv(env_var, str(default)))
+            except ValueError:
+                logger.warning(f"Invalid number for {env_var}, using default={default}")
+                return default
+
+        return cls(
+            max_rss_mb=_number("MCP_SESSION_MAX_RSS_MB", 0.0),
+            max_uses=int(_number("MCP_SESSION_MAX_USES", 0)),
+        )
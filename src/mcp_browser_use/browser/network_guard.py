@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""Request blocking for agent browsers over CDP.
+
+URL patterns go to ``Network.setBlockedURLs``, so Chromium drops them without
+a round trip. Resource types go to ``Fetch.enable`` with one pattern per
+blocked type. Only those requests are paused and failed; all other traffic
+never reaches Python. A :class:`DomainPolicy` adds Document requests to the
+interception (or every request, when its scope or deny list needs it) and
+fails the ones it refuses; denied page loads are remembered so the agent can
+be told instead of retrying them. Only documents of a tab's main frame are
+page loads: an iframe document (captcha, payment, video embed) is a
+sub-resource of the page and is checked against the allow list only when the
+scope is ``all``.
+
+A blocked request has no response, so its size is unknown. The bytes saved
+are estimated from typical transfer sizes per resource type (HTTP Archive
+medians, rounded). Bytes actually loaded come from ``Network.loadingFinished``,
+for comparison.
+
+A CDP client keeps one handler per event, so a browser gets one guard for as
+long as it is open (:meth:`NetworkGuard.for_session`). Each run reconfigures
+it and starts its counts from zero.
+"""
+
+from __future__ import annotations
+
+import logging
+import weakref
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from browser_use import BrowserSession
+
+from mcp_browser_use.browser.browser_manager import NetworkBlockingConfig, session_attachments
+from mcp_browser_use.browser.domain_policy import DomainPolicy
+from mcp_browser_use.utils.metrics import BLOCKED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+TYPICAL_TRANSFER_BYTES = {
+    "Image": 40_000,
+    "Media": 500_000,
+    "Font": 30_000,
+    "Script": 25_000,
+    "Stylesheet": 10_000,
+    "XHR": 5_000,
+    "Fetch": 5_000,
+    "Other": 5_000,
+}
+
+
+class NetworkGuard:
+    """
+    Applies a :class:`NetworkBlockingConfig` and an optional :class:`DomainPolicy`
+    to the targets of one browser session.
+
+    Call :meth:`ensure_attached` whenever the agent may have switched tabs; it
+    only talks to the browser the first time it sees a target.
+    """
+
+    @classmethod
+    async def for_session(
+        cls,
+        browser_session: BrowserSession,
+        config: NetworkBlockingConfig,
+        policy: Optional[DomainPolicy] = None,
+    ) -> "NetworkGuard":
+        """
+        The guard of ``browser_session``, set up for a new run with ``config``
+        and ``policy``. Targets configured by an earlier run are configured
+        again on their next :meth:`ensure_attached`, or released from
+        interception when nothing is blocked any more.
+        """
+        attachments = session_attachments(browser_session)
+        guard = attachments.get("network_guard")
+        if guard is None:
+            guard = attachments["network_guard"] = cls(browser_session, config, policy)
+            return guard
+        guard.config = config
+        guard.policy = policy if policy is not None and policy.restricts else None
+        guard.blocked = Counter()
+        guard.denied_hosts = Counter()
+        guard._denied_navigations = []
+        guard.loaded_bytes = 0
+        if not guard.enabled:
+            await guard._detach()
+        guard._clients.clear()
+        return guard
+
+    def __init__(
+        self,
+        browser_session: BrowserSession,
+        config: NetworkBlockingConfig,
+        policy: Optional[DomainPolicy] = None,
+    ):
+        # Weak, because the session's attachments hold the guard.
+        self._session = weakref.ref(browser_session)
+        self.config = config
+        self.policy = policy if policy is not None and policy.restricts else None
+        self.blocked: Counter = Counter()
+        self.denied_hosts: Counter = Counter()
+        self._denied_navigations: List[str] = []
+        self.loaded_bytes = 0
+        self._clients: Dict[str, Any] = {}
+        # Main frame of each target; Chromium gives it the target's id.
+        self._main_frames: Dict[str, Optional[str]] = {}
+        self._registered_clients: Set[int] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled or self.policy is not None
+
+    def _fetch_patterns(self) -> List[Dict[str, str]]:
+        if self.policy is not None and self.policy.filters_all_requests:
+            return [{"urlPattern": "*", "requestStage": "Request"}]
+        kinds = set(self.config.resource_types)
+        if self.policy is not None:
+            kinds.add("Document")
+        return [
+            {"urlPattern": "*", "resourceType": kind, "requestStage": "Request"}
+            for kind in sorted(kinds)
+        ]
+
+    async def ensure_attached(self) -> None:
+        if not self.enabled:
+            return
+        browser_session = self._session()
+        if browser_session is None:
+            return
+        cdp_session = await browser_session.get_or_create_cdp_session()
+        session_id = cdp_session.session_id
+        if session_id in self._clients:
+            return
+        client = self._clients[session_id] = cdp_session.cdp_client
+        self._main_frames[session_id] = getattr(cdp_session, "target_id", None)
+        if id(client) not in self._registered_clients:
+            self._registered_clients.add(id(client))
+            client.register.Fetch.requestPaused(self._on_request_paused)
+            client.register.Network.loadingFailed(self._on_loading_failed)
+            client.register.Network.loadingFinished(self._on_loading_finished)
+
+        await client.send.Network.enable(session_id=session_id)
+        if self.config.url_patterns:
+            await client.send.Network.setBlockedURLs(
+                params={"urls": list(self.config.url_patterns)}, session_id=session_id
+            )
+        patterns = self._fetch_patterns()
+        if patterns:
+            await client.send.Fetch.enable(
+                params={"patterns": patterns}, session_id=session_id
+            )
+        logger.debug("Network blocking attached to target session %s", session_id)
+
+    async def _detach(self) -> None:
+        """Stop intercepting on every target an earlier run configured."""
+        for session_id, client in self._clients.items():
+            try:
+                await client.send.Fetch.disable(session_id=session_id)
+                await client.send.Network.setBlockedURLs(
+                    params={"urls": []}, session_id=session_id
+                )
+            except Exception as error:
+                # The tab may have been closed since.
+                logger.debug("Could not detach network blocking from %s: %s", session_id, error)
+
+    def _count(self, resource_type: Optional[str], reason: str) -> None:
+        self.blocked[resource_type or "Other"] += 1
+        BLOCKED_REQUESTS.inc(labels=(reason,))
+
+    async def _on_request_paused(
+        self, event: Dict[str, Any], session_id: Optional[str] = None
+    ) -> None:
+        client = self._clients.get(session_id) or next(iter(self._clients.values()))
+        request_id = event["requestId"]
+        resource_type = event.get("resourceType")
+        reason = None
+        if resource_type in self.config.resource_types:
+            reason = "resource_type"
+        elif self.policy is not None:
+            url = (event.get("request") or {}).get("url", "")
+            navigation = resource_type == "Document" and self._in_main_frame(event, session_id)
+            if not self.policy.allows_url(url, navigation=navigation):
+                reason = "domain"
+                self.denied_hosts[urlsplit(url).hostname or url] += 1
+                if navigation:
+                    self._denied_navigations.append(url)
+        if reason is not None:
+            self._count(resource_type, reason)
+            await client.send.Fetch.failRequest(
+                params={"requestId": request_id, "errorReason": "BlockedByClient"},
+                session_id=session_id,
+            )
+        else:
+            await client.send.Fetch.continueRequest(
+                params={"requestId": request_id}, session_id=session_id
+            )
+
+    def _in_main_frame(self, event: Dict[str, Any], session_id: Optional[str]) -> bool:
+        main_frame = self._main_frames.get(session_id)
+        frame_id = event.get("frameId")
+        return main_frame is None or frame_id is None or frame_id == main_frame
+
+    def _on_loading_failed(
+        self, event: Dict[str, Any], session_id: Optional[str] = None
+    ) -> None:
+        # ``inspector`` marks requests dropped by Network.setBlockedURLs.
+        if event.get("blockedReason") == "inspector":
+            self._count(event.get("type"), "url_pattern")
+
+    def _on_loading_finished(
+        self, event: Dict[str, Any], session_id: Optional[str] = None
+    ) -> None:
+        self.loaded_bytes += int(event.get("encodedDataLength") or 0)
+
+    def take_denied_navigations(self) -> List[str]:
+        """Page loads refused by the domain policy since the last call."""
+        denied, self._denied_navigations = self._denied_navigations, []
+        return denied
+
+    def stats(self) -> Dict[str, Any]:
+        """Blocked requests by type, estimated bytes saved and bytes loaded."""
+        return {
+            "blocked_requests": dict(self.blocked),
+            "blocked_total": sum(self.blocked.values()),
+            "estimated_bytes_saved": sum(
+                count * TYPICAL_TRANSFER_BYTES.get(kind, TYPICAL_TRANSFER_BYTES["Other"])
+                for kind, count in self.blocked.items()
+            ),
+            "loaded_bytes": self.loaded_bytes,
+            "denied_hosts": dict(self.denied_hosts),
+        }
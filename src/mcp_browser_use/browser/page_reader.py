@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""Deterministic page reading over CDP, without an LLM in the loop.
+
+These helpers back tools that only need to load a page and read it: navigate,
+wait for the page to settle, then pull the main text, links and selector
+matches out with a single script evaluation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from browser_use import BrowserSession
+from browser_use.browser.events import NavigateToUrlEvent
+
+from mcp_browser_use.utils.metrics import PAGE_SETTLE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_BOOL_TRUE = {"1", "true", "yes", "on"}
+
+# Installed once per document: counts fetch/XHR requests in flight and
+# records the time of the last network, DOM or layout activity. Only nodes
+# added or removed count as DOM activity: carousels, spinners and clocks
+# rewrite attributes and text forever and would keep a page from settling.
+_SETTLE_HOOKS_JS = """
+(() => {
+  if (window.__mcpSettle) return;
+  const state = (window.__mcpSettle = { inflight: 0, last: performance.now(), mutations: 0 });
+  const touch = () => { state.last = performance.now(); };
+  const done = () => { state.inflight = Math.max(0, state.inflight - 1); touch(); };
+  if (window.fetch) {
+    const fetch = window.fetch;
+    window.fetch = function (...args) {
+      state.inflight++;
+      touch();
+      return fetch.apply(this, args).finally(done);
+    };
+  }
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function (...args) {
+    state.inflight++;
+    touch();
+    this.addEventListener("loadend", done, { once: true });
+    return send.apply(this, args);
+  };
+  new MutationObserver((records) => {
+    state.mutations += records.length;
+    touch();
+  }).observe(document, { subtree: true, childList: true });
+  for (const type of ["resource", "layout-shift"]) {
+    try {
+      new PerformanceObserver(touch).observe({ type });
+    } catch (error) {}
+  }
+})();
+"""
+
+# Resolves once the document has loaded, no fetch/XHR is in flight and
+# neither the DOM nor the page height changed for ``quietMs``; or after
+# ``timeoutMs`` with ``settled: false``.
+_SETTLE_JS = """
+async (quietMs, timeoutMs) => {
+  const state = window.__mcpSettle;
+  const started = performance.now();
+  const height = () => (document.documentElement ? document.documentElement.scrollHeight : 0);
+  let lastHeight = height();
+  for (;;) {
+    const now = performance.now();
+    const currentHeight = height();
+    if (currentHeight !== lastHeight) {
+      lastHeight = currentHeight;
+      state.last = now;
+    }
+    const loaded = document.readyState === "complete";
+    const quiet = now - state.last >= quietMs;
+    const elapsed = now - started;
+    if ((loaded && state.inflight === 0 && quiet) || elapsed >= timeoutMs) {
+      return {
+        settled: loaded && state.inflight === 0 && quiet,
+        elapsed_ms: elapsed,
+        inflight: state.inflight,
+        mutations: state.mutations,
+        loaded,
+      };
+    }
+    await new Promise((resolve) => setTimeout(resolve, 50));
+  }
+}
+"""
+
+# Reads the main content region (``main``/``article``/``[role=main]`` when
+# present), de-duplicated absolute links and the text of selector matches.
+_READ_PAGE_JS = """
+({ selector, maxChars, maxLinks, maxMatches, includeLinks }) => {
+  const clean = (value) => (value || "").replace(/[ \\t]+/g, " ").replace(/\\n\\s*\\n+/g, "\\n").trim();
+  const main = document.querySelector("main, article, [role=main]") || document.body;
+  const text = clean(main ? main.innerText : "");
+  const result = {
+    url: location.href,
+    title: document.title,
+    text: text.slice(0, maxChars),
+    text_truncated: text.length > maxChars,
+    links: [],
+    matches: [],
+  };
+  if (includeLinks) {
+    const seen = new Set();
+    for (const anchor of document.querySelectorAll("a[href]")) {
+      const href = anchor.href;
+      if (!href.startsWith("http") || seen.has(href)) continue;
+      seen.add(href);
+      result.links.push({ text: clean(anchor.innerText).slice(0, 200), href });
+      if (result.links.length >= maxLinks) break;
+    }
+  }
+  if (selector) {
+    for (const el of [...document.querySelectorAll(selector)].slice(0, maxMatches)) {
+      const match = { text: clean(el.innerText || el.textContent).slice(0, 2000) };
+      const href = el.href || (el.closest("a[href]") || {}).href;
+      if (href) match.href = href;
+      result.matches.push(match);
+    }
+  }
+  return result;
+}
+"""
+
+
+@dataclass(slots=True)
+class PageContent:
+    """What :func:`read_page` found on a page."""
+
+    url: str
+    title: str = ""
+    text: str = ""
+    text_truncated: bool = False
+    links: List[Dict[str, str]] = field(default_factory=list)
+    matches: List[Dict[str, str]] = field(default_factory=list)
+    loaded: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+async def evaluate_in_page(browser_session: BrowserSession, expression: str) -> Any:
+    """Evaluate ``expression`` in the current page and return its JSON value."""
+
+    cdp_session = await browser_session.get_or_create_cdp_session()
+    response = await cdp_session.cdp_client.send.Runtime.evaluate(
+        params={
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": True,
+        },
+        session_id=cdp_session.session_id,
+    )
+    if response.get("exceptionDetails"):
+        details = response["exceptionDetails"]
+        message = details.get("exception", {}).get("description") or details.get(
+            "text", "script error"
+        )
+        raise RuntimeError(message)
+    return response.get("result", {}).get("value")
+
+
+async def browser_alive(browser_session: BrowserSession, timeout: float = 5.0) -> bool:
+    """Whether the browser behind ``browser_session`` still answers CDP commands."""
+
+    async def _probe() -> None:
+        cdp_session = await browser_session.get_or_create_cdp_session()
+        await cdp_session.cdp_client.send.Browser.getVersion()
+
+    try:
+        await asyncio.wait_for(_probe(), timeout)
+    except Exception:
+        return False
+    return True
+
+
+async def navigate(browser_session: BrowserSession, url: str) -> None:
+    """Navigate the current tab to ``url`` through the browser-use event bus."""
+
+    event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url))
+    await event
+    await event.event_result(raise_if_any=True, raise_if_none=False)
+
+
+@dataclass(slots=True)
+class SettleResult:
+    """Outcome of :func:`wait_for_settle`."""
+
+    settled: bool
+    elapsed_ms: float
+    inflight: int = 0
+    mutations: int = 0
+    loaded: bool = False
+
+
+async def wait_for_settle(
+    browser_session: BrowserSession, quiet_ms: float = 300.0, timeout_ms: float = 10_000.0
+) -> SettleResult:
+    """
+    Wait until the page is loaded, idle on the network and visually stable.
+
+    Returns as soon as that holds for ``quiet_ms``, and never later than
+    ``timeout_ms``. A navigation during the wait destroys the page's
+    context; the wait then continues in the new document.
+    """
+
+    started = time.perf_counter()
+    remaining = timeout_ms
+    while True:
+        try:
+            value = await asyncio.wait_for(
+                evaluate_in_page(
+                    browser_session,
+                    f"{_SETTLE_HOOKS_JS}\n({_SETTLE_JS})({quiet_ms:.0f}, {remaining:.0f})",
+                ),
+                timeout=remaining / 1000 + 1.0,
+            )
+            break
+        except asyncio.TimeoutError:
+            value = None
+            break
+        except Exception as error:
+            remaining = timeout_ms - (time.perf_counter() - started) * 1000
+            # Only a navigation (a destroyed or missing context) is worth retrying.
+            if remaining <= 0 or "context" not in str(error).lower():
+                logger.debug("Page did not settle: %s", error)
+                value = None
+                break
+            await asyncio.sleep(0.05)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not isinstance(value, dict):
+        return SettleResult(settled=False, elapsed_ms=elapsed_ms)
+    return SettleResult(
+        settled=bool(value.get("settled")),
+        elapsed_ms=elapsed_ms,
+        inflight=int(value.get("inflight") or 0),
+        mutations=int(value.get("mutations") or 0),
+        loaded=bool(value.get("loaded")),
+    )
+
+
+@dataclass(slots=True)
+class SettleConfig:
+    """
+    How long the agent waits for a page to settle before reading its state.
+
+    Off unless ``BROWSER_USE_SETTLE`` turns it on; browser-use's fixed waits
+    apply otherwise.
+    """
+
+    enabled: bool = False
+    quiet_ms: float = 300.0
+    timeout_ms: float = 5_000.0
+
+    @classmethod
+    def from_env(cls) -> "SettleConfig":
+        def _number(env_var: str, default: float) -> float:
+            try:
+                return float(os.getenv(env_var, str(default)))
+            except ValueError:
+                logger.warning(f"Invalid number for {env_var}, using default={default}")
+                return default
+
+        return cls(
+            enabled=os.getenv("BROWSER_USE_SETTLE", "false").lower() in _BOOL_TRUE,
+            quiet_ms=_number("BROWSER_USE_SETTLE_QUIET_MS", 300.0),
+            timeout_ms=_number("BROWSER_USE_SETTLE_TIMEOUT_MS", 5_000.0),
+        )
+
+
+class PageSettler:
+    """
+    Settle the pages of one browser session before each agent step.
+
+    The activity hooks are registered on every new document of each target
+    it sees, so requests a page starts while loading are counted too.
+    """
+
+    def __init__(self, browser_session: BrowserSession, config: SettleConfig):
+        self.browser_session = browser_session
+        self.config = config
+        self._installed: Set[str] = set()
+
+    async def _install(self) -> None:
+        cdp_session = await self.browser_session.get_or_create_cdp_session()
+        if cdp_session.session_id in self._installed:
+            return
+        await cdp_session.cdp_client.send.Page.addScriptToEvaluateOnNewDocument(
+            params={"source": _SETTLE_HOOKS_JS}, session_id=cdp_session.session_id
+        )
+        self._installed.add(cdp_session.session_id)
+
+    async def settle(self) -> SettleResult:
+        try:
+            await self._install()
+        except Exception as error:
+            logger.debug("Could not install page settle hooks: %s", error)
+        result = await wait_for_settle(
+            self.browser_session, self.config.quiet_ms, self.config.timeout_ms
+        )
+        PAGE_SETTLE_SECONDS.observe(
+            result.elapsed_ms / 1000, labels=("settled" if result.settled else "timeout",)
+        )
+        return result
+
+
+async def read_page(
+    browser_session: BrowserSession,
+    url: str,
+    selector: Optional[str] = None,
+    max_chars: int = 20_000,
+    include_links: bool = True,
+    max_links: int = 200,
+    max_matches: int = 50,
+    settle_timeout: float = 10.0,
+) -> PageContent:
+    """
+    Load ``url`` in ``browser_session`` and read it.
+
+    :param selector: CSS selector whose matches are returned in ``matches``.
+    :param max_chars: Upper bound on the returned main text.
+    :param include_links: Collect up to ``max_links`` unique absolute links.
+    :param settle_timeout: Seconds to wait for the page to settle before reading.
+    """
+
+    await navigate(browser_session, url)
+    settle = await wait_for_settle(browser_session, timeout_ms=settle_timeout * 1000)
+    loaded = settle.loaded
+    if not settle.settled:
+        logger.info("Page %s did not settle within %.1fs", url, settle_timeout)
+
+    arguments = {
+        "selector": selector,
+        "maxChars": max_chars,
+        "maxLinks": max_links,
+        "maxMatches": max_matches,
+        "includeLinks": include_links,
+    }
+    data = await evaluate_in_page(
+        browser_session, f"({_READ_PAGE_JS})({json.dumps(arguments)})"
+    )
+    return PageContent(loaded=loaded, **(data or {"url": url}))
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""Per-run copies of a template Chromium profile.
+
+A ``user_data_dir`` can only be used by one Chromium at a time. Parallel
+runs that need a full profile (extensions, service workers) therefore each
+get a clone of a template. Files are cloned with a copy-on-write reflink
+(``FICLONE``) where the filesystem supports it, which costs no data copy at
+all. Otherwise they are copied with :func:`shutil.copyfile`, which uses the
+kernel's in-place copy where available.
+
+Hardlinks are used only for files Chromium never rewrites in place, such as
+unpacked extensions and spell-check dictionaries. SQLite databases like
+``Cookies`` are modified in place, so a hardlink would write them back into
+the template. Caches and lock files are not cloned at all.
+
+Clones live in ``run-<pid>-<id>`` directories. They are removed when the
+browser closes, and any clone left behind by a process that no longer runs
+is removed on the next clone.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+try:  # Reflinks need ioctl; the other strategies work everywhere.
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# ioctl request number of FICLONE on Linux (_IOW(0x94, 9, int)).
+_FICLONE = 0x40049409
+
+# Directories and files that are regenerated or belong to the running browser.
+_SKIP_NAMES = frozenset(
+    {
+        "SingletonLock",
+        "SingletonSocket",
+        "SingletonCookie",
+        "lockfile",
+        "LOCK",
+        "Cache",
+        "Code Cache",
+        "GPUCache",
+        "ShaderCache",
+        "GrShaderCache",
+        "DawnCache",
+        "Crashpad",
+        "BrowserMetrics",
+    }
+)
+
+# Subtrees whose files are written once and then only read.
+_IMMUTABLE_DIRS = frozenset({"Extensions", "Dictionaries"})
+
+_CLONE_PREFIX = "run-"
+
+
+@dataclass(slots=True)
+class ProfileClone:
+    """A cloned profile directory and how its files were produced."""
+
+    path: str
+    methods: Counter = field(default_factory=Counter)
+    bytes: int = 0
+    elapsed_ms: float = 0.0
+
+
+def _reflink(source: str, destination: str) -> None:
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class ProfileCloner:
+    """
+    Clone ``template`` into run directories under ``root``.
+
+    :param template: The template ``user_data_dir``.
+    :param root: Directory that holds the clones.
+    """
+
+    def __init__(self, template: str, root: Optional[str] = None):
+        self.template = os.path.abspath(os.path.expanduser(template))
+        self.root = os.path.abspath(
+            os.path.expanduser(
+                root or os.path.join(tempfile.gettempdir(), "mcp-browser-use-profiles")
+            )
+        )
+        self._reflink_ok = fcntl is not None and sys.platform.startswith("linux")
+
+    def _clone_file(
+        self, source: str, destination: str, immutable: bool, clone: ProfileClone
+    ) -> None:
+        if self._reflink_ok:
+            try:
+                _reflink(source, destination)
+                clone.methods["reflink"] += 1
+                return
+            except OSError:
+                # Not supported by this filesystem (or across devices); stop trying.
+                self._reflink_ok = False
+                if os.path.exists(destination):
+                    os.unlink(destination)
+        if immutable:
+            try:
+                os.link(source, destination)
+                clone.methods["hardlink"] += 1
+                return
+            except OSError:
+                pass
+        shutil.copyfile(source, destination)
+        shutil.copystat(source, destination)
+        clone.methods["copy"] += 1
+
+    def clone(self) -> ProfileClone:
+        """Create a fresh clone of the template and return it."""
+        if not os.path.isdir(self.template):
+            raise FileNotFoundError(f"Profile template {self.template} does not exist")
+        self.collect_garbage()
+        started = time.perf_counter()
+        path = os.path.join(self.root, f"{_CLONE_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:12]}")
+        clone = ProfileClone(path=path)
+        try:
+            for directory, dirnames, filenames in os.walk(self.template):
+                dirnames[:] = [name for name in dirnames if name not in _SKIP_NAMES]
+                relative = os.path.relpath(directory, self.template)
+                target_dir = os.path.normpath(os.path.join(path, relative))
+                os.makedirs(target_dir, exist_ok=True)
+                immutable = bool(_IMMUTABLE_DIRS.intersection(relative.split(os.sep)))
+                for name in filenames:
+                    if name in _SKIP_NAMES:
+                        continue
+                    source = os.path.join(directory, name)
+                    if os.path.islink(source) or not os.path.isfile(source):
+                        continue
+                    self._clone_file(source, os.path.join(target_dir, name), immutable, clone)
+                    clone.bytes += os.path.getsize(source)
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        clone.elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            "Cloned profile template into %s in %.0f ms (%s)",
+            path,
+            clone.elapsed_ms,
+            ", ".join(f"{method}={count}" for method, count in sorted(clone.methods.items())),
+        )
+        return clone
+
+    def remove(self, path: str) -> None:
+        """Delete a clone made by this cloner."""
+        if os.path.dirname(os.path.abspath(path)) != self.root:
+            raise ValueError(f"{path} is not a profile clone under {self.root}")
+        shutil.rmtree(path, ignore_errors=True)
+
+    def collect_garbage(self) -> List[str]:
+        """Remove clones whose owning process has exited."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        removed = []
+        for name in names:
+            if not name.startswith(_CLONE_PREFIX):
+                continue
+            try:
+                pid = int(name[len(_CLONE_PREFIX):].split("-", 1)[0])
+            except ValueError:
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                removed.append(name)
+        if removed:
+            logger.info("Removed %d stale profile clone(s) from %s", len(removed), self.root)
+        return removed
+
+    @classmethod
+    def from_env(cls) -> Optional["ProfileCloner"]:
+        """Return a cloner when ``CHROME_PROFILE_TEMPLATE`` is set."""
+        template = os.getenv("CHROME_PROFILE_TEMPLATE")
+        if not template:
+            return None
+        return cls(template, os.getenv("CHROME_PROFILE_CLONE_DIR") or None)
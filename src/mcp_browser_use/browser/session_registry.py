@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""Named browser sessions that outlive a single tool call.
+
+A handle keeps its browser (pages, cookies, cache) between calls so a
+multi-turn workflow logs in once. Calls on one handle are serialised with a
+lock, and closing a handle waits for the call holding it. The browsers are
+``keep_alive`` sessions, which ``stop()`` leaves running, so the registry
+kills them when it closes or recycles a handle. Handles idle for longer than
+the timeout are closed by a background reaper, and the number of open handles
+is capped; when the cap is reached the least recently used idle handle is
+evicted to make room.
+
+After each call the handle may be recycled: once its browser has served
+``max_uses`` calls or its process tree has grown past ``max_rss_mb``, the
+browser is replaced by a fresh one. Its cookies and the current page's
+localStorage are carried over, so the session stays logged in. The reaper
+also checks the memory of idle handles, since a browser left on a heavy page
+keeps growing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from browser_use import BrowserSession
+
+from mcp_browser_use.browser.browser_manager import (
+    close_browser_session,
+    create_browser_session,
+    start_browser_session,
+)
+from mcp_browser_use.browser.memory_watchdog import RecyclePolicy, browser_rss_bytes
+from mcp_browser_use.browser.storage_state import apply_storage_state, export_storage_state
+from mcp_browser_use.utils.metrics import BROWSER_RSS_BYTES, OPEN_SESSIONS, SESSION_RECYCLES
+
+logger = logging.getLogger(__name__)
+
+
+def _keep_alive_session() -> BrowserSession:
+    return create_browser_session({"keep_alive": True})
+
+
+@dataclass(slots=True)
+class SessionHandle:
+    """A named, started browser session."""
+
+    name: str
+    session: BrowserSession
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    uses: int = 0
+    browser_uses: int = 0
+    recycles: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def describe(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "uses": self.uses,
+            "recycles": self.recycles,
+            "busy": self.busy,
+            "age_s": round(now - self.created_at, 1),
+            "idle_s": round(now - self.last_used, 1),
+        }
+
+
+class SessionRegistry:
+    """
+    Open, share and evict named browser sessions.
+
+    :param max_handles: Maximum number of open handles.
+    :param idle_timeout: Seconds a handle may stay unused before it is closed.
+    :param session_factory: Creates unstarted sessions; defaults to
+        :func:`create_browser_session` with ``keep_alive`` set.
+    :param recycle: When to replace a handle's browser after a call.
+    """
+
+    def __init__(
+        self,
+        max_handles: int = 4,
+        idle_timeout: float = 900.0,
+        session_factory: Optional[Callable[[], BrowserSession]] = None,
+        recycle: Optional[RecyclePolicy] = None,
+    ):
+        self.max_handles = max(1, max_handles)
+        self.idle_timeout = idle_timeout
+        self.recycle = recycle or RecyclePolicy()
+        self._session_factory = session_factory or _keep_alive_session
+        self._handles: Dict[str, SessionHandle] = {}
+        self._opening: Dict[str, asyncio.Future] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._handles
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [handle.describe() for handle in self._handles.values()]
+
+    async def open(self, name: str) -> SessionHandle:
+        """Return the handle called ``name``, starting a browser if it is new."""
+        handle = self._handles.get(name)
+        if handle is not None:
+            return handle
+        pending = self._opening.get(name)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        pending = self._opening[name] = asyncio.get_running_loop().create_future()
+        try:
+            await self._make_room()
+            session = self._session_factory()
+            try:
+                await start_browser_session(session)
+            except BaseException:
+                await close_browser_session(session, force=True)
+                raise
+            handle = self._handles[name] = SessionHandle(name=name, session=session)
+            OPEN_SESSIONS.set(len(self._handles))
+            pending.set_result(handle)
+            self._ensure_reaper()
+            logger.info("Opened browser session %r", name)
+            return handle
+        except BaseException as error:
+            pending.set_exception(error)
+            # Nobody else may be waiting; mark the exception as retrieved.
+            pending.exception()
+            raise
+        finally:
+            del self._opening[name]
+
+    async def _make_room(self) -> None:
+        if len(self._handles) + len(self._opening) <= self.max_handles:
+            return
+        idle = [handle for handle in self._handles.values() if not handle.busy]
+        if not idle:
+            raise ValueError(
+                f"All {self.max_handles} browser sessions are in use; close one first."
+            )
+        victim = min(idle, key=lambda handle: handle.last_used)
+        logger.info("Evicting browser session %r to stay under the cap", victim.name)
+        await self.close(victim.name)
+
+    @asynccontextmanager
+    async def use(self, name: str) -> AsyncIterator[BrowserSession]:
+        """Hold the session called ``name`` for one call."""
+        handle = self._handles.get(name)
+        if handle is None:
+            raise KeyError(f"No open browser session named {name!r}")
+        async with handle.lock:
+            if self._handles.get(name) is not handle:
+                raise KeyError(f"Browser session {name!r} was closed")
+            handle.uses += 1
+            handle.browser_uses += 1
+            try:
+                yield handle.session
+            finally:
+                handle.last_used = time.monotonic()
+                await self._maybe_recycle(handle)
+
+    async def _maybe_recycle(self, handle: SessionHandle) -> None:
+        if not self.recycle.enabled or self._handles.get(handle.name) is not handle:
+            return
+        rss = None
+        if self.recycle.max_rss_mb > 0:
+            rss = await asyncio.to_thread(browser_rss_bytes, handle.session)
+            if rss is not None:
+                BROWSER_RSS_BYTES.observe(rss)
+        reason = self.recycle.reason(handle.browser_uses, rss)
+        if reason is None:
+            return
+
+        logger.info("Recycling browser session %r (%s)", handle.name, reason)
+        SESSION_RECYCLES.inc(labels=(reason,))
+        state = None
+        try:
+            state = await export_storage_state(handle.session)
+        except Exception as error:
+            logger.warning("Could not save state of session %r: %s", handle.name, error)
+        await close_browser_session(handle.session, force=True)
+
+        session = self._session_factory()
+        try:
+            await start_browser_session(session)
+        except Exception as error:
+            logger.error("Could not restart browser session %r: %s", handle.name, error)
+            await close_browser_session(session, force=True)
+            self._handles.pop(handle.name, None)
+            OPEN_SESSIONS.set(len(self._handles))
+            return
+        if state is not None:
+            try:
+                await apply_storage_state(session, state)
+            except Exception as error:
+                logger.warning("Could not restore state of session %r: %s", handle.name, error)
+        handle.session = session
+        handle.browser_uses = 0
+        handle.recycles += 1
+
+    async def close(self, name: str) -> bool:
+        """Close the session called ``name``; ``False`` if there was none."""
+        handle = self._handles.pop(name, None)
+        if handle is None:
+            return False
+        OPEN_SESSIONS.set(len(self._handles))
+        # The handle is unregistered, so no new call starts on it; a call
+        # already running finishes before its browser goes away.
+        async with handle.lock:
+            await close_browser_session(handle.session, force=True)
+        logger.info("Closed browser session %r", name)
+        return True
+
+    async def evict_idle(self) -> List[str]:
+        """Close handles unused for longer than the idle timeout."""
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [
+            name
+            for name, handle in self._handles.items()
+            if not handle.busy and handle.last_used < cutoff
+        ]
+        for name in expired:
+            logger.info("Browser session %r idle for too long", name)
+            await self.close(name)
+        return expired
+
+    async def check_memory(self) -> List[str]:
+        """Recycle idle handles whose browser has grown past ``max_rss_mb``."""
+        if self.recycle.max_rss_mb <= 0:
+            return []
+        recycled = []
+        for handle in list(self._handles.values()):
+            if handle.busy:
+                continue
+            async with handle.lock:
+                recycles = handle.recycles
+                await self._maybe_recycle(handle)
+                if handle.recycles != recycles:
+                    recycled.append(handle.name)
+        return recycled
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def _reap(self) -> None:
+        interval = max(1.0, min(self.idle_timeout / 4, 30.0))
+        while self._handles:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+            await self.check_memory()
+
+    async def close_all(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        for name in list(self._handles):
+            await self.close(name)
+
+    @classmethod
+    def from_env(cls) -> "SessionRegistry":
+        def _number(env_var: str, default: float) -> float:
+            try:
+                return float(os.getenv(env_var, str(default)))
+            except ValueError:
+                logger.warning(f"Invalid number for {env_var}, using default={default}")
+                return default
+
+        return cls(
+            max_handles=int(_number("MCP_MAX_SESSIONS", 4)),
+            idle_timeout=_number("MCP_SESSION_IDLE_TIMEOUT", 900.0),
+            recycle=RecyclePolicy.from_env(),
+        )
+
+
+_REGISTRY: Optional[SessionRegistry] = None
+
+
+def get_session_registry() -> SessionRegistry:
+    """Return the process-wide registry, configured from the environment."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = SessionRegistry.from_env()
+    return _REGISTRY
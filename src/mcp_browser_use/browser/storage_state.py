@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Cookies and localStorage saved to a file and loaded into fresh browsers.
+
+The file uses Playwright's storage-state layout::
+
+    {"cookies": [...], "origins": [{"origin": "...", "localStorage": [{"name": ..., "value": ...}]}]}
+
+Loading a state needs no profile directory, so any number of concurrent
+browsers can start from the same logged-in state. Cookies are set
+browser-wide with ``Storage.setCookies``. A localStorage area can only be
+written from a page of its origin. The stored items are therefore injected
+by a script that runs before any page script of a matching origin, and only
+keys the page does not already have are filled in. The script is added to
+the tab the browser starts with. localStorage is shared by every tab of an
+origin, so the items are in place once that tab has visited the origin.
+
+State files live in one directory, ``MCP_SESSION_STATE_DIR``. MCP clients
+can only name a file in it, never pass a path, so a tool call cannot write
+cookies over an arbitrary file.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+from browser_use import BrowserSession
+
+from mcp_browser_use.browser.page_reader import evaluate_in_page
+
+logger = logging.getLogger(__name__)
+
+# Fields of a CDP ``Network.Cookie`` that ``Storage.setCookies`` accepts back.
+_COOKIE_FIELDS = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "expires",
+    "httpOnly",
+    "secure",
+    "sameSite",
+    "priority",
+    "sourceScheme",
+    "sourcePort",
+    "partitionKey",
+)
+
+_READ_LOCAL_STORAGE_JS = """
+(() => {
+  try {
+    return {origin: location.origin, items: Object.entries(localStorage)};
+  } catch (error) {
+    return {origin: location.origin, items: []};
+  }
+})()
+"""
+
+_SEED_LOCAL_STORAGE_JS = """
+(() => {
+  const items = (%s)[location.origin];
+  if (!items) return;
+  try {
+    for (const [name, value] of items) {
+      if (localStorage.getItem(name) === null) localStorage.setItem(name, value);
+    }
+  } catch (error) {}
+})();
+"""
+
+# A state file name: no separators, no leading dot, at most 128 characters.
+_STATE_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,127}")
+
+_DEFAULT_STATE_DIR = "~/.mcp-browser-use/storage-state"
+
+# Parsed state files keyed by path, reloaded when the file changes.
+_STATE_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+def _cookie_param(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    param = {key: cookie[key] for key in _COOKIE_FIELDS if key in cookie}
+    # Session cookies are reported with expires -1; setting that would
+    # create an already expired cookie.
+    if cookie.get("session") or param.get("expires", 0) < 0:
+        param.pop("expires", None)
+    return param
+
+
+async def export_storage_state(browser_session: BrowserSession) -> Dict[str, Any]:
+    """
+    Read every cookie of the browser and the localStorage of the current page.
+
+    Other origins' localStorage is not reachable without loading them, so
+    export while the page that holds the login is open.
+    """
+    cdp_session = await browser_session.get_or_create_cdp_session()
+    response = await cdp_session.cdp_client.send.Storage.getCookies(params={})
+    cookies = [_cookie_param(cookie) for cookie in response.get("cookies", [])]
+
+    origins = []
+    local_storage = await evaluate_in_page(browser_session, _READ_LOCAL_STORAGE_JS)
+    if local_storage and local_storage.get("items") and local_storage.get("origin") != "null":
+        origins.append(
+            {
+                "origin": local_storage["origin"],
+                "localStorage": [
+                    {"name": name, "value": value} for name, value in local_storage["items"]
+                ],
+            }
+        )
+    return {"cookies": cookies, "origins": origins}
+
+
+def write_storage_state(state: Dict[str, Any], path: str) -> str:
+    """
+    Write ``state`` to ``path`` atomically, readable by the owner only.
+
+    :return: The absolute path written.
+    """
+    path = os.path.abspath(os.path.expanduser(path))
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".storage-state-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return path
+
+
+def load_storage_state(path: str) -> Dict[str, Any]:
+    """Return the parsed state at ``path``, re-reading it only when it changes."""
+    path = os.path.abspath(os.path.expanduser(path))
+    mtime = os.stat(path).st_mtime_ns
+    cached = _STATE_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as handle:
+        state = json.load(handle)
+    _STATE_CACHE[path] = (mtime, state)
+    return state
+
+
+async def apply_storage_state(browser_session: BrowserSession, state: Dict[str, Any]) -> None:
+    """Load ``state`` into a started browser before it visits any page."""
+    cdp_session = await browser_session.get_or_create_cdp_session()
+    client = cdp_session.cdp_client
+
+    cookies = [_cookie_param(cookie) for cookie in state.get("cookies", [])]
+    if cookies:
+        await client.send.Storage.setCookies(params={"cookies": cookies})
+
+    by_origin = {
+        entry["origin"]: [[item["name"], item["value"]] for item in entry.get("localStorage", [])]
+        for entry in state.get("origins", [])
+        if entry.get("origin") and entry.get("localStorage")
+    }
+    if by_origin:
+        await client.send.Page.addScriptToEvaluateOnNewDocument(
+            params={"source": _SEED_LOCAL_STORAGE_JS % json.dumps(by_origin)},
+            session_id=cdp_session.session_id,
+        )
+    logger.debug(
+        "Loaded storage state: %d cookies, %d localStorage origins",
+        len(cookies),
+        len(by_origin),
+    )
+
+
+def storage_state_dir() -> str:
+    """
+    The directory of state files: ``MCP_SESSION_STATE_DIR``, else the
+    directory of ``BROWSER_USE_STORAGE_STATE``, else
+    ``~/.mcp-browser-use/storage-state``.
+    """
+    directory = os.getenv("MCP_SESSION_STATE_DIR")
+    if not directory:
+        configured = os.getenv("BROWSER_USE_STORAGE_STATE", "")
+        directory = os.path.dirname(configured) or _DEFAULT_STATE_DIR
+    return os.path.realpath(os.path.expanduser(directory))
+
+
+def _contained(path: str, directory: str) -> bool:
+    return os.path.commonpath([directory, path]) == directory
+
+
+def resolve_state_file(name: str) -> str:
+    """
+    Return the path of the state file called ``name`` in :func:`storage_state_dir`.
+
+    ``.json`` is appended when missing.
+
+    :raises ValueError: If ``name`` is not a plain file name, or resolves
+        (through a symlink) to a file outside the directory.
+    """
+    if not _STATE_NAME.fullmatch(name):
+        raise ValueError(
+            f"Invalid state name {name!r}: use letters, digits, '.', '_' and '-' only"
+        )
+    if not name.endswith(".json"):
+        name += ".json"
+    directory = storage_state_dir()
+    path = os.path.realpath(os.path.join(directory, name))
+    if not _contained(path, directory):
+        raise ValueError(f"State file {name!r} resolves outside {directory}")
+    return path
+
+
+def storage_state_path() -> Optional[str]:
+    """
+    The state file named by ``BROWSER_USE_STORAGE_STATE``, if any.
+
+    The variable holds a state name or a path; either way the file must lie
+    in :func:`storage_state_dir`, otherwise it is ignored with a warning.
+    """
+    configured = os.getenv("BROWSER_USE_STORAGE_STATE")
+    if not configured:
+        return None
+    try:
+        if os.path.dirname(configured):
+            path = os.path.realpath(os.path.expanduser(configured))
+            if not _contained(path, storage_state_dir()):
+                raise ValueError(f"{path} is outside {storage_state_dir()}")
+            return path
+        return resolve_state_file(configured)
+    except ValueError as error:
+        logger.warning("Ignoring BROWSER_USE_STORAGE_STATE: %s", error)
+        return None
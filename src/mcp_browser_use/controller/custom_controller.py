@@ -1,65 +1,397 @@
 # -*- coding: utf-8 -*-
 
+import json
 import logging
-import sys
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
-import pyperclip
 from browser_use import BrowserSession
 from browser_use.agent.views import ActionResult
 from browser_use.controller.service import Controller
+from pydantic import BaseModel, Field
+
+from mcp_browser_use.browser.browser_manager import session_attachments
+from mcp_browser_use.browser.page_reader import evaluate_in_page
+from mcp_browser_use.utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
+# Fills every field in one page round trip. Each field is located by XPath
+# (resolved from an element index) or by label text, name, id, aria-label or
+# placeholder. Values are set through the native setter and followed by
+# input/change events so framework-controlled inputs pick them up.
+_FILL_FORM_JS = """
+(fields) => {
+  const norm = (text) => (text || "").replace(/\\s+/g, " ").trim().toLowerCase();
+  const byXPath = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+  ).singleNodeValue;
+  const byLabel = (key) => {
+    const wanted = norm(key);
+    for (const label of document.querySelectorAll("label")) {
+      if (norm(label.textContent) !== wanted) continue;
+      if (label.control) return label.control;
+    }
+    const quoted = CSS.escape(key);
+    return document.querySelector(
+      `[name="${quoted}"], #${quoted}, [aria-label="${quoted}" i], [placeholder="${quoted}" i]`
+    );
+  };
+  const setNative = (el, value) => {
+    const proto = Object.getPrototypeOf(el);
+    const setter = Object.getOwnPropertyDescriptor(proto, "value")?.set;
+    setter ? setter.call(el, value) : (el.value = value);
+  };
+  return fields.map(({ field, xpath, value }) => {
+    let el;
+    try {
+      el = xpath ? byXPath(xpath) : byLabel(field);
+    } catch (error) {
+      return { field, ok: false, error: String(error) };
+    }
+    if (!el) return { field, ok: false, error: "element not found" };
+    const tag = el.tagName.toLowerCase();
+    const type = (el.getAttribute("type") || "").toLowerCase();
+    if (el.disabled || el.readOnly) return { field, ok: false, tag, error: "element is not editable" };
+    el.focus();
+    if (tag === "select") {
+      const wanted = norm(value);
+      const option = [...el.options].find(
+        (opt) => opt.value === value || norm(opt.textContent) === wanted
+      );
+      if (!option) return { field, ok: false, tag, error: "no matching option" };
+      el.value = option.value;
+    } else if (type === "checkbox" || type === "radio") {
+      el.checked = !["", "false", "0", "off", "no"].includes(norm(value));
+    } else if (el.isContentEditable) {
+      el.textContent = value;
+    } else if ("value" in el) {
+      setNative(el, value);
+    } else {
+      return { field, ok: false, tag, error: "element is not a form field" };
+    }
+    el.dispatchEvent(new Event("input", { bubbles: true }));
+    el.dispatchEvent(new Event("change", { bubbles: true }));
+    return { field, ok: true, tag };
+  });
+}
+"""
+
+
+# Extracts a table, list or repeated "card" layout into compact rows without
+# sending the DOM back: one header list plus one array of cell strings per row.
+# ``auto`` picks the largest table, then the longest list, then the largest
+# group of same-shaped siblings.
+_EXTRACT_STRUCTURED_JS = """
+({ selector, kind, columns, maxRows }) => {
+  const text = (el) => (el ? (el.innerText || el.textContent || "").replace(/\\s+/g, " ").trim() : "");
+  const link = (el) => {
+    const anchor = el && (el.closest("a[href]") || el.querySelector("a[href]"));
+    return anchor ? anchor.href : "";
+  };
+  const visible = (el) => el.offsetParent !== null || el.getClientRects().length > 0;
+
+  const fromTable = (table) => {
+    const rows = [...table.rows].filter(visible);
+    let header = table.tHead ? [...table.tHead.rows].pop() : null;
+    if (!header && rows.length && [...rows[0].cells].every((c) => c.tagName === "TH")) {
+      header = rows[0];
+    }
+    const body = rows.filter((row) => row !== header && row.parentElement !== table.tHead);
+    const width = Math.max(header ? header.cells.length : 0, ...body.map((r) => r.cells.length), 0);
+    const names = [...Array(width).keys()].map(
+      (i) => (header && text(header.cells[i])) || `column_${i + 1}`
+    );
+    return { kind: "table", columns: names, rows: body.map((row) => names.map((_, i) => text(row.cells[i]))) };
+  };
+  const fromList = (list) => ({
+    kind: "list",
+    columns: ["text", "link"],
+    rows: [...list.children].filter((li) => li.tagName === "LI" && visible(li)).map((li) => [text(li), link(li)]),
+  });
+  const fromCards = (items) => ({
+    kind: "cards",
+    columns: ["title", "text", "link"],
+    rows: items.map((card) => {
+      const title = card.querySelector("h1, h2, h3, h4, h5, h6, [role=heading], strong, b");
+      return [text(title), text(card), link(title || card)];
+    }),
+  });
+
+  const signature = (el) => el.tagName + "." + [...el.classList].sort().join(".");
+  // Groups siblings by tag and class first; only groups that could beat the
+  // best so far are checked for visibility and (layout-free) text content.
+  const hasText = (el) => /\\S/.test(el.textContent);
+  const cardGroup = (root) => {
+    let best = [];
+    for (const parent of root.querySelectorAll("*")) {
+      if (parent.children.length < 3 || parent.children.length <= best.length) continue;
+      const groups = new Map();
+      for (const child of parent.children) {
+        const key = signature(child);
+        if (!groups.has(key)) groups.set(key, []);
+        groups.get(key).push(child);
+      }
+      for (const group of groups.values()) {
+        if (group.length <= best.length) continue;
+        const cards = group.filter((child) => hasText(child) && visible(child));
+        if (cards.length > best.length) best = cards;
+      }
+    }
+    return best;
+  };
+  const largest = (nodes, size) => [...nodes].filter(visible).sort((a, b) => size(b) - size(a))[0];
+
+  const root = selector ? document.querySelector(selector) : document.body;
+  if (!root) return { error: `no element matches ${selector}` };
+  const pick = (wanted) => {
+    const tables = root.matches("table") ? [root] : root.querySelectorAll("table");
+    const lists = root.matches("ul, ol") ? [root] : root.querySelectorAll("ul, ol");
+    if (wanted === "table" || wanted === "auto") {
+      const table = largest(tables, (t) => t.rows.length);
+      if (table && (wanted === "table" || table.rows.length > 1)) return fromTable(table);
+    }
+    if (wanted === "list" || wanted === "auto") {
+      const list = largest(lists, (l) => l.children.length);
+      if (list && (wanted === "list" || list.children.length > 2)) return fromList(list);
+    }
+    if (wanted === "cards" || wanted === "auto") {
+      const cards = cardGroup(root);
+      if (cards.length) return fromCards(cards);
+    }
+    return null;
+  };
+
+  const data = pick(kind);
+  if (!data) return { error: `no ${kind === "auto" ? "table, list or cards" : kind} found` };
+  if (columns && columns.length) {
+    const wanted = columns.map((c) => String(c).toLowerCase());
+    const keep = data.columns
+      .map((name, i) => [name.toLowerCase(), i])
+      .filter(([name, i]) => wanted.includes(name) || wanted.includes(String(i)))
+      .map(([, i]) => i);
+    data.columns = keep.map((i) => data.columns[i]);
+    data.rows = data.rows.map((row) => keep.map((i) => row[i]));
+  }
+  data.total_rows = data.rows.length;
+  data.truncated = data.rows.length > maxRows;
+  data.rows = data.rows.slice(0, maxRows);
+  return data;
+}
+"""
+
+
+class FillFormAction(BaseModel):
+    """Parameters of the ``fill_form`` action."""
+
+    fields: Dict[str, str] = Field(
+        description=(
+            "Map of element index (as shown in the page state) or field label, "
+            "name, id or placeholder to the value to enter."
+        )
+    )
+
+
+class ExtractStructuredAction(BaseModel):
+    """Parameters of the ``extract_structured_data`` action."""
+
+    selector: Optional[str] = Field(
+        default=None,
+        description="CSS selector of the table, list or container to read; whole page if omitted.",
+    )
+    kind: Literal["auto", "table", "list", "cards"] = "auto"
+    columns: Optional[List[str]] = Field(
+        default=None, description="Column names or 0-based positions to keep."
+    )
+    max_rows: int = Field(default=50, ge=1, le=1000)
+
+
+class SessionClipboard:
+    """
+    In-memory clipboard of one browser session.
+
+    It lives as long as the browser, so text copied in one run on a named
+    session can be pasted in the next. Agents on other browsers never see it,
+    and the user's system clipboard is left alone.
+    """
+
+    def __init__(self) -> None:
+        self.text: Optional[str] = None
+
+    @classmethod
+    def for_session(cls, browser_session: BrowserSession) -> "SessionClipboard":
+        """The clipboard of ``browser_session``, created on first use."""
+        return session_attachments(browser_session).setdefault("clipboard", cls())
+
+    def copy(self, text: str) -> None:
+        self.text = text
+
+    def paste(self) -> Optional[str]:
+        return self.text
+
+
 class CustomController(Controller):
     """
-    A custom controller registering two clipboard actions: copy and paste.
+    A custom controller registering clipboard (copy, paste), form-filling and
+    structured-extraction actions.
     """
 
-    def __init__(self):
+    def __init__(self, clipboard: Optional[SessionClipboard] = None):
         super().__init__()
+        # Overrides the per-session clipboards when given.
+        self.clipboard = clipboard
         self._register_custom_actions()
 
+    def _clipboard(self, browser_session: BrowserSession) -> SessionClipboard:
+        if self.clipboard is not None:
+            return self.clipboard
+        return SessionClipboard.for_session(browser_session)
+
+    async def act(self, action, *args, **kwargs) -> ActionResult:
+        """Execute one action inside a trace span named after the action."""
+        params = action.model_dump(exclude_unset=True)
+        with span("controller.act", action=next(iter(params), "unknown")):
+            return await super().act(action, *args, **kwargs)
+
+    async def _insert_text(self, browser_session: BrowserSession, text: str) -> None:
+        """
+        Insert ``text`` at the focused element, like a paste.
+
+        Uses CDP ``Input.insertText`` when the session exposes CDP, otherwise
+        types the text through the ``send_keys`` action.
+        """
+        get_cdp_session = getattr(browser_session, "get_or_create_cdp_session", None)
+        if get_cdp_session is not None:
+            cdp_session = await get_cdp_session()
+            await cdp_session.cdp_client.send.Input.insertText(
+                params={"text": text}, session_id=cdp_session.session_id
+            )
+            return
+        await self.registry.execute_action(
+            "send_keys", {"keys": text}, browser_session=browser_session
+        )
+
+    async def _resolve_form_fields(
+        self, browser_session: BrowserSession, fields: Dict[str, str]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split ``fill_form`` keys into script targets and unknown indices.
+
+        Numeric keys are element indices and resolve to the element's XPath;
+        any other key is matched by the script against labels and attributes.
+        """
+        selector_map: Dict[int, Any] = {}
+        if any(key.strip().isdigit() for key in fields):
+            selector_map = await browser_session.get_selector_map()
+
+        targets: List[Dict[str, Any]] = []
+        unknown: List[Dict[str, Any]] = []
+        for key, value in fields.items():
+            if not key.strip().isdigit():
+                targets.append({"field": key, "value": value})
+                continue
+            xpath = getattr(selector_map.get(int(key)), "xpath", None)
+            if not xpath:
+                unknown.append({"field": key, "ok": False, "error": "unknown element index"})
+                continue
+            if not xpath.startswith("/"):
+                xpath = f"/{xpath}"
+            targets.append({"field": key, "xpath": xpath, "value": value})
+        return targets, unknown
+
     def _register_custom_actions(self) -> None:
         """Register all custom browser actions for this controller."""
 
         @self.registry.action("Copy text to clipboard")
-        def copy_to_clipboard(text: str) -> ActionResult:
+        def copy_to_clipboard(text: str, browser_session: BrowserSession) -> ActionResult:
             """
-            Copy the given text to the system's clipboard.
+            Copy the given text to the session clipboard.
             Returns an ActionResult with the same text as extracted_content.
             """
+            self._clipboard(browser_session).copy(text)
+            # Be cautious about logging the actual text, if sensitive
+            logger.debug("Copied text to clipboard.")
+            return ActionResult(extracted_content=text)
+
+        @self.registry.action("Paste text from clipboard", requires_browser=True)
+        async def paste_from_clipboard(browser_session: BrowserSession) -> ActionResult:
+            """
+            Paste whatever is currently in the session clipboard
+            into the focused element of the active browser page.
+            """
+            text = self._clipboard(browser_session).paste()
+            if text is None:
+                return ActionResult(error="Clipboard is empty", extracted_content=None)
+
             try:
-                pyperclip.copy(text)
-                # Be cautious about logging the actual text, if sensitive
-                logger.debug("Copied text to clipboard.")
+                await self._insert_text(browser_session, text)
+                logger.debug("Pasted clipboard text inside the browser session.")
                 return ActionResult(extracted_content=text)
             except Exception as e:
-                logger.error(f"Error copying text to clipboard: {e}")
+                logger.error(f"Error pasting text into the browser session: {e}")
                 return ActionResult(error=str(e), extracted_content=None)
 
-        @self.registry.action("Paste text from clipboard", requires_browser=True)
-        async def paste_from_clipboard(browser_session: BrowserSession) -> ActionResult:
+        @self.registry.action(
+            "Fill several form fields at once. Keys are element indices or "
+            "field labels; prefer this over one input_text action per field",
+            param_model=FillFormAction,
+        )
+        async def fill_form(
+            params: FillFormAction, browser_session: BrowserSession
+        ) -> ActionResult:
             """
-            Paste whatever is currently in the system's clipboard
-            into the active browser page by using the send_keys tool.
+            Fill all requested fields with a single script evaluation and
+            report a per-field outcome as JSON in extracted_content.
             """
             try:
-                text = pyperclip.paste()
+                targets, results = await self._resolve_form_fields(
+                    browser_session, params.fields
+                )
+                if targets:
+                    expression = f"({_FILL_FORM_JS})({json.dumps(targets)})"
+                    results = (await evaluate_in_page(browser_session, expression) or []) + results
             except Exception as e:
-                logger.error(f"Error reading text from clipboard: {e}")
+                logger.error(f"Error filling form: {e}")
                 return ActionResult(error=str(e), extracted_content=None)
 
+            filled = sum(1 for item in results if item.get("ok"))
+            summary = json.dumps(
+                {"filled": filled, "total": len(results), "fields": results}
+            )
+            if not filled:
+                return ActionResult(error=f"No form fields filled: {summary}")
+            return ActionResult(extracted_content=summary, include_in_memory=True)
+
+        @self.registry.action(
+            "Extract a table, list or repeated cards from the page as compact JSON "
+            "rows, optionally limited to some columns and rows",
+            param_model=ExtractStructuredAction,
+        )
+        async def extract_structured_data(
+            params: ExtractStructuredAction, browser_session: BrowserSession
+        ) -> ActionResult:
+            """
+            Read tabular content in the page itself and return only the
+            selected columns and rows, instead of the page's full markup.
+            """
+            arguments = {
+                "selector": params.selector,
+                "kind": params.kind,
+                "columns": params.columns,
+                "maxRows": params.max_rows,
+            }
             try:
-                modifier = "meta" if sys.platform == "darwin" else "ctrl"
-                # Use the documented tool via the registry
-                await self.registry.execute_action(
-                    "send_keys",
-                    {"keys": f"{modifier}+v"},
-                    browser_session=browser_session,
+                data = await evaluate_in_page(
+                    browser_session,
+                    f"({_EXTRACT_STRUCTURED_JS})({json.dumps(arguments)})",
                 )
-                logger.debug("Triggered paste shortcut inside the browser session.")
-                return ActionResult(extracted_content=text)
             except Exception as e:
-                logger.error(f"Error pasting text into the browser session: {e}")
+                logger.error(f"Error extracting structured data: {e}")
                 return ActionResult(error=str(e), extracted_content=None)
+
+            if not data or data.get("error"):
+                return ActionResult(error=(data or {}).get("error", "Nothing extracted"))
+            return ActionResult(
+                extracted_content=json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+                include_in_memory=True,
+            )
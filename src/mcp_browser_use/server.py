@@ -7,108 +7,327 @@ from mcp_browser_use.utils.logging import configure_logging
 configure_logging()
 
 import asyncio
+import importlib
+import json
 import logging
 import os
 import sys
+import time
 import traceback
-from typing import Any, Optional
+from contextlib import aclosing, asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from browser_use import Browser
-from fastmcp import FastMCP
-from mcp_browser_use.agent.custom_agent import CustomAgent
+from fastmcp import Context, FastMCP
+from mcp_browser_use.agent.custom_agent import CustomAgent, build_action_models
 from mcp_browser_use.controller.custom_controller import CustomController
-from mcp_browser_use.browser.browser_manager import create_browser_session
+from mcp_browser_use.browser.browser_manager import (
+    NetworkBlockingConfig,
+    close_browser_session,
+    close_prelaunched_browser_sessions,
+    create_browser_session,
+    prelaunch_browser_session,
+    start_browser_session,
+    take_prelaunched_browser_session,
+)
+from mcp_browser_use.browser.cdp_pool import close_cdp_pool
+from mcp_browser_use.browser.crawler import CrawlOptions, Crawler
+from mcp_browser_use.browser.domain_policy import DomainPolicy
+from mcp_browser_use.browser.network_guard import NetworkGuard
+from mcp_browser_use.browser.page_reader import PageSettler, SettleConfig, read_page
+from mcp_browser_use.browser.session_registry import get_session_registry
+from mcp_browser_use.browser.storage_state import (
+    export_storage_state,
+    resolve_state_file,
+    storage_state_path,
+    write_storage_state,
+)
 from mcp_browser_use.utils import utils
 from mcp_browser_use.utils.agent_state import AgentState
+from mcp_browser_use.utils.loop_watchdog import LoopWatchdog
+from mcp_browser_use.utils.metrics import (
+    ACTIVE_RUNS,
+    BLOCKED_REQUESTS,
+    METRICS,
+    QUEUED_RUNS,
+    RUNS,
+    start_metrics_http_server,
+)
+from mcp_browser_use.utils.profiling import profile_run, resolve_profile_mode
+from mcp_browser_use.utils.tracing import get_tracer, span
 
 logger = logging.getLogger(__name__)
 
 app = FastMCP("mcp_browser_use")
 
+_BOOL_TRUE = {"1", "true", "yes", "on"}
+
+# Modules imported lazily on the first agent step; the warm-up imports them
+# up front so the first call does not pay for it.
+_WARMUP_MODULES = ("instructor",)
+
+# LLM clients keyed by provider and their resolved constructor arguments,
+# including API key and endpoint, so changing those variables builds a new
+# client. They hold no per-run state, so reusing them saves rebuilding HTTP
+# clients on every call.
+_LLM_CACHE: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Any] = {}
+
+# Limits concurrent agent runs when MCP_MAX_CONCURRENT_RUNS is set; created on
+# first use so it binds to the server's event loop.
+_RUN_SLOTS: Optional[asyncio.Semaphore] = None
+
+
+def _safe_float(env_var: str, default: float) -> float:
+    """Safely parse a float from an environment variable."""
+    try:
+        return float(os.getenv(env_var, str(default)))
+    except ValueError:
+        logger.warning(f"Invalid float for {env_var}, using default={default}")
+        return default
+
+
+def _safe_int(env_var: str, default: int) -> int:
+    """Safely parse an int from an environment variable."""
+    try:
+        return int(os.getenv(env_var, str(default)))
+    except ValueError:
+        logger.warning(f"Invalid int for {env_var}, using default={default}")
+        return default
+
+
+def _env_flag(env_var: str, default: bool = False) -> bool:
+    """Parse a boolean flag using the same truthy values as the browser config."""
+    value = os.getenv(env_var)
+    if value is None:
+        return default
+    return value.lower() in _BOOL_TRUE
+
+
+@dataclass(slots=True)
+class AgentRunSettings:
+    """Model and agent-loop settings read from the ``MCP_*`` variables."""
+
+    model_provider: str = "anthropic"
+    model_name: str = "claude-3-5-sonnet-20241022"
+    temperature: float = 0.3
+    max_steps: int = 30
+    use_vision: bool = True
+    max_actions_per_step: int = 5
+    tool_call_in_content: bool = True
+
+    @classmethod
+    def from_env(cls) -> "AgentRunSettings":
+        # Fallback to defaults if parsing fails.
+        return cls(
+            model_provider=os.getenv("MCP_MODEL_PROVIDER", "anthropic"),
+            model_name=os.getenv("MCP_MODEL_NAME", "claude-3-5-sonnet-20241022"),
+            temperature=_safe_float("MCP_TEMPERATURE", 0.3),
+            max_steps=_safe_int("MCP_MAX_STEPS", 30),
+            use_vision=os.getenv("MCP_USE_VISION", "true").lower() == "true",
+            max_actions_per_step=_safe_int("MCP_MAX_ACTIONS_PER_STEP", 5),
+            tool_call_in_content=(
+                os.getenv("MCP_TOOL_CALL_IN_CONTENT", "true").lower() == "true"
+            ),
+        )
+
+
+def _get_llm(settings: AgentRunSettings) -> Any:
+    """Return a (cached) LLM client for the configured provider and model."""
+    params = utils.resolve_llm_params(
+        settings.model_provider,
+        model_name=settings.model_name,
+        temperature=settings.temperature,
+    )
+    key = (settings.model_provider, tuple(sorted(params.items())))
+    llm = _LLM_CACHE.get(key)
+    if llm is None:
+        llm = utils.get_llm_model(
+            provider=settings.model_provider,
+            model_name=settings.model_name,
+            temperature=settings.temperature,
+        )
+        _LLM_CACHE[key] = llm
+    return llm
+
+
+def _prepare_agent_components(
+    settings: AgentRunSettings,
+) -> Tuple[Any, CustomController]:
+    """
+    Build the LLM client and controller for a run.
+
+    Runs in a worker thread so it can overlap with the browser start-up.
+    """
+    llm = _get_llm(settings)
+    controller = CustomController()
+    build_action_models(controller)
+    return llm, controller
+
+
+async def _start_browser(browser_session: Browser, prelaunched: bool) -> None:
+    if not prelaunched:
+        await start_browser_session(browser_session)
+
+
+@asynccontextmanager
+async def _run_slot() -> AsyncIterator[None]:
+    """Wait for a free run slot, tracking queued and active runs in metrics."""
+    global _RUN_SLOTS
+
+    limit = _safe_int("MCP_MAX_CONCURRENT_RUNS", 0)
+    if limit > 0 and _RUN_SLOTS is None:
+        _RUN_SLOTS = asyncio.Semaphore(limit)
+    slots = _RUN_SLOTS if limit > 0 else None
+
+    if slots is not None:
+        QUEUED_RUNS.inc()
+        try:
+            await slots.acquire()
+        finally:
+            QUEUED_RUNS.dec()
+
+    ACTIVE_RUNS.inc()
+    try:
+        yield
+    finally:
+        ACTIVE_RUNS.dec()
+        if slots is not None:
+            slots.release()
+
+
+def _profiler_for_run(profile: Optional[bool]) -> Any:
+    """Return the profiling context for one run, or a no-op when it is off."""
+    mode = resolve_profile_mode(os.getenv("MCP_PROFILE"))
+    if profile is False or (profile is None and mode is None):
+        return nullcontext()
+    return profile_run(
+        mode or "sample",
+        os.getenv("MCP_PROFILE_DIR") or get_tracer().directory,
+        name="run_browser_agent",
+        interval_ms=_safe_float("MCP_PROFILE_INTERVAL_MS", 5.0),
+    )
+
 
 @app.tool()
-async def run_browser_agent(task: str, add_infos: str = "") -> str:
+async def run_browser_agent(
+    task: str,
+    add_infos: str = "",
+    include_metrics: Optional[bool] = None,
+    profile: Optional[bool] = None,
+    session: Optional[str] = None,
+) -> Union[str, Dict[str, Any]]:
     """
     This is the entrypoint for running a browser-based agent.
 
     :param task: The main instruction or goal for the agent.
     :param add_infos: Additional information or context for the agent.
-    :return: The final result string from the agent run.
+    :param include_metrics: Return ``{"result": ..., "metrics": ...}`` with
+        per-step timings and token counts. Defaults to ``MCP_INCLUDE_METRICS``.
+    :param profile: Profile this run and write the profile next to the trace
+        files. Defaults to ``MCP_PROFILE``.
+    :param session: Name of a session opened with ``open_session``. The run
+        uses that browser as it is and leaves it open afterwards.
+    :return: The final result string from the agent run, or the structured
+        response when metrics are requested.
+    """
+    async with _run_slot():
+        async with _profiler_for_run(profile):
+            with span("run_browser_agent", task=task[:200], session=session):
+                if session is None:
+                    return await _run_browser_agent(task, add_infos, include_metrics)
+                try:
+                    async with get_session_registry().use(session) as browser_session:
+                        return await _run_browser_agent(
+                            task, add_infos, include_metrics, browser_session
+                        )
+                except KeyError as e:
+                    raise ValueError(f"run-browser-agent error: {e.args[0]}") from e
+
+
+async def _run_browser_agent(
+    task: str,
+    add_infos: str,
+    include_metrics: Optional[bool],
+    shared_session: Optional[Browser] = None,
+) -> Union[str, Dict[str, Any]]:
+    """
+    Run one agent task end to end; see :func:`run_browser_agent`.
+
+    ``shared_session`` is an already started browser owned by the caller; it
+    is used instead of launching one and is not closed afterwards.
     """
 
-    browser_session: Optional[Browser] = None
+    browser_session: Optional[Browser] = shared_session
     agent_state = AgentState()
 
     try:
         # Clear any previous agent stop signals
         agent_state.clear_stop()
 
-        # Read environment variables with defaults and parse carefully
-        # Fallback to defaults if parsing fails.
-        model_provider = os.getenv("MCP_MODEL_PROVIDER", "anthropic")
-        model_name = os.getenv("MCP_MODEL_NAME", "claude-3-5-sonnet-20241022")
-
-        def safe_float(env_var: str, default: float) -> float:
-            """Safely parse a float from an environment variable."""
-            try:
-                return float(os.getenv(env_var, str(default)))
-            except ValueError:
-                logger.warning(f"Invalid float for {env_var}, using default={default}")
-                return default
+        settings = AgentRunSettings.from_env()
+        if include_metrics is None:
+            include_metrics = _env_flag("MCP_INCLUDE_METRICS")
+        setup_started = time.perf_counter()
 
-        def safe_int(env_var: str, default: int) -> int:
-            """Safely parse an int from an environment variable."""
-            try:
-                return int(os.getenv(env_var, str(default)))
-            except ValueError:
-                logger.warning(f"Invalid int for {env_var}, using default={default}")
-                return default
-
-        # Get environment variables with defaults
-        temperature = safe_float("MCP_TEMPERATURE", 0.3)
-        max_steps = safe_int("MCP_MAX_STEPS", 30)
-        use_vision = os.getenv("MCP_USE_VISION", "true").lower() == "true"
-        max_actions_per_step = safe_int("MCP_MAX_ACTIONS_PER_STEP", 5)
-        tool_call_in_content = (
-            os.getenv("MCP_TOOL_CALL_IN_CONTENT", "true").lower() == "true"
-        )
+        # Use the caller's browser, one started by the warm-up, or a fresh one
+        if browser_session is None:
+            browser_session = take_prelaunched_browser_session()
+        prelaunched = browser_session is not None
+        if browser_session is None:
+            browser_session = create_browser_session()
 
-        # Prepare LLM
-        llm = utils.get_llm_model(
-            provider=model_provider, model_name=model_name, temperature=temperature
+        # Start the browser while the LLM and controller are prepared.
+        # ``return_exceptions`` lets both finish before cleanup runs.
+        outcomes = await asyncio.gather(
+            asyncio.to_thread(_prepare_agent_components, settings),
+            _start_browser(browser_session, prelaunched),
+            return_exceptions=True,
         )
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        llm, controller = outcomes[0]
 
-        # Create a fresh browser session for this run
-        browser_session = create_browser_session()
-        await browser_session.start()
-
-        # Create controller and agent
-        controller = CustomController()
         agent = CustomAgent(
             task=task,
             add_infos=add_infos,
-            use_vision=use_vision,
+            use_vision=settings.use_vision,
             llm=llm,
             browser_session=browser_session,
             controller=controller,
-            max_actions_per_step=max_actions_per_step,
-            tool_call_in_content=tool_call_in_content,
+            max_actions_per_step=settings.max_actions_per_step,
+            tool_call_in_content=settings.tool_call_in_content,
             agent_state=agent_state,
         )
+        agent.run_metrics.provider = settings.model_provider
+        blocking = NetworkBlockingConfig.from_env(use_vision=settings.use_vision)
+        policy = DomainPolicy.from_env()
+        guard = await NetworkGuard.for_session(browser_session, blocking, policy)
+        if guard.enabled:
+            agent.network_guard = guard
+        settle = SettleConfig.from_env()
+        if settle.enabled:
+            agent.page_settler = PageSettler(browser_session, settle)
+        agent.run_metrics.setup_ms = (time.perf_counter() - setup_started) * 1000
 
         # Execute the agent task lifecycle
-        history = await agent.execute_agent_task(max_steps=max_steps)
+        history = await agent.execute_agent_task(max_steps=settings.max_steps)
 
         # Extract final result from the agent's history
         final_result = history.final_result()
         if not final_result:
             final_result = f"No final result. Possibly incomplete. {history}"
+        RUNS.inc(labels=("done" if history.is_done() else "incomplete",))
 
+        if include_metrics:
+            return {"result": final_result, "metrics": agent.run_metrics.to_dict()}
         return final_result
 
     except Exception as e:
+        RUNS.inc(labels=("error",))
         logger.error("run-browser-agent error: %s", str(e))
-        raise ValueError(f"run-browser-agent error: {e}\n{traceback.format_exc()}")
+        raise ValueError(f"run-browser-agent error: {e}\n{traceback.format_exc()}") from e
 
     finally:
         # Always ensure cleanup, even if no error.
@@ -117,25 +336,323 @@ async def run_browser_agent(task: str, add_infos: str = "") -> str:
         except Exception as stop_error:
             logger.warning("Error stopping agent state: %s", stop_error)
 
-        if browser_session:
+        if browser_session and browser_session is not shared_session:
+            await close_browser_session(browser_session)
+
+
+@app.tool()
+async def open_session(name: str) -> Dict[str, Any]:
+    """
+    Open a named browser session that stays alive across tool calls.
+
+    Pass ``session=name`` to ``run_browser_agent`` to run tasks in it; pages,
+    cookies and cache carry over between runs. Opening an existing name
+    returns it unchanged. Idle sessions are closed after
+    ``MCP_SESSION_IDLE_TIMEOUT`` seconds.
+
+    :param name: Name of the session.
+    :return: The session's description and the list of open sessions.
+    """
+    registry = get_session_registry()
+    try:
+        handle = await registry.open(name)
+    except Exception as e:
+        logger.error("open-session error: %s", str(e))
+        raise ValueError(f"open-session error: {e}") from e
+    return {"session": handle.describe(), "open_sessions": registry.list()}
+
+
+@app.tool()
+async def close_session(name: str) -> Dict[str, Any]:
+    """
+    Close a named browser session.
+
+    :param name: Name of the session.
+    :return: Whether a session was closed and the sessions still open.
+    """
+    registry = get_session_registry()
+    closed = await registry.close(name)
+    return {"closed": closed, "open_sessions": registry.list()}
+
+
+@app.tool()
+async def list_sessions() -> List[Dict[str, Any]]:
+    """List open named browser sessions with their age, idle time and use count."""
+    return get_session_registry().list()
+
+
+@app.tool()
+async def save_session_state(name: str, state_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Save the cookies and localStorage of a named session to a storage-state file.
+
+    Point ``BROWSER_USE_STORAGE_STATE`` at the file and every new browser
+    starts with that state, e.g. already logged in. localStorage is read from
+    the page the session currently shows.
+
+    :param name: Name of a session opened with ``open_session``.
+    :param state_name: Name of the state file in ``MCP_SESSION_STATE_DIR``
+        (letters, digits, ``.``, ``_`` and ``-``; ``.json`` is appended).
+        Defaults to the file of ``BROWSER_USE_STORAGE_STATE``.
+    :return: The path written and the number of cookies and origins saved.
+    """
+    try:
+        path = resolve_state_file(state_name) if state_name else storage_state_path()
+    except ValueError as e:
+        raise ValueError(f"save-session-state error: {e}") from e
+    if not path:
+        raise ValueError(
+            "save-session-state error: pass a state_name or set BROWSER_USE_STORAGE_STATE"
+        )
+    try:
+        async with get_session_registry().use(name) as browser_session:
+            state = await export_storage_state(browser_session)
+        written = await asyncio.to_thread(write_storage_state, state, path)
+    except Exception as e:
+        logger.error("save-session-state error: %s", str(e))
+        raise ValueError(f"save-session-state error: {e}") from e
+    return {
+        "path": written,
+        "cookies": len(state["cookies"]),
+        "origins": len(state["origins"]),
+    }
+
+
+@app.tool()
+async def fetch_page(
+    url: str,
+    selector: Optional[str] = None,
+    max_chars: int = 20_000,
+    include_links: bool = True,
+) -> Dict[str, Any]:
+    """
+    Load a page in a browser and return its content, without running an agent.
+
+    :param url: The page to load.
+    :param selector: Optional CSS selector; the text (and link) of each match
+        is returned in ``matches``.
+    :param max_chars: Maximum length of the returned main text.
+    :param include_links: Also return the page's unique absolute links.
+    :return: ``url``, ``title``, ``text``, ``links``, ``matches`` and whether
+        the page finished loading.
+    """
+    if not DomainPolicy.from_env().allows_url(url):
+        BLOCKED_REQUESTS.inc(labels=("domain",))
+        raise ValueError(f"fetch-page error: {url} is outside the allowed domains")
+
+    async with _run_slot():
+        with span("fetch_page", url=url):
+            browser_session = take_prelaunched_browser_session()
+            prelaunched = browser_session is not None
+            if browser_session is None:
+                browser_session = create_browser_session()
+
             try:
-                await browser_session.stop()
-            except Exception as browser_error:
-                logger.warning(
-                    "Failed to stop browser session gracefully, killing it: %s",
-                    browser_error,
+                await _start_browser(browser_session, prelaunched)
+                page = await read_page(
+                    browser_session,
+                    url,
+                    selector=selector,
+                    max_chars=max_chars,
+                    include_links=include_links,
                 )
-                if hasattr(browser_session, "kill"):
-                    await browser_session.kill()
+                return page.to_dict()
+            except Exception as e:
+                logger.error("fetch-page error: %s", str(e))
+                raise ValueError(f"fetch-page error: {e}") from e
+            finally:
+                await close_browser_session(browser_session)
 
 
-def launch_mcp_browser_use_server() -> None:
+@app.tool()
+async def crawl_urls(
+    seeds: List[str],
+    max_depth: int = 1,
+    max_pages: int = 50,
+    concurrency: int = 4,
+    same_host: bool = True,
+    allowed_domains: Optional[List[str]] = None,
+    selector: Optional[str] = None,
+    max_chars: int = 5_000,
+    ctx: Optional[Context] = None,
+) -> Dict[str, Any]:
+    """
+    Crawl from seed URLs in parallel browsers and return each page's text and links.
+
+    Pages are streamed to the client as log messages (with progress updates)
+    as soon as they are fetched; the full list is also returned at the end.
+
+    :param seeds: Start URLs.
+    :param max_depth: Link depth to follow from the seeds (0 fetches only them).
+    :param max_pages: Maximum number of pages to fetch.
+    :param concurrency: Number of browsers fetching in parallel, capped by
+        ``MCP_CRAWL_MAX_CONCURRENCY``.
+    :param same_host: Only follow links to the seeds' hosts.
+    :param allowed_domains: Further restrict links to these domain patterns;
+        ``BROWSER_USE_ALLOWED_DOMAINS`` always applies as well.
+    :param selector: Optional CSS selector whose matches are returned per page.
+    :param max_chars: Maximum text length per page.
+    :return: ``pages``, plus counts of fetched pages and errors.
+    """
+    options = CrawlOptions(
+        max_depth=max(0, max_depth),
+        max_pages=max(1, max_pages),
+        concurrency=max(1, min(concurrency, _safe_int("MCP_CRAWL_MAX_CONCURRENCY", 8))),
+        same_host=same_host,
+        allowed_domains=allowed_domains,
+        per_host_concurrency=_safe_int("MCP_CRAWL_PER_HOST_CONCURRENCY", 1),
+        per_host_delay=_safe_float("MCP_CRAWL_HOST_DELAY_MS", 500.0) / 1000,
+        max_chars=max_chars,
+        selector=selector,
+    )
+    pages: List[Dict[str, Any]] = []
+
+    async with _run_slot():
+        with span("crawl_urls", seeds=len(seeds), max_pages=options.max_pages):
+            # aclosing stops the crawl browsers as soon as the loop exits,
+            # including when reporting fails or the call is cancelled.
+            async with aclosing(Crawler(seeds, options).run()) as results:
+                async for result in results:
+                    page = result.to_dict()
+                    pages.append(page)
+                    if ctx is not None:
+                        await ctx.report_progress(len(pages), options.max_pages, result.url)
+                        await ctx.info(json.dumps(page), logger_name="crawl_urls")
+
+    return {
+        "pages": pages,
+        "fetched": sum(1 for page in pages if not page["error"]),
+        "errors": sum(1 for page in pages if page["error"]),
+    }
+
+
+@app.resource("metrics://server", mime_type="application/json")
+def server_metrics() -> str:
+    """Current server metrics (runs, browser launches, latencies, tokens) as JSON."""
+    return json.dumps(METRICS.snapshot())
+
+
+@app.resource("metrics://server/prometheus", mime_type="text/plain")
+def server_metrics_prometheus() -> str:
+    """Current server metrics in the Prometheus text exposition format."""
+    return METRICS.render_prometheus()
+
+
+async def warm_up(
+    settings: Optional[AgentRunSettings] = None, prelaunch_browser: bool = True
+) -> None:
+    """
+    Prepare everything the first ``run_browser_agent`` call would build itself.
+
+    Pre-imports lazily loaded modules, builds the LLM client and the controller
+    action models, and optionally pre-launches a browser. Failures are logged
+    and never stop the server; the run path simply builds what is missing.
+    """
+    settings = settings or AgentRunSettings.from_env()
+    started = time.perf_counter()
+
+    def _prepare() -> None:
+        for module_name in _WARMUP_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except ImportError as error:
+                logger.debug("Warm-up skipped import of %s: %s", module_name, error)
+        _prepare_agent_components(settings)
+
+    steps = [asyncio.to_thread(_prepare)]
+    if prelaunch_browser:
+        steps.append(prelaunch_browser_session())
+
+    for outcome in await asyncio.gather(*steps, return_exceptions=True):
+        if isinstance(outcome, BaseException):
+            logger.warning("Warm-up step failed: %s", outcome)
+
+    logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+async def _serve(
+    warmup: bool,
+    metrics_port: Optional[int],
+    loop_lag_threshold_ms: float = 0.0,
+    **transport_kwargs: Any,
+) -> None:
+    """
+    Run the app together with the optional start-up services.
+
+    The warm-up runs in the background so serving starts at once.
+    ``transport_kwargs`` are passed to ``app.run_async``.
+    """
+    warmup_task: Optional[asyncio.Task] = None
+    metrics_server: Optional[asyncio.AbstractServer] = None
+    watchdog: Optional[LoopWatchdog] = None
+
+    if loop_lag_threshold_ms > 0:
+        watchdog = LoopWatchdog(
+            threshold=loop_lag_threshold_ms / 1000,
+            interval=_safe_float("MCP_LOOP_LAG_INTERVAL_MS", 100.0) / 1000,
+        )
+        await watchdog.start()
+    if metrics_port:
+        metrics_server = await start_metrics_http_server(
+            os.getenv("MCP_METRICS_HOST", "127.0.0.1"), metrics_port
+        )
+    if warmup:
+        warmup_task = asyncio.create_task(
+            warm_up(prelaunch_browser=_env_flag("MCP_WARMUP_BROWSER", True))
+        )
+
+    try:
+        await app.run_async(**transport_kwargs)
+    finally:
+        if warmup_task is not None:
+            warmup_task.cancel()
+            await asyncio.gather(warmup_task, return_exceptions=True)
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        await close_prelaunched_browser_sessions()
+        await get_session_registry().close_all()
+        await close_cdp_pool()
+        if watchdog is not None:
+            await watchdog.stop()
+
+
+def launch_mcp_browser_use_server(
+    warmup: Optional[bool] = None, workers: Optional[int] = None
+) -> None:
     """
     Entry point for running the FastMCP application.
     Handles server start and final resource cleanup.
+
+    :param warmup: Run the start-up warm-up. Defaults to the ``MCP_WARMUP`` flag.
+    :param workers: Serve over HTTP/SSE from a front process that hands calls
+        to this many worker processes. Defaults to ``MCP_WORKERS``; ``0`` runs
+        everything in this process.
     """
+    if warmup is None:
+        warmup = _env_flag("MCP_WARMUP")
+    if workers is None:
+        workers = _safe_int("MCP_WORKERS", 0)
+    metrics_port = _safe_int("MCP_METRICS_PORT", 0)
+    loop_lag_threshold_ms = _safe_float("MCP_LOOP_LAG_THRESHOLD_MS", 0.0)
+
     try:
-        app.run()
+        if workers > 0:
+            from mcp_browser_use.workers import serve_workers
+
+            # Each worker runs its own warm-up, metrics server and watchdog.
+            asyncio.run(
+                serve_workers(
+                    workers,
+                    transport=os.getenv("MCP_TRANSPORT", "http"),
+                    host=os.getenv("MCP_HOST", "127.0.0.1"),
+                    port=_safe_int("MCP_PORT", 8000),
+                )
+            )
+        elif warmup or metrics_port or loop_lag_threshold_ms > 0:
+            asyncio.run(_serve(warmup, metrics_port, loop_lag_threshold_ms))
+        else:
+            app.run()
     except Exception as e:
         logger.error("Error running MCP server: %s\n%s", e, traceback.format_exc())
 
@@ -0,0 +1,111 @@
+"""Event-loop lag watchdog.
+
+A heartbeat task on the loop sleeps for a fixed interval and records how late
+it woke up; that delay is the time other callbacks held the loop. A daemon
+thread watches the heartbeat: when it has not advanced for longer than the
+threshold, the loop is stuck inside one callback, so the thread captures that
+callback's stack while the loop is still blocked. Once the loop runs again the
+heartbeat reports the stall, with its full duration and the captured stack,
+in a single log record.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+from mcp_browser_use.utils.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class LoopStall:
+    """A detected stall and the stack of the code blocking the loop."""
+
+    detected_at: float
+    blocked_ms: float
+    stack: str
+
+
+class LoopWatchdog:
+    """
+    Measure event-loop scheduling delay and report blocking callbacks.
+
+    :param threshold: Seconds the loop may be blocked before a stall is reported.
+    :param interval: Seconds between heartbeats.
+    :param keep: Number of recent stalls kept in :attr:`stalls`.
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1, keep: int = 20):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls: Deque[LoopStall] = deque(maxlen=keep)
+        self._beat = time.monotonic()
+        # (heartbeat the stall started after, stack) captured by the thread.
+        self._captured: Optional[Tuple[float, str]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def start(self) -> None:
+        """Start watching the running loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="mcp-browser-use-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            scheduled = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            previous, self._beat = self._beat, now
+            lag = max(0.0, now - scheduled)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag > self.threshold:
+                self._report_stall(previous, lag)
+
+    def _report_stall(self, beat: float, lag: float) -> None:
+        captured, self._captured = self._captured, None
+        stack = captured[1] if captured is not None and captured[0] == beat else ""
+        self.stalls.append(LoopStall(time.time(), lag * 1000, stack))
+        LOOP_STALLS.inc()
+        logger.warning(
+            "Event loop was blocked for %.0f ms; blocking stack:\n%s",
+            lag * 1000,
+            stack or "(not captured)",
+        )
+
+    def _watch(self) -> None:
+        period = min(self.interval, self.threshold / 2)
+        while not self._stop.wait(period):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            captured = self._captured
+            if blocked <= self.threshold or (captured is not None and captured[0] == beat):
+                continue
+            # Capture each stall once, while the loop is still inside it.
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            self._captured = (beat, stack)
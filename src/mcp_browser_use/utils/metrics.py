@@ -0,0 +1,392 @@
+"""In-process metrics with a Prometheus text exporter.
+
+Counters, gauges and histograms are plain Python objects: an update is a dict
+lookup and an addition, with no locks. Every update happens on the event-loop
+thread (or, for a metric owned by a background thread, only on that thread),
+so single-writer updates stay consistent without synchronisation. Histograms
+use fixed buckets chosen up front, so an observation is one ``bisect``.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans sub-second page actions up to multi-minute agent steps.
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(abc.ABC):
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Sequence[Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple("" if value is None else str(value) for value in labels)
+
+    @abc.abstractmethod
+    def render(self) -> List[str]:
+        """Prometheus text lines for this metric, without its HELP and TYPE."""
+
+    @abc.abstractmethod
+    def snapshot(self) -> Dict[str, Any]:
+        """The current values as plain JSON-serialisable data."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, labels: Sequence[Any] = ()) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, labels: Sequence[Any] = ()) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "samples": [
+                {"labels": dict(zip(self.labelnames, key)), "value": value}
+                for key, value in self._values.items()
+            ],
+        }
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, labels: Sequence[Any] = ()) -> None:
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: Sequence[Any] = ()) -> None:
+        self._values[self._key(labels)] = value
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Distribution over fixed upper bounds (Prometheus ``le`` buckets)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, labels: Sequence[Any] = ()) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # One extra slot for values above the largest bucket (+Inf).
+            series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.total += value
+        series.count += 1
+
+    def _cumulative(self, series: _HistogramSeries) -> List[Tuple[float, int]]:
+        running = 0
+        bounds = list(self.buckets) + [float("inf")]
+        cumulative = []
+        for bound, count in zip(bounds, series.counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, series in self._series.items():
+            for bound, count in self._cumulative(series):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.total)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "samples": [
+                {
+                    "labels": dict(zip(self.labelnames, key)),
+                    "count": series.count,
+                    "sum": series.total,
+                    "buckets": {
+                        _format_value(bound): count
+                        for bound, count in self._cumulative(series)
+                    },
+                }
+                for key, series in self._series.items()
+            ],
+        }
+
+
+class MetricsRegistry:
+    """Holds metrics by name and renders them for the exporters."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} already registered")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable view of every metric."""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+METRICS = MetricsRegistry()
+
+ACTIVE_RUNS = METRICS.gauge(
+    "mcp_browser_use_active_runs", "Agent runs currently executing."
+)
+QUEUED_RUNS = METRICS.gauge(
+    "mcp_browser_use_queued_runs", "Agent runs waiting for a free run slot."
+)
+RUNS = METRICS.counter(
+    "mcp_browser_use_runs_total", "Finished agent runs by outcome.", ("outcome",)
+)
+BROWSER_LAUNCHES = METRICS.counter(
+    "mcp_browser_use_browser_launches_total", "Browser sessions started."
+)
+BROWSER_LAUNCH_FAILURES = METRICS.counter(
+    "mcp_browser_use_browser_launch_failures_total", "Browser sessions that failed to start."
+)
+BROWSER_LAUNCH_SECONDS = METRICS.histogram(
+    "mcp_browser_use_browser_launch_seconds", "Time to start a browser session."
+)
+STEP_SECONDS = METRICS.histogram(
+    "mcp_browser_use_step_seconds", "Wall time of one agent step."
+)
+LLM_SECONDS = METRICS.histogram(
+    "mcp_browser_use_llm_call_seconds",
+    "Latency of LLM calls for the next action.",
+    ("provider", "model"),
+)
+LLM_TOKENS = METRICS.counter(
+    "mcp_browser_use_llm_tokens_total",
+    "Tokens reported by the provider.",
+    ("provider", "model", "direction"),
+)
+TOO_MANY_FAILURES = METRICS.counter(
+    "mcp_browser_use_too_many_failures_total",
+    "Agent runs aborted after too many consecutive step failures.",
+)
+
+BLOCKED_REQUESTS = METRICS.counter(
+    "mcp_browser_use_blocked_requests_total",
+    "Browser requests blocked by the network guard, by reason.",
+    ("reason",),
+)
+OPEN_SESSIONS = METRICS.gauge(
+    "mcp_browser_use_open_sessions", "Named browser sessions currently open."
+)
+BROWSER_RSS_BYTES = METRICS.histogram(
+    "mcp_browser_use_browser_rss_bytes",
+    "Resident memory of a reused browser's process tree, sampled between runs.",
+    buckets=tuple(mb * 1024 * 1024 for mb in (128, 256, 512, 1024, 2048, 4096, 8192)),
+)
+SESSION_RECYCLES = METRICS.counter(
+    "mcp_browser_use_session_recycles_total",
+    "Reused browser sessions replaced by a fresh browser, by reason.",
+    ("reason",),
+)
+ORPHANED_BROWSER_PROCESSES = METRICS.counter(
+    "mcp_browser_use_orphaned_browser_processes_total",
+    "Chromium processes that outlived their closed session and were killed.",
+)
+CDP_ENDPOINT_SESSIONS = METRICS.gauge(
+    "mcp_browser_use_cdp_endpoint_sessions",
+    "Browser sessions currently assigned to each pooled CDP endpoint.",
+    ("endpoint",),
+)
+CDP_ENDPOINT_EJECTIONS = METRICS.counter(
+    "mcp_browser_use_cdp_endpoint_ejections_total",
+    "Times a pooled CDP endpoint was ejected after a failed connection or health check.",
+    ("endpoint",),
+)
+PAGE_SETTLE_SECONDS = METRICS.histogram(
+    "mcp_browser_use_page_settle_seconds",
+    "Time spent waiting for a page to settle before reading it, by outcome.",
+    ("outcome",),
+)
+LOOP_LAG_SECONDS = METRICS.histogram(
+    "mcp_browser_use_event_loop_lag_seconds",
+    "Delay between a scheduled wake-up of the loop watchdog and when it ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_STALLS = METRICS.counter(
+    "mcp_browser_use_event_loop_stalls_total",
+    "Times the event loop was blocked for longer than the watchdog threshold.",
+)
+
+
+# Seconds a client may take to send its request line and headers.
+_REQUEST_TIMEOUT = 10.0
+
+
+async def _read_request_line(reader: asyncio.StreamReader) -> bytes:
+    request_line = await reader.readline()
+    # Drain the headers; the request body (if any) is ignored.
+    while (await reader.readline()).strip():
+        pass
+    return request_line
+
+
+async def _handle_metrics_request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    registry: MetricsRegistry,
+) -> None:
+    try:
+        request_line = await asyncio.wait_for(_read_request_line(reader), _REQUEST_TIMEOUT)
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            status = "200 OK"
+            body = registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            status = "404 Not Found"
+            body = b"Not Found\n"
+            content_type = "text/plain; charset=utf-8"
+        writer.write(
+            (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+        logger.debug("Metrics request failed: %r", error)
+    finally:
+        writer.close()
+
+
+async def start_metrics_http_server(
+    host: str = "127.0.0.1",
+    port: int = 9464,
+    registry: Optional[MetricsRegistry] = None,
+) -> asyncio.AbstractServer:
+    """Serve ``GET /metrics`` in Prometheus text format on ``host:port``."""
+
+    registry = registry or METRICS
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_metrics_request(reader, writer, registry),
+        host,
+        port,
+    )
+    logger.info("Serving Prometheus metrics on http://%s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,214 @@
+"""On-demand CPU profiling of the event loop while an agent run is active.
+
+A profile covers the loop thread, not the run alone: runs and other tool
+calls that share the loop appear in it too. Profile a run with nothing else
+running when its own cost matters.
+
+Two modes are available:
+
+``sample``
+    A background thread snapshots the event-loop thread's stack every few
+    milliseconds and writes the samples in the collapsed-stack format
+    (``<file>.folded``) read by ``flamegraph.pl``, speedscope and Perfetto.
+    Overhead is bounded by the sampling interval and ``await`` chains show up
+    as they execute on the loop. A sample shows whichever task the loop is
+    running at that moment, including other runs'.
+
+``cprofile``
+    The deterministic :mod:`cProfile` profiler; the result is a ``.prof``
+    pstats file for snakeviz, ``flameprof`` or ``gprof2dot``. It times every
+    call made on the loop thread, including other runs sharing the loop, and
+    only one cProfile session can be active at a time.
+
+The module only depends on the standard library. No profiler runs and no
+thread is started unless a run asks for a profile.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+
+_CPROFILE_LOCK = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Periodically records the call stack of one thread."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="mcp-browser-use-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int = 15) -> List[Tuple[str, int]]:
+        """Return the functions most often on top of the stack (self samples)."""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+@dataclass(slots=True)
+class ProfileReport:
+    """Where a run's profile went and what dominated it."""
+
+    mode: str
+    path: Optional[str] = None
+    duration_ms: float = 0.0
+    summary: str = ""
+
+
+def resolve_profile_mode(value: Optional[str]) -> Optional[str]:
+    """Map an ``MCP_PROFILE`` value to a profile mode, or ``None`` when off."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in PROFILE_MODES:
+        return value
+    if value in {"1", "true", "yes", "on"}:
+        return "sample"
+    if value not in {"0", "false", "no", "off"}:
+        logger.warning("Unknown MCP_PROFILE=%r, profiling disabled.", value)
+    return None
+
+
+def _summarise_samples(profiler: SamplingProfiler, limit: int) -> str:
+    lines = [f"{profiler.samples} samples; top functions by self samples:"]
+    for label, count in profiler.top_functions(limit):
+        share = 100 * count / max(profiler.samples, 1)
+        lines.append(f"  {share:5.1f}%  {count:6d}  {label}")
+    return "\n".join(lines)
+
+
+def _summarise_cprofile(profile: cProfile.Profile, limit: int) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("tottime").print_stats(limit)
+    return stream.getvalue()
+
+
+@asynccontextmanager
+async def profile_run(
+    mode: str,
+    directory: str,
+    name: str = "run",
+    interval_ms: float = 5.0,
+    top: int = 15,
+) -> AsyncIterator[ProfileReport]:
+    """
+    Profile the enclosed block and write the result to ``directory``.
+
+    The file is named ``profile-<name>-<id>.folded`` (sample mode) or
+    ``.prof`` (cProfile mode); the hottest functions are logged at INFO.
+
+    :param mode: One of :data:`PROFILE_MODES`.
+    :param directory: Directory for the profile file, created if missing.
+    :param name: Label used in the file name.
+    :param interval_ms: Sampling interval for the ``sample`` mode.
+    :param top: Number of hot functions to log.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unsupported profile mode {mode!r}; use one of {PROFILE_MODES}")
+
+    report = ProfileReport(mode=mode)
+    sampler: Optional[SamplingProfiler] = None
+    profile: Optional[cProfile.Profile] = None
+
+    if mode == "cprofile":
+        if not _CPROFILE_LOCK.acquire(blocking=False):
+            logger.warning("A cProfile session is already active; run not profiled.")
+            yield report
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+    else:
+        sampler = SamplingProfiler(interval=interval_ms / 1000)
+        sampler.start()
+
+    started = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        if profile is not None:
+            profile.disable()
+            _CPROFILE_LOCK.release()
+        if sampler is not None:
+            # Joining the sampler thread can take up to one interval.
+            await asyncio.to_thread(sampler.stop)
+
+        suffix = "prof" if profile is not None else "folded"
+        path = os.path.join(directory, f"profile-{name}-{uuid.uuid4().hex[:12]}.{suffix}")
+
+        def _write() -> None:
+            os.makedirs(directory, exist_ok=True)
+            if profile is not None:
+                profile.dump_stats(path)
+                report.summary = _summarise_cprofile(profile, top)
+            else:
+                sampler.write_folded(path)
+                report.summary = _summarise_samples(sampler, top)
+
+        try:
+            await asyncio.to_thread(_write)
+            report.path = path
+            logger.info(
+                "Profile of %s (%.0f ms) written to %s\n%s",
+                name,
+                report.duration_ms,
+                path,
+                report.summary,
+            )
+        except OSError as error:
+            logger.warning("Failed to write profile for %s: %s", name, error)
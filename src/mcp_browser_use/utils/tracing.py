@@ -0,0 +1,301 @@
+"""Lightweight hierarchical trace spans with a local file exporter.
+
+Spans follow the OpenTelemetry model (trace id, span id, parent, attributes)
+without depending on it. The parent span is tracked in a ``ContextVar`` so it
+follows ``await`` and tasks. A sampling decision is taken once per trace at
+its root span; spans of an unsampled trace are shared no-op objects, so the
+cost with sampling off is a context-variable lookup per span.
+
+Finished traces are written to ``MCP_TRACE_DIR`` either as JSON lines (one
+span per line) or in the Chrome trace event format, which opens directly in
+``chrome://tracing`` or https://ui.perfetto.dev.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar, Token
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+TRACE_FORMATS = ("jsonl", "chrome")
+
+# Traces are exported from executor threads; this keeps their appends to the
+# shared spans.jsonl from interleaving.
+_JSONL_LOCK = threading.Lock()
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "thread_id",
+        "_trace",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace: "_Trace",
+        parent: Optional["Span"],
+        attributes: Dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace.trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.thread_id = threading.get_ident()
+        self._trace = trace
+        self._token: Optional[Token] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _CURRENT_SPAN.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self._token is not None:
+            _CURRENT_SPAN.reset(self._token)
+        self._trace.finish(self)
+
+
+class _NoopSpan:
+    """Stand-in for spans of unsampled traces; every operation does nothing."""
+
+    __slots__ = ("_token",)
+
+    def __init__(self) -> None:
+        self._token: Optional[Token] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+class _UnsampledRoot(_NoopSpan):
+    """Marks the context as belonging to an unsampled trace."""
+
+    def __enter__(self) -> "_UnsampledRoot":
+        self._token = _CURRENT_SPAN.set(_NOOP_SPAN)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _CURRENT_SPAN.reset(self._token)
+
+
+_NOOP_SPAN = _NoopSpan()
+_CURRENT_SPAN: ContextVar[Any] = ContextVar("mcp_browser_use_span", default=None)
+
+
+class _Trace:
+    """Collects the spans of one sampled trace until its root finishes."""
+
+    def __init__(self, tracer: "Tracer"):
+        self.trace_id = uuid.uuid4().hex
+        self.tracer = tracer
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+    def finish(self, span: Span) -> None:
+        self.spans.append(span)
+        if span is self.root:
+            self.tracer.export(self)
+
+
+class Tracer:
+    """Creates spans and writes finished traces to ``directory``."""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        directory: str = "traces",
+        fmt: str = "jsonl",
+    ):
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"Unsupported trace format {fmt!r}; use one of {TRACE_FORMATS}")
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.directory = directory
+        self.format = fmt
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Return a context manager timing ``name`` as a child of the current span."""
+        parent = _CURRENT_SPAN.get()
+        if parent is _NOOP_SPAN:
+            return _NOOP_SPAN
+        if parent is None:
+            if self.sample_rate <= 0.0 or random.random() >= self.sample_rate:
+                return _UnsampledRoot()
+            trace = _Trace(self)
+            span = Span(name, trace, None, attributes)
+            trace.root = span
+            return span
+        return Span(name, parent._trace, parent, attributes)
+
+    def export(self, trace: _Trace) -> None:
+        """Write ``trace`` without blocking the event loop when one is running."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(trace)
+            return
+        loop.run_in_executor(None, self._write, trace)
+
+    def _write(self, trace: _Trace) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if self.format == "chrome":
+                path = os.path.join(self.directory, f"trace-{trace.trace_id}.json")
+                with open(path, "w", encoding="utf-8") as handle:
+                    json.dump(self._chrome_trace(trace), handle, default=str)
+            else:
+                path = os.path.join(self.directory, "spans.jsonl")
+                lines = "".join(
+                    json.dumps(span.to_dict(), default=str) + "\n" for span in trace.spans
+                )
+                with _JSONL_LOCK, open(path, "a", encoding="utf-8") as handle:
+                    handle.write(lines)
+            logger.debug("Wrote trace %s to %s", trace.trace_id, path)
+        except OSError as error:
+            logger.warning("Failed to write trace %s: %s", trace.trace_id, error)
+
+    @staticmethod
+    def _chrome_trace(trace: _Trace) -> Dict[str, Any]:
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": ((span.end_ns or span.start_ns) - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {
+                    **span.attributes,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    **({"error": span.error} if span.error else {}),
+                },
+            }
+            for span in sorted(trace.spans, key=lambda item: item.start_ns)
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": trace.trace_id},
+        }
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        try:
+            sample_rate = float(os.getenv("MCP_TRACE_SAMPLE_RATE", "0") or 0)
+        except ValueError:
+            logger.warning("Invalid MCP_TRACE_SAMPLE_RATE, tracing disabled.")
+            sample_rate = 0.0
+        fmt = os.getenv("MCP_TRACE_FORMAT", "jsonl").lower()
+        if fmt not in TRACE_FORMATS:
+            logger.warning("Invalid MCP_TRACE_FORMAT=%r, using jsonl.", fmt)
+            fmt = "jsonl"
+        return cls(
+            sample_rate=sample_rate,
+            directory=os.getenv("MCP_TRACE_DIR", "traces"),
+            fmt=fmt,
+        )
+
+
+_TRACER: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Return the process tracer, configured from the environment on first use."""
+    global _TRACER
+    if _TRACER is None:
+        _TRACER = Tracer.from_env()
+    return _TRACER
+
+
+def configure_tracer(tracer: Optional[Tracer]) -> None:
+    """Replace the process tracer; ``None`` re-reads the environment on next use."""
+    global _TRACER
+    _TRACER = tracer
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Start a span on the process tracer (see :meth:`Tracer.span`)."""
+    return get_tracer().span(name, **attributes)
+
+
+def current_span() -> Any:
+    """Return the active span, or a no-op span when nothing is being traced."""
+    current = _CURRENT_SPAN.get()
+    return _NOOP_SPAN if current is None else current
+
+
+def traced(
+    name: str,
+) -> Callable[[Callable[..., Awaitable[_T]]], Callable[..., Awaitable[_T]]]:
+    """Decorate a coroutine function so each call runs inside span ``name``."""
+
+    def decorator(func: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> _T:
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
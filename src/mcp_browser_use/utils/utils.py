@@ -92,14 +92,28 @@ def get_llm_model(provider: str, **kwargs) -> Any:
     :raises ValueError: If the provider is unsupported.
     """
 
+    llm_class, _ = _provider(provider)
+    return llm_class(**resolve_llm_params(provider, **kwargs))
+
+
+def resolve_llm_params(provider: str, **kwargs) -> Dict[str, Any]:
+    """
+    Return the constructor arguments ``get_llm_model`` would use for ``provider``,
+    with API keys and endpoints resolved from the environment.
+
+    :raises ValueError: If the provider is unsupported.
+    """
+
+    _, params_builder = _provider(provider)
+    return params_builder(kwargs)
+
+
+def _provider(provider: str) -> Tuple[Type, Callable[[Dict[str, Any]], Dict[str, Any]]]:
     try:
-        llm_class, params_builder = LLM_PROVIDERS[provider]
+        return LLM_PROVIDERS[provider]
     except KeyError as error:
         raise ValueError(f"Unsupported provider: {provider}") from error
 
-    provider_kwargs = params_builder(kwargs)
-    return llm_class(**provider_kwargs)
-
 
 # Commonly used model names for quick reference
 model_names = {
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+"""Multi-process worker mode.
+
+With ``MCP_WORKERS=N`` the server runs as one front process and ``N`` worker
+processes. The front serves MCP over HTTP or SSE and runs no agents itself.
+Each worker is a complete server with its own event loop, browser sessions,
+pre-launched browsers and run limit. It listens on a localhost socket that
+the front binds and hands over, so no port can be taken in between.
+
+The front exposes the same tools as a single-process server. Each call is
+forwarded to the worker with the fewest calls in flight. Named sessions live
+in one worker, so calls that name a session go to the worker that opened it.
+``list_sessions`` and the metrics resources combine all workers. A worker
+that exits is started again; the named sessions it held are lost.
+
+Progress and log messages a worker sends during a call are passed on to the
+front's caller. MCP log messages carry no request id, so a call that relays
+them gets a worker connection of its own for its duration.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import os
+import socket
+import sys
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastmcp import FastMCP
+from fastmcp.client import Client
+from fastmcp.client.logging import LogMessage
+
+logger = logging.getLogger(__name__)
+
+# The argument of each tool that names a session handle.
+_SESSION_ARGUMENTS = {
+    "run_browser_agent": "session",
+    "open_session": "name",
+    "close_session": "name",
+    "save_session_state": "name",
+}
+
+_RESTART_DELAY = 1.0
+
+
+class Worker:
+    """One worker process and the client the front talks to it with."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.port: Optional[int] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.client: Optional[Client] = None
+        self.in_flight = 0
+        self.ready = asyncio.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/mcp"
+
+
+class WorkerPool:
+    """
+    Start ``count`` worker processes and route tool calls to them.
+
+    :param count: Number of workers.
+    :param call_timeout: Seconds a forwarded call may take.
+    :param start_timeout: Seconds a worker may take to accept its first request.
+    :param env: Environment of the workers; defaults to this process's.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        call_timeout: float = 3600.0,
+        start_timeout: float = 60.0,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        if count < 1:
+            raise ValueError("A worker pool needs at least one worker.")
+        self.workers = [Worker(index) for index in range(count)]
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+        self.env = dict(os.environ if env is None else env)
+        self._sticky: Dict[str, int] = {}
+        self._supervisors: List[asyncio.Task] = []
+        self._stopping = False
+
+    def _worker_env(self, worker: Worker) -> Dict[str, str]:
+        env = dict(self.env)
+        env.pop("MCP_WORKERS", None)
+        env["MCP_WORKER_INDEX"] = str(worker.index)
+        metrics_port = env.get("MCP_METRICS_PORT")
+        if metrics_port and metrics_port.isdigit() and int(metrics_port) > 0:
+            # Every worker serves its own metrics, on consecutive ports.
+            env["MCP_METRICS_PORT"] = str(int(metrics_port) + worker.index)
+        return env
+
+    async def _spawn(self, worker: Worker) -> None:
+        listener = socket.create_server(("127.0.0.1", 0), backlog=128)
+        listener.set_inheritable(True)
+        worker.port = listener.getsockname()[1]
+        try:
+            worker.process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "mcp_browser_use.workers",
+                "--fd",
+                str(listener.fileno()),
+                "--port",
+                str(worker.port),
+                pass_fds=(listener.fileno(),),
+                env=self._worker_env(worker),
+            )
+        finally:
+            # The worker holds its own copy of the socket now.
+            listener.close()
+        client = Client(worker.url, timeout=self.call_timeout, init_timeout=self.start_timeout)
+        await client.__aenter__()
+        worker.client = client
+        worker.ready.set()
+        logger.info(
+            "Worker %d started (pid %d, port %d)", worker.index, worker.process.pid, worker.port
+        )
+
+    async def _disconnect(self, worker: Worker) -> None:
+        worker.ready.clear()
+        client, worker.client = worker.client, None
+        if client is not None:
+            with contextlib.suppress(Exception):
+                await client.__aexit__(None, None, None)
+
+    async def _supervise(self, worker: Worker) -> None:
+        """Start ``worker`` again whenever its process exits."""
+        while not self._stopping:
+            code = await worker.process.wait()
+            if self._stopping:
+                return
+            lost = [name for name, index in self._sticky.items() if index == worker.index]
+            for name in lost:
+                del self._sticky[name]
+            logger.warning(
+                "Worker %d exited with code %s; restarting it. Lost sessions: %s",
+                worker.index,
+                code,
+                ", ".join(lost) or "none",
+            )
+            await self._disconnect(worker)
+            await asyncio.sleep(_RESTART_DELAY)
+            try:
+                await self._spawn(worker)
+            except Exception as error:
+                logger.error("Could not restart worker %d: %s", worker.index, error)
+                # Kill a process that never became reachable; the loop retries.
+                if worker.process.returncode is None:
+                    worker.process.kill()
+
+    async def start(self) -> None:
+        await asyncio.gather(*(self._spawn(worker) for worker in self.workers))
+        self._supervisors = [
+            asyncio.create_task(self._supervise(worker)) for worker in self.workers
+        ]
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._supervisors:
+            task.cancel()
+        await asyncio.gather(*self._supervisors, return_exceptions=True)
+        for worker in self.workers:
+            await self._disconnect(worker)
+            if worker.process is not None and worker.process.returncode is None:
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            try:
+                await asyncio.wait_for(worker.process.wait(), 10)
+            except asyncio.TimeoutError:
+                worker.process.kill()
+                await worker.process.wait()
+
+    def route(self, tool: str, arguments: Dict[str, Any]) -> Worker:
+        """
+        The worker for a call: the session's owner, else the one with the
+        fewest calls in flight, then the fewest named sessions.
+        """
+        key = _SESSION_ARGUMENTS.get(tool)
+        name = arguments.get(key) if key else None
+        if name is not None and name in self._sticky:
+            return self.workers[self._sticky[name]]
+        held = Counter(self._sticky.values())
+        return min(
+            self.workers,
+            key=lambda worker: (worker.in_flight, held[worker.index], worker.index),
+        )
+
+    async def call(
+        self,
+        tool: str,
+        arguments: Dict[str, Any],
+        progress_handler: Optional[Callable[..., Awaitable[None]]] = None,
+        log_handler: Optional[Callable[..., Awaitable[None]]] = None,
+    ) -> Any:
+        """Forward one tool call and return the worker's result."""
+        worker = self.route(tool, arguments)
+        name = arguments.get(_SESSION_ARGUMENTS.get(tool, ""))
+        claimed = False
+        if tool == "open_session" and name is not None:
+            # Claim the name before awaiting, so a concurrent open of the same
+            # name is routed to this worker rather than opening a second browser.
+            claimed = name not in self._sticky
+            worker = self.workers[self._sticky.setdefault(name, worker.index)]
+        worker.in_flight += 1
+        try:
+            await asyncio.wait_for(worker.ready.wait(), self.start_timeout)
+            if log_handler is None:
+                result = await worker.client.call_tool(
+                    tool, arguments, progress_handler=progress_handler
+                )
+            else:
+                async with Client(
+                    worker.url,
+                    timeout=self.call_timeout,
+                    init_timeout=self.start_timeout,
+                    log_handler=log_handler,
+                ) as client:
+                    result = await client.call_tool(
+                        tool, arguments, progress_handler=progress_handler
+                    )
+        except BaseException:
+            if claimed and self._sticky.get(name) == worker.index:
+                del self._sticky[name]
+            raise
+        finally:
+            worker.in_flight -= 1
+
+        if tool == "close_session":
+            self._sticky.pop(name, None)
+        if result.data is not None:
+            return result.data
+        return "\n".join(block.text for block in result.content if hasattr(block, "text"))
+
+    async def list_sessions(self) -> List[Dict[str, Any]]:
+        """Named sessions of every worker, each tagged with its worker."""
+        listings = await asyncio.gather(
+            *(self._call_on(worker, "list_sessions") for worker in self.workers)
+        )
+        return [
+            {**entry, "worker": worker.index}
+            for worker, entries in zip(self.workers, listings)
+            for entry in entries or []
+        ]
+
+    async def _call_on(self, worker: Worker, tool: str) -> Any:
+        await asyncio.wait_for(worker.ready.wait(), self.start_timeout)
+        return (await worker.client.call_tool(tool, {})).data
+
+    async def read_resource(self, uri: str) -> List[str]:
+        """Text of resource ``uri`` from each worker, in worker order."""
+
+        async def _read(worker: Worker) -> str:
+            await asyncio.wait_for(worker.ready.wait(), self.start_timeout)
+            contents = await worker.client.read_resource(uri)
+            return "".join(getattr(content, "text", "") for content in contents)
+
+        return list(await asyncio.gather(*(_read(worker) for worker in self.workers)))
+
+
+def merge_prometheus(texts: List[str]) -> str:
+    """Combine per-worker expositions into one, adding a ``worker`` label."""
+    families: Dict[str, List[str]] = {}
+    headers: Dict[str, List[str]] = {}
+    for index, text in enumerate(texts):
+        family = ""
+        for line in text.splitlines():
+            if line.startswith("# "):
+                family = line.split()[2]
+                if len(headers.setdefault(family, [])) < 2:
+                    headers[family].append(line)
+                families.setdefault(family, [])
+                continue
+            if not line.strip():
+                continue
+            name, _, rest = line.partition("{")
+            if rest:
+                labelled = f'{name}{{worker="{index}",{rest}'
+            else:
+                name, _, value = line.partition(" ")
+                labelled = f'{name}{{worker="{index}"}} {value}'
+            families.setdefault(family, []).append(labelled)
+    lines: List[str] = []
+    for family, samples in families.items():
+        lines.extend(headers.get(family, []))
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def _forwarder(pool: WorkerPool, tool: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """A front tool with ``fn``'s signature and docs that forwards to a worker."""
+
+    @functools.wraps(fn)
+    async def forward(**arguments: Any) -> Any:
+        ctx = arguments.pop("ctx", None)
+        progress_handler = log_handler = None
+        if ctx is not None:
+
+            async def progress_handler(
+                progress: float, total: Optional[float], message: Optional[str]
+            ) -> None:
+                await ctx.report_progress(progress, total, message)
+
+            async def log_handler(message: LogMessage) -> None:
+                data = message.data
+                if isinstance(data, dict) and "msg" in data:
+                    text, extra = data["msg"], data.get("extra")
+                else:
+                    text, extra = data if isinstance(data, str) else json.dumps(data), None
+                await ctx.log(text, level=message.level, logger_name=message.logger, extra=extra)
+
+        return await pool.call(tool, arguments, progress_handler, log_handler)
+
+    return forward
+
+
+async def build_front_app(pool: WorkerPool) -> FastMCP:
+    """The front server: the app's tools and metrics, forwarded to ``pool``."""
+    from mcp_browser_use.server import app
+
+    front = FastMCP(app.name)
+    for tool in await app.list_tools():
+        if tool.name == "list_sessions":
+
+            @functools.wraps(tool.fn)
+            async def list_sessions() -> List[Dict[str, Any]]:
+                return await pool.list_sessions()
+
+            front.add_tool(list_sessions)
+        else:
+            front.add_tool(_forwarder(pool, tool.name, tool.fn))
+
+    @front.resource("metrics://server", mime_type="application/json")
+    async def server_metrics() -> str:
+        """Metrics of every worker as JSON, keyed by worker index."""
+        texts = await pool.read_resource("metrics://server")
+        return json.dumps({str(index): json.loads(text) for index, text in enumerate(texts)})
+
+    @front.resource("metrics://server/prometheus", mime_type="text/plain")
+    async def server_metrics_prometheus() -> str:
+        """Metrics of every worker in Prometheus format, with a ``worker`` label."""
+        return merge_prometheus(await pool.read_resource("metrics://server/prometheus"))
+
+    return front
+
+
+async def serve_workers(
+    count: int, transport: str = "http", host: str = "127.0.0.1", port: int = 8000
+) -> None:
+    """
+    Run the front server on ``transport`` with ``count`` workers behind it.
+
+    :param count: Number of worker processes.
+    :param transport: ``"http"``, ``"sse"`` or ``"stdio"``.
+    :param host: Interface of the front's HTTP listener.
+    :param port: Port of the front's HTTP listener.
+    """
+    from mcp_browser_use.server import _safe_float
+
+    pool = WorkerPool(count, call_timeout=_safe_float("MCP_WORKER_CALL_TIMEOUT", 3600.0))
+    try:
+        await pool.start()
+        logger.info("Started %d workers", count)
+        front = await build_front_app(pool)
+        if transport == "stdio":
+            await front.run_async(transport="stdio")
+        else:
+            await front.run_async(transport=transport, host=host, port=port)
+    finally:
+        await pool.stop()
+
+
+def _worker_main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of a worker process, started by :class:`WorkerPool`."""
+    from mcp_browser_use import server
+
+    parser = argparse.ArgumentParser(description="mcp-browser-use worker process")
+    parser.add_argument("--fd", type=int, required=True, help="Inherited listening socket.")
+    parser.add_argument("--port", type=int, required=True, help="Port of that socket.")
+    args = parser.parse_args(argv)
+
+    listener = socket.socket(fileno=args.fd)
+    asyncio.run(
+        server._serve(
+            server._env_flag("MCP_WARMUP"),
+            server._safe_int("MCP_METRICS_PORT", 0),
+            server._safe_float("MCP_LOOP_LAG_THRESHOLD_MS", 0.0),
+            transport="http",
+            host="127.0.0.1",
+            port=args.port,
+            sockets=[listener],
+            show_banner=False,
+        )
+    )
+
+
+if __name__ == "__main__":
+    _worker_main()
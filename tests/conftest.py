@@ -1,10 +1,13 @@
 """Test fixtures and environment setup for the test suite."""
 
 import importlib
+import inspect
 import os
 import sys
 import types
 
+import pytest
+
 BASE_DIR = os.path.dirname(__file__)
 STUBS_DIR = os.path.join(BASE_DIR, "stubs")
 SRC_DIR = os.path.join(os.path.dirname(BASE_DIR), "src")
@@ -46,3 +49,114 @@ if "langchain_ollama" not in sys.modules:
     module.ChatOllama = ChatOllama
     sys.modules["langchain_ollama"] = module
 
+
+class _CDPDomain:
+    def __init__(self, binder, domain):
+        self._binder = binder
+        self._domain = domain
+
+    def __getattr__(self, method):
+        return self._binder._bind(f"{self._domain}.{method}")
+
+
+class _CDPNamespace:
+    def __init__(self, binder):
+        self._binder = binder
+
+    def __getattr__(self, domain):
+        return _CDPDomain(self._binder, domain)
+
+
+class FakeCDPClient:
+    """
+    Recording stand-in for browser-use's CDP client.
+
+    ``send.<Domain>.<method>(params, session_id)`` is recorded in ``sent`` as
+    ``(method, params, session_id)`` and answered from ``responses[method]``:
+    a value, an exception to raise, a list consumed one answer per call, or a
+    callable taking ``(params, session_id)``. Unanswered commands return
+    ``{}``. ``register.<Domain>.<event>(handler)`` stores the handler in
+    ``handlers``.
+    """
+
+    def __init__(self, responses=None):
+        self.sent = []
+        self.handlers = {}
+        self.responses = dict(responses or {})
+        self.send = _CDPNamespace(_Sender(self))
+        self.register = _CDPNamespace(_Registrar(self))
+
+    def methods(self, session_id=None):
+        return [
+            method for method, _params, session in self.sent
+            if session_id is None or session == session_id
+        ]
+
+    async def _answer(self, method, params, session_id):
+        self.sent.append((method, params, session_id))
+        answer = self.responses.get(method, {})
+        if isinstance(answer, list):
+            answer = answer.pop(0)
+        if callable(answer):
+            answer = answer(params, session_id)
+            if inspect.isawaitable(answer):
+                answer = await answer
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class _Sender:
+    def __init__(self, client):
+        self._client = client
+
+    def _bind(self, method):
+        async def send(params=None, session_id=None):
+            return await self._client._answer(method, params, session_id)
+
+        return send
+
+
+class _Registrar:
+    def __init__(self, client):
+        self._client = client
+
+    def _bind(self, method):
+        def register(handler):
+            self._client.handlers[method] = handler
+
+        return register
+
+
+class FakeCDPSession:
+    """A CDP session (one target) on a :class:`FakeCDPClient`."""
+
+    def __init__(self, client=None, session_id="target-1", target_id=None):
+        self.cdp_client = client or FakeCDPClient()
+        self.session_id = session_id
+        self.target_id = target_id or f"{session_id}-frame"
+
+    @property
+    def sent(self):
+        return self.cdp_client.sent
+
+    def on_target(self, session_id):
+        """Another target's session on the same client."""
+        return FakeCDPSession(self.cdp_client, session_id)
+
+    def expressions(self):
+        """Expressions passed to ``Runtime.evaluate``, in order."""
+        return [
+            params["expression"] for method, params, _session in self.sent
+            if method == "Runtime.evaluate"
+        ]
+
+
+@pytest.fixture
+def fake_cdp_session():
+    """Factory of recording CDP sessions: ``fake_cdp_session(responses, session_id)``."""
+
+    def factory(responses=None, session_id="target-1"):
+        return FakeCDPSession(FakeCDPClient(responses), session_id)
+
+    return factory
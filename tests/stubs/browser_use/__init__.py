@@ -30,6 +30,7 @@ class Browser:
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             setattr(self, key, value)
+        self.browser_profile = BrowserProfile(**kwargs)
         self._pages: list[BrowserPage] = []
         self._started = False
 
@@ -1,3 +1,70 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from .views import ManagedMessage, MessageHistory
+
+
 class MessageManager:
-    def __init__(self, *args, **kwargs):
-        pass
+    """Small stand-in for the upstream manager with the same token accounting."""
+
+    def __init__(
+        self,
+        llm=None,
+        task="",
+        action_descriptions="",
+        system_prompt_class=None,
+        max_input_tokens=128000,
+        estimated_tokens_per_character=3,
+        image_tokens=800,
+        include_attributes=None,
+        max_error_length=400,
+        max_actions_per_step=10,
+        **kwargs,
+    ):
+        self.llm = llm
+        self.task = task
+        self.max_input_tokens = max_input_tokens
+        self.estimated_tokens_per_character = estimated_tokens_per_character
+        self.image_tokens = image_tokens
+        self.include_attributes = include_attributes or []
+        self.max_error_length = max_error_length
+        self.history = MessageHistory()
+        if system_prompt_class is not None:
+            self.system_prompt = system_prompt_class(
+                action_descriptions, max_actions_per_step=max_actions_per_step
+            ).get_system_message()
+
+    def _count_tokens(self, message):
+        content = message.content
+        if isinstance(content, list):
+            tokens = 0
+            for part in content:
+                if part.get("type") == "image_url":
+                    tokens += self.image_tokens
+                else:
+                    tokens += len(part.get("text", "")) // self.estimated_tokens_per_character
+            return tokens
+        return len(str(content)) // self.estimated_tokens_per_character
+
+    def _add_message_with_tokens(self, message):
+        tokens = self._count_tokens(message)
+        self.history.messages.append(ManagedMessage(message=message, tokens=tokens))
+        self.history.total_tokens += tokens
+
+    def _remove_last_state_message(self):
+        if self.history.messages and isinstance(self.history.messages[-1].message, HumanMessage):
+            removed = self.history.messages.pop()
+            self.history.total_tokens -= removed.tokens
+
+    def add_model_output(self, model_output):
+        tool_calls = [
+            {
+                "name": "AgentOutput",
+                "args": model_output.model_dump(mode="json", exclude_unset=True),
+                "id": "",
+                "type": "tool_call",
+            }
+        ]
+        self._add_message_with_tokens(AIMessage(content="", tool_calls=tool_calls))
+
+    def get_messages(self):
+        return [managed.message for managed in self.history.messages]
@@ -9,3 +9,4 @@ class MessageHistory:
 @dataclass
 class ManagedMessage:
     message: Any
+    tokens: int = 0
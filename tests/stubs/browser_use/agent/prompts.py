@@ -1,2 +1,13 @@
+from datetime import datetime
+
+from langchain_core.messages import SystemMessage
+
+
 class SystemPrompt:
-    pass
+    def __init__(self, action_description="", current_date=None, max_actions_per_step=10):
+        self.default_action_description = action_description
+        self.current_date = current_date or datetime.now()
+        self.max_actions_per_step = max_actions_per_step
+
+    def get_system_message(self):
+        return SystemMessage(content=self.default_action_description)
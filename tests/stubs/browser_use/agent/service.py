@@ -1,4 +1,83 @@
+from browser_use.agent.views import ActionResult, AgentHistory, AgentHistoryList
+from browser_use.browser.views import BrowserStateHistory
+
+
+class _Telemetry:
+    def capture(self, event):
+        pass
+
+
 class Agent:
-    def __init__(self, *args, **kwargs):
-        self.history = kwargs.get('history', None)
+    def __init__(
+        self,
+        task="",
+        llm=None,
+        browser=None,
+        browser_session=None,
+        controller=None,
+        use_vision=True,
+        save_conversation_path=None,
+        max_failures=5,
+        retry_delay=10,
+        system_prompt_class=None,
+        max_input_tokens=128000,
+        validate_output=False,
+        include_attributes=(),
+        max_error_length=400,
+        max_actions_per_step=10,
+        tool_call_in_content=True,
+        **kwargs,
+    ):
+        self.task = task
+        self.llm = llm
+        self.controller = controller
+        self.use_vision = use_vision
+        self.save_conversation_path = save_conversation_path
+        self.max_failures = max_failures
+        self.system_prompt_class = system_prompt_class
+        self.max_input_tokens = max_input_tokens
+        self.validate_output = validate_output
+        self.include_attributes = list(include_attributes)
+        self.max_error_length = max_error_length
+        self.max_actions_per_step = max_actions_per_step
+        self.browser = browser or browser_session
+        self.browser_context = self.browser
+        self.injected_browser = self.browser is not None
+        self.injected_browser_context = self.browser is not None
+        self.history = kwargs.get('history', AgentHistoryList())
         self.generate_gif = False
+        self.n_steps = 1
+        self.consecutive_failures = 0
+        self._last_result = None
+        self.agent_id = "stub-agent"
+        self.telemetry = _Telemetry()
+        if controller is not None:
+            self._setup_action_models()
+
+    def _setup_action_models(self):
+        pass
+
+    def _too_many_failures(self):
+        return self.consecutive_failures >= self.max_failures
+
+    def _handle_step_error(self, error):
+        self.consecutive_failures += 1
+        return [ActionResult(error=str(error), include_in_memory=True)]
+
+    def _save_conversation(self, input_messages, model_output):
+        pass
+
+    def _make_history_item(self, model_output, state, result):
+        state_history = BrowserStateHistory(
+            url=getattr(state, "url", ""),
+            title=getattr(state, "title", ""),
+            tabs=getattr(state, "tabs", []),
+            interacted_element=[None],
+            screenshot=getattr(state, "screenshot", None),
+        )
+        self.history.history.append(
+            AgentHistory(model_output=model_output, state=state_history, result=result)
+        )
+
+    async def _validate_output(self):
+        return True
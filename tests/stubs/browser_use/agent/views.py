@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from typing import Any, List, Optional
 
+from pydantic import BaseModel, ConfigDict
+
 @dataclass
 class ActionResult:
     extracted_content: Optional[str] = None
@@ -24,9 +26,17 @@ class AgentHistoryList:
                     return True
         return False
 
+    def final_result(self) -> Optional[str]:
+        if self.history and self.history[-1].result:
+            return self.history[-1].result[-1].extracted_content
+        return None
+
 @dataclass
 class AgentStepInfo:
     step_number: int = 0
 
-class AgentOutput:
-    pass
+class AgentOutput(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    current_state: Any = None
+    action: List[Any] = []
@@ -6,3 +6,9 @@ class SendKeysEvent:
 class ScreenshotEvent:
     def __init__(self, full_page: bool = False):
         self.full_page = full_page
+
+
+class NavigateToUrlEvent:
+    def __init__(self, url: str, new_tab: bool = False):
+        self.url = url
+        self.new_tab = new_tab
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
 
 @dataclass
 class BrowserStateHistory:
@@ -11,3 +12,8 @@ class BrowserStateHistory:
 @dataclass
 class BrowserState:
     screenshot: str | None = None
+    url: str = ""
+    title: str = ""
+    tabs: list = field(default_factory=list)
+    element_tree: Any = None
+    selector_map: dict = field(default_factory=dict)
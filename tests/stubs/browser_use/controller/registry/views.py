@@ -1,2 +1,5 @@
-class ActionModel:
+from pydantic import BaseModel
+
+
+class ActionModel(BaseModel):
     pass
@@ -1,12 +1,32 @@
+from typing import Any, Dict, Optional
+
+from pydantic import create_model
+
+from browser_use.agent.views import ActionResult
+from browser_use.controller.registry.views import ActionModel
+
+
+class _ActionRegistry:
+    def __init__(self):
+        self.actions: Dict[str, Any] = {}
+
+
 class _Registry:
+    def __init__(self):
+        self.registry = _ActionRegistry()
+
     def get_prompt_description(self):
-        return ""
+        return "\n".join(sorted(self.registry.actions))
 
     def create_action_model(self):
-        return type("ActionModel", (), {})
+        fields = {
+            name: (Optional[Dict[str, Any]], None) for name in self.registry.actions
+        }
+        return create_model("ActionModel", __base__=ActionModel, **fields)
 
     def action(self, *_args, **_kwargs):
         def decorator(func):
+            self.registry.actions[func.__name__] = func
             return func
 
         return decorator
@@ -16,5 +36,18 @@ class Controller:
     def __init__(self):
         self.registry = _Registry()
 
-    async def multi_act(self, actions, context):  # pragma: no cover - stub
-        return []
+        @self.registry.action("Complete the task")
+        def done(text: str) -> ActionResult:
+            return ActionResult(extracted_content=text, is_done=True)
+
+    async def act(self, action, browser_session=None, **kwargs):
+        for name, params in action.model_dump(exclude_unset=True).items():
+            params = params or {}
+            return ActionResult(
+                extracted_content=params.get("text"),
+                is_done=name == "done",
+            )
+        return ActionResult()
+
+    async def multi_act(self, actions, context):
+        return [await self.act(action, context) for action in actions]
@@ -1,4 +1,23 @@
-class BaseMessage: pass
-class HumanMessage: pass
-class AIMessage: pass
-class SystemMessage: pass
+class BaseMessage:
+    type = "base"
+
+    def __init__(self, content="", **kwargs):
+        self.content = content
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class HumanMessage(BaseMessage):
+    type = "human"
+
+
+class AIMessage(BaseMessage):
+    type = "ai"
+
+    def __init__(self, content="", tool_calls=None, **kwargs):
+        super().__init__(content, **kwargs)
+        self.tool_calls = tool_calls or []
+
+
+class SystemMessage(BaseMessage):
+    type = "system"
@@ -0,0 +1,159 @@
+"""Smoke tests keeping the offline benchmarks runnable."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import textwrap
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import (  # noqa: E402
+    bench_agent_loop,
+    bench_dom_scaling,
+    bench_launch_presets,
+    load_test,
+)
+
+# Stands in for Chromium: announces a DevTools port in the profile directory,
+# answers /json requests and fires a load event after fetching each URL.
+FAKE_CHROME = textwrap.dedent(
+    """
+    import asyncio, json, os, sys, urllib.request
+    import websockets
+
+    profile = next(a.split("=", 1)[1] for a in sys.argv if a.startswith("--user-data-dir="))
+
+    async def cdp(websocket):
+        async for raw in websocket:
+            message = json.loads(raw)
+            await websocket.send(json.dumps({"id": message["id"], "result": {}}))
+            if message["method"] == "Page.navigate":
+                await asyncio.to_thread(urllib.request.urlopen(message["params"]["url"]).read)
+                await websocket.send(json.dumps({"method": "Page.loadEventFired", "params": {}}))
+            elif message["method"] == "Browser.close":
+                os._exit(0)
+
+    def http(connection, request):
+        if request.path.startswith("/json"):
+            port = connection.local_address[1]
+            page = {"type": "page", "webSocketDebuggerUrl": f"ws://127.0.0.1:{port}/page"}
+            return connection.respond(200, json.dumps([page] if request.path == "/json/list" else {}))
+
+    async def main():
+        async with websockets.serve(cdp, "127.0.0.1", 0, process_request=http) as server:
+            port = server.sockets[0].getsockname()[1]
+            with open(os.path.join(profile, "DevToolsActivePort"), "w") as handle:
+                handle.write(f"{port}\\n/devtools/browser\\n")
+            await asyncio.Future()
+
+    asyncio.run(main())
+    """
+)
+
+
+def test_agent_loop_benchmark_writes_report(tmp_path):
+    output = tmp_path / "agent_loop.json"
+
+    exit_code = bench_agent_loop.main(
+        ["--iterations", "2", "--steps", "3", "--elements", "20", "--output", str(output)]
+    )
+
+    assert exit_code == 0
+    report = json.loads(output.read_text())
+    names = {entry["name"] for entry in report["results"]}
+    assert {"execute_agent_task_per_step", "prompt_building", "output_parsing"} <= names
+
+
+def test_agent_loop_benchmark_flags_regressions(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    bench_agent_loop.main(
+        ["--iterations", "2", "--steps", "2", "--elements", "10", "--output", str(baseline)]
+    )
+    report = json.loads(baseline.read_text())
+    for entry in report["results"]:
+        entry["median_ms"] /= 1000
+    baseline.write_text(json.dumps(report))
+
+    exit_code = bench_agent_loop.main(
+        [
+            "--iterations", "2", "--steps", "2", "--elements", "10",
+            "--output", str(tmp_path / "current.json"),
+            "--baseline", str(baseline),
+        ]
+    )
+
+    assert exit_code == 1
+
+
+def test_dom_scaling_benchmark_records_memory(tmp_path):
+    output = tmp_path / "dom_scaling.json"
+
+    exit_code = bench_dom_scaling.main(
+        ["--iterations", "1", "--sizes", "10,50", "--tabs", "2", "--output", str(output)]
+    )
+
+    assert exit_code == 0
+    results = json.loads(output.read_text())["results"]
+    assert {entry["params"]["elements"] for entry in results} == {10, 50}
+    assert all(entry["peak_memory_kb"] > 0 for entry in results)
+
+
+def test_load_test_reports_levels(tmp_path):
+    output = tmp_path / "load_test.json"
+
+    exit_code = load_test.main(
+        [
+            "--concurrency", "1,3",
+            "--requests-per-client", "1",
+            "--steps", "2",
+            "--elements", "10",
+            "--llm-latency-ms", "1",
+            "--browser-latency-ms", "1",
+            "--output", str(output),
+        ]
+    )
+
+    assert exit_code == 0
+    report = json.loads(output.read_text())
+    assert [level["concurrency"] for level in report["results"]] == [1, 3]
+    assert all(level["throughput_rps"] > 0 for level in report["results"])
+
+
+def test_find_saturation_marks_first_flat_level():
+    levels = [
+        {"concurrency": 1, "throughput_rps": 10.0},
+        {"concurrency": 2, "throughput_rps": 19.0},
+        {"concurrency": 4, "throughput_rps": 20.0},
+    ]
+
+    assert load_test.find_saturation(levels) == 4
+    assert levels[1]["scaling_efficiency"] == 0.95
+
+
+def test_launch_preset_benchmark_reports_every_preset(tmp_path):
+    chrome = tmp_path / "chrome"
+    chrome.write_text(f"#!{sys.executable}\n{FAKE_CHROME}")
+    chrome.chmod(0o755)
+    output = tmp_path / "launch_presets.json"
+
+    exit_code = bench_launch_presets.main(
+        [
+            "--chrome", str(chrome),
+            "--iterations", "1",
+            "--warmup", "0",
+            "--presets", "default,low-memory",
+            "--output", str(output),
+        ]
+    )
+
+    assert exit_code == 0
+    results = json.loads(output.read_text())["results"]
+    launches = [entry for entry in results if entry["name"] == "launch"]
+    assert [entry["params"]["preset"] for entry in launches] == ["default", "low-memory"]
+    assert all(entry["rss_mb"] > 0 for entry in launches)
+    pages = {entry["params"]["page"] for entry in results if entry["name"] == "page_load"}
+    assert pages == set(bench_launch_presets.FIXTURE_PAGES)
@@ -20,6 +20,14 @@ def clear_browser_env(monkeypatch):
         "BROWSER_USE_CDP_URL",
         "CHROME_DEBUGGING_HOST",
         "CHROME_DEBUGGING_PORT",
+        "BROWSER_USE_BLOCK_PROFILE",
+        "BROWSER_USE_BLOCK_RESOURCE_TYPES",
+        "BROWSER_USE_BLOCK_URL_PATTERNS",
+        "BROWSER_USE_BLOCK_IMAGES",
+        "BROWSER_USE_SETTLE",
+        "BROWSER_USE_LAUNCH_PRESET",
+        "BROWSER_USE_HEADLESS",
+        "BROWSER_USE_EXTRA_CHROMIUM_ARGS",
     ):
         monkeypatch.delenv(key, raising=False)
 
@@ -53,3 +61,73 @@ def test_create_browser_session_preserves_computed_cdp_url(monkeypatch):
 
     assert isinstance(session, DummyBrowserSession)
     assert captured_kwargs["cdp_url"] == "http://localhost:9000"
+
+
+def test_network_blocking_disabled_by_default():
+    config = browser_manager.NetworkBlockingConfig.from_env()
+
+    assert not config.enabled
+
+
+def test_network_blocking_combines_profiles_types_and_patterns(monkeypatch):
+    monkeypatch.setenv("BROWSER_USE_BLOCK_PROFILE", "lean, bogus")
+    monkeypatch.setenv("BROWSER_USE_BLOCK_RESOURCE_TYPES", "xhr,Stylesheet,nonsense")
+    monkeypatch.setenv("BROWSER_USE_BLOCK_URL_PATTERNS", "*.mp4,*doubleclick.net*")
+    monkeypatch.setenv("BROWSER_USE_BLOCK_IMAGES", "true")
+
+    config = browser_manager.NetworkBlockingConfig.from_env(use_vision=False)
+
+    assert config.resource_types == {"Media", "Font", "XHR", "Stylesheet", "Image"}
+    assert "*.mp4" in config.url_patterns
+    assert config.url_patterns.count("*doubleclick.net*") == 1
+
+
+def test_network_blocking_keeps_images_when_vision_is_on(monkeypatch):
+    monkeypatch.setenv("BROWSER_USE_BLOCK_PROFILE", "images")
+
+    assert not browser_manager.NetworkBlockingConfig.from_env(use_vision=True).enabled
+    assert browser_manager.NetworkBlockingConfig.from_env(use_vision=False).resource_types == {
+        "Image"
+    }
+
+
+def test_settle_detector_replaces_fixed_page_waits(monkeypatch):
+    session = browser_manager.create_browser_session()
+    assert not hasattr(session, "wait_for_network_idle_page_load_time")
+
+    monkeypatch.setenv("BROWSER_USE_SETTLE", "true")
+    session = browser_manager.create_browser_session()
+    assert session.wait_for_network_idle_page_load_time == 0.0
+
+
+def test_launch_preset_sets_flags_viewport_and_scale(monkeypatch):
+    monkeypatch.setenv("BROWSER_USE_LAUNCH_PRESET", "low-memory")
+    monkeypatch.setenv("BROWSER_USE_EXTRA_CHROMIUM_ARGS", "--renderer-process-limit=4")
+
+    kwargs = browser_manager.BrowserEnvironmentConfig.from_env().to_kwargs()
+
+    assert kwargs["headless"] is True
+    assert kwargs["viewport"] == {"width": 1024, "height": 768}
+    assert kwargs["device_scale_factor"] == 1.0
+    assert "--process-per-site" in kwargs["args"]
+    # Extra args come last so they override the preset's switches.
+    assert kwargs["args"][-1] == "--renderer-process-limit=4"
+
+
+def test_explicit_headless_wins_over_preset(monkeypatch):
+    monkeypatch.setenv("BROWSER_USE_LAUNCH_PRESET", "fast-headless")
+    monkeypatch.setenv("BROWSER_USE_HEADLESS", "false")
+
+    config = browser_manager.BrowserEnvironmentConfig.from_env()
+
+    assert config.headless is False
+    assert config.viewport == (1280, 720)
+
+
+def test_unknown_launch_preset_keeps_defaults(monkeypatch):
+    monkeypatch.setenv("BROWSER_USE_LAUNCH_PRESET", "turbo")
+
+    kwargs = browser_manager.BrowserEnvironmentConfig.from_env().to_kwargs()
+
+    assert "args" not in kwargs
+    assert "viewport" not in kwargs
@@ -0,0 +1,225 @@
+"""Tests for the concurrent crawler and the ``crawl_urls`` tool."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.browser import crawler
+from mcp_browser_use.browser.page_reader import PageContent
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+SITE = {
+    "https://example.com/": ["/a", "/b#top", "https://example.com/a?", "https://other.org/"],
+    "https://example.com/a": ["/c", "/"],
+    "https://example.com/b": ["/c?y=2&x=1"],
+    "https://example.com/c": [],
+    "https://example.com/c?x=1&y=2": ["/d"],
+    "https://other.org/": [],
+}
+
+
+class FakeSession:
+    def __init__(self):
+        self.state = []
+        self.alive = True
+
+    async def start(self):
+        self.state.append("start")
+
+    async def stop(self):
+        self.state.append("stop")
+
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    sessions = []
+    fetched = []
+
+    def factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    async def fake_read_page(session, url, selector=None, max_chars=0, **kwargs):
+        fetched.append((url, time.monotonic()))
+        await asyncio.sleep(0.005)
+        if url not in SITE:
+            raise RuntimeError("404")
+        base = url.split("/", 3)
+        links = [
+            {"href": link if link.startswith("http") else f"{base[0]}//{base[2]}{link}"}
+            for link in SITE[url]
+        ]
+        return PageContent(url=url, title=url, text="body", links=links)
+
+    async def fake_browser_alive(session):
+        return session.alive
+
+    monkeypatch.setattr(crawler, "read_page", fake_read_page)
+    monkeypatch.setattr(crawler, "browser_alive", fake_browser_alive)
+    monkeypatch.delenv("BROWSER_USE_ALLOWED_DOMAINS", raising=False)
+    return sessions, fetched, factory
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("HTTPS://Example.COM", "https://example.com/"),
+        ("https://example.com:443/a#frag", "https://example.com/a"),
+        ("http://example.com:8080/a?b=2&a=1", "http://example.com:8080/a?a=1&b=2"),
+        ("mailto:someone@example.com", None),
+        ("javascript:void(0)", None),
+    ],
+)
+def test_normalize_url(url, expected):
+    assert crawler.normalize_url(url) == expected
+
+
+async def _collect(run):
+    return [result async for result in run]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_crawl_deduplicates_and_respects_depth(fake_site):
+    sessions, fetched, factory = fake_site
+    options = crawler.CrawlOptions(max_depth=2, concurrency=2, per_host_delay=0)
+
+    results = await _collect(
+        crawler.Crawler(["https://example.com"], options, factory).run()
+    )
+
+    urls = sorted(result.url for result in results)
+    assert urls == [
+        "https://example.com/",
+        "https://example.com/a",
+        "https://example.com/b",
+        "https://example.com/c",
+        "https://example.com/c?x=1&y=2",
+    ]
+    assert len(fetched) == len(urls)
+    assert all(result.error is None for result in results)
+    assert len(sessions) <= 2
+    assert all(session.state == ["start", "stop"] for session in sessions)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_crawl_limits_pages_domains_and_reports_errors(fake_site, monkeypatch):
+    _sessions, _fetched, factory = fake_site
+    monkeypatch.setenv("BROWSER_USE_ALLOWED_DOMAINS", "example.com,*.other.org")
+
+    options = crawler.CrawlOptions(max_depth=1, max_pages=5, same_host=False, per_host_delay=0)
+    seeds = ["https://example.com/", "https://example.com/missing"]
+    results = await _collect(crawler.Crawler(seeds, options, factory).run())
+
+    assert len(results) == 5
+    assert "https://other.org/" in {result.url for result in results}
+    assert [r.error for r in results if r.url.endswith("missing")] == ["404"]
+
+    options.allowed_domains = ["example.com"]
+    results = await _collect(crawler.Crawler(seeds, options, factory).run())
+
+    assert "https://other.org/" not in {result.url for result in results}
+    assert len(results) == 4
+
+
+@pytest.mark.anyio("asyncio")
+async def test_crawl_spaces_requests_per_host(fake_site):
+    _sessions, fetched, factory = fake_site
+    options = crawler.CrawlOptions(max_depth=1, concurrency=4, per_host_delay=0.05)
+
+    await _collect(crawler.Crawler(["https://example.com/"], options, factory).run())
+
+    times = sorted(moment for _url, moment in fetched)
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert len(times) == 3
+    assert min(gaps) >= 0.045
+
+
+@pytest.mark.anyio("asyncio")
+async def test_crawl_urls_tool_returns_pages(fake_site, monkeypatch):
+    sessions, _fetched, factory = fake_site
+    monkeypatch.setattr(crawler, "create_browser_session", factory)
+    monkeypatch.setenv("MCP_CRAWL_HOST_DELAY_MS", "0")
+    crawl_urls = getattr(server.crawl_urls, "fn", server.crawl_urls)
+
+    response = await crawl_urls(["https://example.com/"], max_depth=0)
+
+    assert response["fetched"] == 1
+    assert response["pages"][0]["links"][0] == "https://example.com/a"
+    assert sessions and sessions[0].state == ["start", "stop"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_crawl_replaces_a_dead_browser(fake_site, monkeypatch):
+    sessions, _fetched, factory = fake_site
+    read_page = crawler.read_page
+
+    async def crashing_read_page(session, url, **kwargs):
+        if url == "https://example.com/a" and len(sessions) == 1:
+            session.alive = False
+            raise RuntimeError("browser crashed")
+        if not session.alive:
+            raise RuntimeError("browser is gone")
+        return await read_page(session, url, **kwargs)
+
+    monkeypatch.setattr(crawler, "read_page", crashing_read_page)
+    options = crawler.CrawlOptions(max_depth=2, concurrency=1, per_host_delay=0)
+
+    results = await _collect(crawler.Crawler(["https://example.com"], options, factory).run())
+
+    assert len(results) == 5
+    assert all(result.error is None for result in results)
+    assert len(sessions) == 2
+    assert all(session.state == ["start", "stop"] for session in sessions)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_crawl_urls_tool_stops_browsers_when_reporting_fails(fake_site, monkeypatch):
+    sessions, _fetched, factory = fake_site
+    monkeypatch.setattr(crawler, "create_browser_session", factory)
+    monkeypatch.setenv("MCP_CRAWL_HOST_DELAY_MS", "0")
+    crawl_urls = getattr(server.crawl_urls, "fn", server.crawl_urls)
+
+    class BrokenContext:
+        async def report_progress(self, *args):
+            raise ConnectionError("client went away")
+
+    with pytest.raises(ConnectionError):
+        await crawl_urls(["https://example.com/"], max_depth=1, ctx=BrokenContext())
+
+    assert sessions and all(session.state == ["start", "stop"] for session in sessions)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cancelling_a_crawl_stops_a_browser_that_is_still_starting(fake_site):
+    sessions, _fetched, _factory = fake_site
+    starting = asyncio.Event()
+
+    class SlowSession(FakeSession):
+        async def start(self):
+            self.state.append("start")
+            starting.set()
+            await asyncio.sleep(60)
+
+    def factory():
+        sessions.append(SlowSession())
+        return sessions[-1]
+
+    options = crawler.CrawlOptions(max_depth=0, concurrency=1, per_host_delay=0)
+    crawl = asyncio.ensure_future(
+        _collect(crawler.Crawler(["https://example.com"], options, factory).run())
+    )
+    await starting.wait()
+    crawl.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await crawl
+
+    assert [session.state for session in sessions] == [["start", "stop"]]
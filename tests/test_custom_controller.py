@@ -0,0 +1,184 @@
+"""Tests for the custom controller actions."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from mcp_browser_use.controller.custom_controller import (
+    CustomController,
+    ExtractStructuredAction,
+    FillFormAction,
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeNode:
+    def __init__(self, xpath):
+        self.xpath = xpath
+
+
+class FakeBrowserSession:
+    def __init__(self, cdp_session, selector_map=None):
+        self.cdp_session = cdp_session
+        self.selector_map = selector_map or {}
+
+    async def get_or_create_cdp_session(self):
+        return self.cdp_session
+
+    async def get_selector_map(self):
+        return self.selector_map
+
+    def answer(self, value=None, exception=None):
+        """Answer the next ``Runtime.evaluate`` calls with ``value`` or a script error."""
+        if exception:
+            result = {"exceptionDetails": {"exception": {"description": exception}}}
+        else:
+            result = {"result": {"value": value}}
+        self.cdp_session.cdp_client.responses["Runtime.evaluate"] = result
+
+
+@pytest.fixture
+def browser(fake_cdp_session):
+    return FakeBrowserSession(fake_cdp_session())
+
+
+def _action(controller, name):
+    return controller.registry.registry.actions[name]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_paste_inserts_copied_text_through_cdp(browser):
+    controller = CustomController()
+
+    copied = _action(controller, "copy_to_clipboard")("hello", browser)
+    pasted = await _action(controller, "paste_from_clipboard")(browser)
+
+    assert copied.extracted_content == "hello"
+    assert pasted.extracted_content == "hello"
+    assert browser.cdp_session.sent == [("Input.insertText", {"text": "hello"}, "target-1")]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_clipboard_follows_the_browser_session(browser, fake_cdp_session):
+    first_run, next_run = CustomController(), CustomController()
+    other_browser = FakeBrowserSession(fake_cdp_session())
+
+    _action(first_run, "copy_to_clipboard")("first", browser)
+
+    # A later run on the same browser, e.g. a named session, still has it.
+    assert (await _action(next_run, "paste_from_clipboard")(browser)).extracted_content == "first"
+    result = await _action(next_run, "paste_from_clipboard")(other_browser)
+    assert result.error == "Clipboard is empty"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_paste_reports_browser_errors():
+    class BrokenBrowserSession:
+        async def get_or_create_cdp_session(self):
+            raise RuntimeError("no page")
+
+    controller = CustomController()
+    broken = BrokenBrowserSession()
+    _action(controller, "copy_to_clipboard")("text", broken)
+
+    result = await _action(controller, "paste_from_clipboard")(broken)
+
+    assert result.error == "no page"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fill_form_uses_one_evaluation_and_reports_each_field(browser):
+    controller = CustomController()
+    browser.selector_map = {3: FakeNode("html/body/form/input[1]")}
+    browser.answer(
+        [
+            {"field": "3", "ok": True, "tag": "input"},
+            {"field": "Email", "ok": False, "error": "element not found"},
+        ]
+    )
+
+    result = await _action(controller, "fill_form")(
+        FillFormAction(fields={"3": "Ada", "Email": "ada@example.com", "9": "x"}),
+        browser,
+    )
+
+    (expression,) = browser.cdp_session.expressions()
+    targets = json.loads(expression[expression.rindex(")(") + 2 : -1])
+    assert targets == [
+        {"field": "3", "xpath": "/html/body/form/input[1]", "value": "Ada"},
+        {"field": "Email", "value": "ada@example.com"},
+    ]
+    summary = json.loads(result.extracted_content)
+    assert (summary["filled"], summary["total"]) == (1, 3)
+    assert summary["fields"][-1] == {
+        "field": "9",
+        "ok": False,
+        "error": "unknown element index",
+    }
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fill_form_reports_failure_when_nothing_filled(browser):
+    controller = CustomController()
+    browser.answer(exception="ReferenceError: CSS is not defined")
+
+    result = await _action(controller, "fill_form")(
+        FillFormAction(fields={"Name": "Ada"}), browser
+    )
+
+    assert result.error == "ReferenceError: CSS is not defined"
+
+    browser.answer([{"field": "Name", "ok": False, "error": "element not found"}])
+    result = await _action(controller, "fill_form")(
+        FillFormAction(fields={"Name": "Ada"}), browser
+    )
+
+    assert result.error.startswith("No form fields filled")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_extract_structured_data_returns_compact_rows(browser):
+    controller = CustomController()
+    browser.answer(
+        {
+            "kind": "table",
+            "columns": ["Name", "Price"],
+            "rows": [["Widget", "9.99"]],
+            "total_rows": 40,
+            "truncated": True,
+        }
+    )
+
+    result = await _action(controller, "extract_structured_data")(
+        ExtractStructuredAction(selector="#prices", columns=["name", "1"], max_rows=1),
+        browser,
+    )
+
+    (expression,) = browser.cdp_session.expressions()
+    arguments = json.loads(expression[expression.rindex(")(") + 2 : -1])
+    assert arguments == {
+        "selector": "#prices",
+        "kind": "auto",
+        "columns": ["name", "1"],
+        "maxRows": 1,
+    }
+    assert result.extracted_content.startswith('{"kind":"table","columns":["Name","Price"]')
+    assert json.loads(result.extracted_content)["truncated"] is True
+
+
+@pytest.mark.anyio("asyncio")
+async def test_extract_structured_data_reports_missing_content(browser):
+    controller = CustomController()
+    browser.answer({"error": "no table found"})
+
+    result = await _action(controller, "extract_structured_data")(
+        ExtractStructuredAction(kind="table"), browser
+    )
+
+    assert result.error == "no table found"
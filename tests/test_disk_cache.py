@@ -0,0 +1,105 @@
+"""Tests for the shared Chromium disk cache."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from mcp_browser_use.browser import browser_manager
+from mcp_browser_use.browser.disk_cache import DiskCachePool
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="needs flock")
+
+
+def _fill(path, name, size):
+    with open(os.path.join(path, name), "wb") as handle:
+        handle.write(b"x" * size)
+
+
+def test_slots_are_exclusive_and_warm_slots_are_reused(tmp_path):
+    pool = DiskCachePool(str(tmp_path), max_bytes=1_000, slots=2)
+
+    first = pool.acquire()
+    second = pool.acquire()
+
+    assert first.path != second.path
+    assert pool.acquire() is None
+
+    first.release()
+    os.utime(os.path.join(second.path, ".lock"), (1, 1))
+    second.release()
+    again = pool.acquire()
+    assert again.path == first.path
+    again.release()
+
+
+def test_prune_empties_least_recently_used_idle_slots(tmp_path):
+    pool = DiskCachePool(str(tmp_path), max_bytes=1_500, slots=3)
+    leases = [pool.acquire() for _ in range(3)]
+    for age, lease in enumerate(leases):
+        _fill(lease.path, "data", 1_000)
+        os.utime(os.path.join(lease.path, ".lock"), (100 + age, 100 + age))
+    leases[2].release()
+    leases[0].release()
+
+    # Slot 1 is still leased, so only idle slots may be emptied.
+    pruned = pool.prune()
+
+    assert pruned == [leases[0].path, leases[2].path]
+    assert os.listdir(leases[0].path) == [".lock"]
+    assert os.path.exists(os.path.join(leases[1].path, "data"))
+    leases[1].release()
+
+
+def test_prune_removes_slots_beyond_the_configured_count(tmp_path):
+    DiskCachePool(str(tmp_path), max_bytes=10_000, slots=2).acquire()
+    extra = tmp_path / "slot-5"
+    extra.mkdir()
+    _fill(str(extra), "data", 10)
+
+    assert DiskCachePool(str(tmp_path), max_bytes=10_000, slots=2).prune() == [str(extra)]
+
+
+def test_browser_sessions_lease_and_release_slots(tmp_path, monkeypatch):
+    for key in ("BROWSER_USE_CDP_URL", "CHROME_PERSISTENT_SESSION", "BROWSER_USE_EXTRA_CHROMIUM_ARGS"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("BROWSER_USE_DISK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("BROWSER_USE_DISK_CACHE_SIZE_MB", "8")
+    monkeypatch.setenv("BROWSER_USE_DISK_CACHE_SLOTS", "1")
+
+    first = browser_manager.create_browser_session()
+    second = browser_manager.create_browser_session()
+
+    assert f"--disk-cache-dir={tmp_path / 'slot-0'}" in first.args
+    assert f"--disk-cache-size={8 * 1024 * 1024}" in first.args
+    assert not getattr(second, "args", None)
+
+    asyncio.run(browser_manager.close_browser_session(first))
+    asyncio.run(browser_manager.close_browser_session(second))
+    third = browser_manager.create_browser_session()
+    assert f"--disk-cache-dir={tmp_path / 'slot-0'}" in third.args
+    asyncio.run(browser_manager.close_browser_session(third))
+
+    cdp = browser_manager.create_browser_session({"cdp_url": "http://localhost:9222"})
+    assert not getattr(cdp, "args", None)
+
+
+def test_failed_session_construction_releases_its_slot(tmp_path, monkeypatch):
+    for key in ("BROWSER_USE_CDP_URL", "CHROME_PERSISTENT_SESSION", "BROWSER_USE_EXTRA_CHROMIUM_ARGS"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("BROWSER_USE_DISK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("BROWSER_USE_DISK_CACHE_SLOTS", "1")
+
+    def broken_session(**kwargs):
+        raise ValueError("bad profile")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(browser_manager, "BrowserSession", broken_session)
+        with pytest.raises(ValueError):
+            browser_manager.create_browser_session()
+
+    session = browser_manager.create_browser_session()
+    assert f"--disk-cache-dir={tmp_path / 'slot-0'}" in session.args
+    asyncio.run(browser_manager.close_browser_session(session))
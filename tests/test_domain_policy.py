@@ -0,0 +1,83 @@
+"""Tests for the compiled domain allow/deny policy."""
+
+from __future__ import annotations
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.browser.domain_policy import DomainPolicy
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_allow_list_wildcards():
+    policy = DomainPolicy(["example.com", "*.docs.org", "https://api.test", "Trailing.Dot."])
+
+    assert policy.allows_host("example.com")
+    assert not policy.allows_host("www.example.com")
+    assert policy.allows_host("docs.org")
+    assert policy.allows_host("a.b.DOCS.org")
+    assert policy.allows_host("api.test")
+    assert policy.allows_host("trailing.dot")
+    assert not policy.allows_host("evil-docs.org")
+    assert not policy.allows_host("org")
+
+
+def test_deny_list_wins_and_star_allows_everything():
+    policy = DomainPolicy(["*"], denied=["*.ads.example"])
+
+    assert policy.allows_host("anything.test")
+    assert not policy.allows_host("ads.example")
+    assert not policy.allows_host("cdn.ads.example")
+    assert policy.filters_all_requests
+
+
+def test_unsupported_wildcards_are_ignored():
+    policy = DomainPolicy(["foo.*.com"])
+
+    assert policy.restricts
+    assert not policy.allows_host("foo.bar.com")
+
+
+def test_urls_and_scopes():
+    navigation_only = DomainPolicy(["example.com"], denied=["tracker.test"])
+    everything = DomainPolicy(["example.com"], scope="all")
+
+    assert navigation_only.allows_url("https://example.com/a")
+    assert not navigation_only.allows_url("https://cdn.other.net/lib.js")
+    assert navigation_only.allows_url("https://cdn.other.net/lib.js", navigation=False)
+    assert not navigation_only.allows_url("https://tracker.test/p.gif", navigation=False)
+    assert not everything.allows_url("https://cdn.other.net/lib.js", navigation=False)
+    assert navigation_only.allows_url("about:blank")
+    assert navigation_only.allows_url("data:text/html,hi")
+    assert not DomainPolicy().restricts
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("BROWSER_USE_ALLOWED_DOMAINS", "example.com, *.example.org")
+    monkeypatch.setenv("BROWSER_USE_BLOCKED_DOMAINS", "bad.example.org")
+    monkeypatch.setenv("BROWSER_USE_DOMAIN_POLICY_SCOPE", "bogus")
+
+    policy = DomainPolicy.from_env()
+
+    assert policy.scope == "navigation"
+    assert policy.allows_host("www.example.org")
+    assert not policy.allows_host("bad.example.org")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fetch_page_refuses_disallowed_url(monkeypatch):
+    monkeypatch.setenv("BROWSER_USE_ALLOWED_DOMAINS", "example.com")
+    fetch_page = getattr(server.fetch_page, "fn", server.fetch_page)
+
+    def fail_create():
+        raise AssertionError("no browser should start for a refused URL")
+
+    monkeypatch.setattr(server, "create_browser_session", fail_create)
+    monkeypatch.setattr(server, "take_prelaunched_browser_session", lambda: None)
+
+    with pytest.raises(ValueError, match="outside the allowed domains"):
+        await fetch_page("https://elsewhere.test/")
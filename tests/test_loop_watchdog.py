@@ -0,0 +1,60 @@
+"""Tests for the event-loop lag watchdog."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from mcp_browser_use.utils import loop_watchdog
+from mcp_browser_use.utils.loop_watchdog import LoopWatchdog
+from mcp_browser_use.utils.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_watchdog_reports_blocking_stack(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(
+        loop_watchdog.logger, "warning", lambda message, *args: warnings.append(message % args)
+    )
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.01)
+    stalls_before = LOOP_STALLS.value()
+    await watchdog.start()
+    try:
+        await asyncio.sleep(0.03)
+        _block_the_loop(0.3)
+        await asyncio.sleep(0.03)
+    finally:
+        await watchdog.stop()
+
+    assert len(watchdog.stalls) == 1
+    stall = watchdog.stalls[0]
+    assert "_block_the_loop" in stall.stack
+    assert stall.blocked_ms > 250
+    assert LOOP_STALLS.value() == stalls_before + 1
+    # One record per stall, carrying the captured stack.
+    (message,) = warnings
+    assert "_block_the_loop" in message
+
+
+@pytest.mark.anyio("asyncio")
+async def test_watchdog_quiet_loop_records_lag_only():
+    watchdog = LoopWatchdog(threshold=0.5, interval=0.01)
+    await watchdog.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await watchdog.stop()
+
+    assert not watchdog.stalls
+    assert LOOP_LAG_SECONDS.snapshot()["samples"][0]["count"] > 0
@@ -0,0 +1,176 @@
+"""Tests for browser memory accounting, recycling and orphan cleanup."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mcp_browser_use.browser import browser_manager, memory_watchdog, session_registry
+from mcp_browser_use.browser.memory_watchdog import RecyclePolicy
+from mcp_browser_use.browser.session_registry import SessionRegistry
+from mcp_browser_use.utils.metrics import ORPHANED_BROWSER_PROCESSES, SESSION_RECYCLES
+
+pytestmark = pytest.mark.skipif(
+    not os.path.isdir("/proc/self"), reason="process inspection uses /proc"
+)
+
+PORT = 47_213
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_chromium():
+    """A process that looks like a Chromium main process and ignores SIGTERM."""
+    script = (
+        "import signal, subprocess, sys, time;"
+        "signal.signal(signal.SIGTERM, signal.SIG_IGN);"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)',"
+        " '--type=renderer']);"
+        "print(child.pid, flush=True);"
+        "time.sleep(60)"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", script, f"--remote-debugging-port={PORT}"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    renderer = int(process.stdout.readline())
+    yield process, renderer
+    for pid in (process.pid, renderer):
+        try:
+            os.kill(pid, 9)
+        except OSError:
+            pass
+    process.wait()
+
+
+class FakeSession:
+    def __init__(self, cdp_url=f"http://127.0.0.1:{PORT}", is_local=True):
+        self.cdp_url = cdp_url
+        self.is_local = is_local
+        self.events = []
+
+    async def start(self):
+        self.events.append("start")
+
+    async def stop(self):
+        self.events.append("stop")
+
+
+def test_finds_browser_process_tree_and_its_memory(fake_chromium):
+    process, renderer = fake_chromium
+
+    assert memory_watchdog.find_browser_pid(FakeSession()) == process.pid
+    assert set(memory_watchdog.process_tree(process.pid)) == {process.pid, renderer}
+    assert memory_watchdog.browser_rss_bytes(FakeSession()) > 0
+    assert memory_watchdog.find_browser_pid(FakeSession("http://10.0.0.5:9222")) is None
+    assert memory_watchdog.find_browser_pid(FakeSession(None)) is None
+    # A configured CDP URL on localhost is somebody else's browser.
+    assert memory_watchdog.find_browser_pid(FakeSession(is_local=False)) is None
+
+
+def test_recycle_policy_reasons():
+    policy = RecyclePolicy(max_rss_mb=100, max_uses=3)
+
+    assert policy.reason(uses=3, rss=None) == "uses"
+    assert policy.reason(uses=1, rss=200 * 1024 * 1024) == "memory"
+    assert policy.reason(uses=1, rss=50 * 1024 * 1024) is None
+    assert not RecyclePolicy().enabled
+
+
+@pytest.mark.anyio("asyncio")
+async def test_close_kills_processes_that_outlive_stop(fake_chromium, monkeypatch):
+    process, renderer = fake_chromium
+    monkeypatch.setattr(
+        browser_manager,
+        "kill_process_tree",
+        functools.partial(memory_watchdog.kill_process_tree, grace=0.2),
+    )
+    session = FakeSession()
+    browser_manager._track_resources(session, browser_manager._SessionResources(local=True))
+    before = ORPHANED_BROWSER_PROCESSES.value()
+
+    await browser_manager.close_browser_session(session)
+
+    assert session.events == ["stop"]
+    # Our own child is reaped, not left as a zombie.
+    assert not os.path.exists(f"/proc/{process.pid}")
+    assert not memory_watchdog._alive(renderer)
+    assert ORPHANED_BROWSER_PROCESSES.value() == before + 2
+
+
+def test_reused_pids_are_never_signalled(fake_chromium):
+    process, renderer = fake_chromium
+    snapshot = memory_watchdog.snapshot_processes([process.pid, renderer])
+    assert set(snapshot) == {process.pid, renderer}
+
+    # As if both pids had been given to new processes since the snapshot.
+    stale = {pid: started - 1 for pid, started in snapshot.items()}
+    assert memory_watchdog.kill_process_tree(stale, grace=0.1) == 0
+
+    assert process.poll() is None and memory_watchdog._alive(renderer)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_remote_sessions_are_never_killed(fake_chromium):
+    process, _renderer = fake_chromium
+
+    await browser_manager.close_browser_session(FakeSession())
+    await asyncio.sleep(0.05)
+
+    assert process.poll() is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_registry_recycles_after_max_uses():
+    sessions = []
+
+    def factory():
+        sessions.append(FakeSession(cdp_url=None))
+        return sessions[-1]
+
+    registry = SessionRegistry(session_factory=factory, recycle=RecyclePolicy(max_uses=2))
+    before = SESSION_RECYCLES.value(labels=("uses",))
+    await registry.open("work")
+
+    for _ in range(3):
+        async with registry.use("work"):
+            pass
+
+    assert len(sessions) == 2
+    assert sessions[0].events == ["start", "stop"]
+    assert sessions[1].events == ["start"]
+    assert registry.list()[0]["recycles"] == 1
+    assert SESSION_RECYCLES.value(labels=("uses",)) == before + 1
+    await registry.close_all()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_registry_recycles_idle_sessions_over_the_memory_limit(monkeypatch):
+    sessions = []
+
+    def factory():
+        sessions.append(FakeSession(cdp_url=None))
+        return sessions[-1]
+
+    rss = {"bytes": 0}
+    monkeypatch.setattr(session_registry, "browser_rss_bytes", lambda _session: rss["bytes"])
+    registry = SessionRegistry(session_factory=factory, recycle=RecyclePolicy(max_rss_mb=100))
+    await registry.open("work")
+
+    assert await registry.check_memory() == []
+    rss["bytes"] = 200 * 1024 * 1024
+    assert await registry.check_memory() == ["work"]
+
+    assert len(sessions) == 2
+    assert sessions[0].events == ["start", "stop"]
+    await registry.close_all()
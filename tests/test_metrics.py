@@ -0,0 +1,159 @@
+"""Tests for the in-process metrics registry and its exporters."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.utils import metrics
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_counter_and_gauge_render_with_labels():
+    registry = metrics.MetricsRegistry()
+    runs = registry.counter("runs_total", "Runs.", ("outcome",))
+    active = registry.gauge("active", "Active runs.")
+
+    runs.inc(labels=("done",))
+    runs.inc(2, labels=("error",))
+    active.inc()
+    active.inc()
+    active.dec()
+
+    text = registry.render_prometheus()
+
+    assert "# TYPE runs_total counter" in text
+    assert 'runs_total{outcome="done"} 1' in text
+    assert 'runs_total{outcome="error"} 2' in text
+    assert "active 1" in text
+    assert runs.value(("error",)) == 2
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = metrics.MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render_prometheus()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+    snapshot = registry.snapshot()["latency_seconds"]["samples"][0]
+    assert snapshot["count"] == 4
+    assert snapshot["buckets"]["+Inf"] == 4
+
+
+def test_label_values_are_escaped_and_checked():
+    registry = metrics.MetricsRegistry()
+    tokens = registry.counter("tokens_total", "Tokens.", ("model",))
+
+    tokens.inc(labels=('gpt "4"\n',))
+
+    assert 'tokens_total{model="gpt \\"4\\"\\n"} 1' in registry.render_prometheus()
+    with pytest.raises(ValueError):
+        tokens.inc()
+
+
+def test_registering_same_name_returns_existing_metric():
+    registry = metrics.MetricsRegistry()
+
+    first = registry.counter("calls_total", "Calls.")
+
+    assert registry.counter("calls_total", "Calls.") is first
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls.")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_metrics_http_server_serves_prometheus_text():
+    registry = metrics.MetricsRegistry()
+    registry.counter("hits_total", "Hits.").inc()
+    http_server = await metrics.start_metrics_http_server("127.0.0.1", 0, registry)
+    port = http_server.sockets[0].getsockname()[1]
+
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /other HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        missing = (await reader.read()).decode()
+        writer.close()
+    finally:
+        http_server.close()
+        await http_server.wait_closed()
+
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "text/plain; version=0.0.4" in response
+    assert "hits_total 1" in response
+    assert missing.startswith("HTTP/1.1 404")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_metrics_http_server_drops_idle_connections(monkeypatch):
+    monkeypatch.setattr(metrics, "_REQUEST_TIMEOUT", 0.05)
+    http_server = await metrics.start_metrics_http_server("127.0.0.1", 0, metrics.MetricsRegistry())
+    port = http_server.sockets[0].getsockname()[1]
+
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # Never send a request: the server closes the connection on its own.
+        assert await asyncio.wait_for(reader.read(), 2) == b""
+        writer.close()
+    finally:
+        http_server.close()
+        await http_server.wait_closed()
+
+
+def test_metric_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        metrics._Metric("base", "Abstract.")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_run_slots_track_queue_depth(monkeypatch):
+    monkeypatch.setenv("MCP_MAX_CONCURRENT_RUNS", "1")
+    monkeypatch.setattr(server, "_RUN_SLOTS", None)
+    release = asyncio.Event()
+    observed = []
+
+    async def hold_slot():
+        async with server._run_slot():
+            observed.append(metrics.ACTIVE_RUNS.value())
+            await release.wait()
+
+    first = asyncio.create_task(hold_slot())
+    second = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0.01)
+
+    assert metrics.QUEUED_RUNS.value() == 1
+    release.set()
+    await asyncio.gather(first, second)
+
+    assert metrics.QUEUED_RUNS.value() == 0
+    assert observed == [1, 1]
+
+
+def test_metrics_resources_expose_snapshot():
+    snapshot = json.loads(getattr(server.server_metrics, "fn", server.server_metrics)())
+    prometheus = getattr(
+        server.server_metrics_prometheus, "fn", server.server_metrics_prometheus
+    )()
+
+    assert "mcp_browser_use_active_runs" in snapshot
+    assert "# TYPE mcp_browser_use_llm_call_seconds histogram" in prometheus
@@ -0,0 +1,218 @@
+"""Tests for CDP request blocking."""
+
+from __future__ import annotations
+
+import pytest
+
+from mcp_browser_use.browser.browser_manager import NetworkBlockingConfig
+from mcp_browser_use.browser.domain_policy import DomainPolicy
+from mcp_browser_use.browser.network_guard import NetworkGuard
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeBrowserSession:
+    def __init__(self, cdp_session):
+        self.current = cdp_session
+        self.client = cdp_session.cdp_client
+
+    async def get_or_create_cdp_session(self):
+        return self.current
+
+
+@pytest.fixture
+def browser(fake_cdp_session):
+    return FakeBrowserSession(fake_cdp_session(session_id="tab-1"))
+
+
+def _config(**kwargs):
+    return NetworkBlockingConfig(**kwargs)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_attach_configures_each_target_once(browser):
+    guard = NetworkGuard(
+        browser,
+        _config(resource_types=frozenset({"Font", "Media"}), url_patterns=("*ads*",)),
+    )
+
+    await guard.ensure_attached()
+    await guard.ensure_attached()
+    browser.current = browser.current.on_target("tab-2")
+    await guard.ensure_attached()
+
+    methods = [(name, session) for name, _params, session in browser.client.sent]
+    assert methods.count(("Fetch.enable", "tab-1")) == 1
+    assert methods.count(("Fetch.enable", "tab-2")) == 1
+    fetch_params = next(p for n, p, _s in browser.client.sent if n == "Fetch.enable")
+    assert [p["resourceType"] for p in fetch_params["patterns"]] == ["Font", "Media"]
+    blocked_urls = next(p for n, p, _s in browser.client.sent if n == "Network.setBlockedURLs")
+    assert blocked_urls == {"urls": ["*ads*"]}
+    assert set(browser.client.handlers) == {
+        "Fetch.requestPaused",
+        "Network.loadingFailed",
+        "Network.loadingFinished",
+    }
+
+
+@pytest.mark.anyio("asyncio")
+async def test_paused_requests_are_failed_or_continued_and_counted(browser):
+    guard = NetworkGuard(browser, _config(resource_types=frozenset({"Font"})))
+    await guard.ensure_attached()
+    handlers = browser.client.handlers
+    browser.client.sent.clear()
+
+    await handlers["Fetch.requestPaused"]({"requestId": "1", "resourceType": "Font"}, "tab-1")
+    await handlers["Fetch.requestPaused"]({"requestId": "2", "resourceType": "Script"}, "tab-1")
+    handlers["Network.loadingFailed"]({"blockedReason": "inspector", "type": "Script"}, "tab-1")
+    handlers["Network.loadingFailed"]({"errorText": "net::ERR_FAILED", "type": "XHR"}, "tab-1")
+    handlers["Network.loadingFinished"]({"encodedDataLength": 1200}, "tab-1")
+
+    assert [(name, params) for name, params, _s in browser.client.sent] == [
+        ("Fetch.failRequest", {"requestId": "1", "errorReason": "BlockedByClient"}),
+        ("Fetch.continueRequest", {"requestId": "2"}),
+    ]
+    stats = guard.stats()
+    assert stats["blocked_requests"] == {"Font": 1, "Script": 1}
+    assert stats["estimated_bytes_saved"] == 30_000 + 25_000
+    assert stats["loaded_bytes"] == 1200
+
+
+@pytest.mark.anyio("asyncio")
+async def test_disabled_config_never_touches_the_browser(browser):
+    guard = NetworkGuard(browser, _config())
+
+    await guard.ensure_attached()
+
+    assert browser.client.sent == []
+
+
+@pytest.mark.anyio("asyncio")
+async def test_domain_policy_fails_off_domain_navigations(browser):
+    guard = NetworkGuard(browser, _config(), DomainPolicy(["example.com"]))
+    await guard.ensure_attached()
+    fetch_params = next(p for n, p, _s in browser.client.sent if n == "Fetch.enable")
+    assert fetch_params["patterns"] == [
+        {"urlPattern": "*", "resourceType": "Document", "requestStage": "Request"}
+    ]
+    paused = browser.client.handlers["Fetch.requestPaused"]
+    browser.client.sent.clear()
+
+    await paused(
+        {"requestId": "1", "resourceType": "Document", "request": {"url": "https://evil.test/"}},
+        "tab-1",
+    )
+    await paused(
+        {"requestId": "2", "resourceType": "Document", "request": {"url": "https://example.com/"}},
+        "tab-1",
+    )
+
+    assert [name for name, _p, _s in browser.client.sent] == [
+        "Fetch.failRequest",
+        "Fetch.continueRequest",
+    ]
+    assert guard.take_denied_navigations() == ["https://evil.test/"]
+    assert guard.take_denied_navigations() == []
+    assert guard.stats()["denied_hosts"] == {"evil.test": 1}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_domain_policy_lets_off_domain_iframes_load(browser):
+    guard = NetworkGuard(browser, _config(), DomainPolicy(["example.com"]))
+    await guard.ensure_attached()
+    paused = browser.client.handlers["Fetch.requestPaused"]
+    browser.client.sent.clear()
+
+    await paused(
+        {
+            "requestId": "1",
+            "resourceType": "Document",
+            "frameId": "captcha-frame",
+            "request": {"url": "https://captcha.test/widget"},
+        },
+        "tab-1",
+    )
+    await paused(
+        {
+            "requestId": "2",
+            "resourceType": "Document",
+            "frameId": browser.current.target_id,
+            "request": {"url": "https://captcha.test/"},
+        },
+        "tab-1",
+    )
+
+    assert [name for name, _p, _s in browser.client.sent] == [
+        "Fetch.continueRequest",
+        "Fetch.failRequest",
+    ]
+    assert guard.take_denied_navigations() == ["https://captcha.test/"]
+
+    strict = NetworkGuard(browser, _config(), DomainPolicy(["example.com"], scope="all"))
+    await strict.ensure_attached()
+    browser.client.sent.clear()
+    await strict._on_request_paused(
+        {
+            "requestId": "3",
+            "resourceType": "Document",
+            "frameId": "captcha-frame",
+            "request": {"url": "https://captcha.test/widget"},
+        },
+        "tab-1",
+    )
+    assert [name for name, _p, _s in browser.client.sent] == ["Fetch.failRequest"]
+    assert strict.take_denied_navigations() == []
+
+
+@pytest.mark.anyio("asyncio")
+async def test_deny_list_intercepts_every_request(browser):
+    guard = NetworkGuard(browser, _config(), DomainPolicy(denied=["*.tracker.test"]))
+    await guard.ensure_attached()
+
+    fetch_params = next(p for n, p, _s in browser.client.sent if n == "Fetch.enable")
+    assert fetch_params["patterns"] == [{"urlPattern": "*", "requestStage": "Request"}]
+
+    await browser.client.handlers["Fetch.requestPaused"](
+        {"requestId": "3", "resourceType": "Image", "request": {"url": "https://px.tracker.test/a"}},
+        "tab-1",
+    )
+    assert guard.stats()["blocked_requests"] == {"Image": 1}
+    assert guard.take_denied_navigations() == []
+
+
+def test_unrestricted_policy_is_dropped(browser):
+    guard = NetworkGuard(browser, _config(), DomainPolicy())
+
+    assert guard.policy is None
+    assert not guard.enabled
+
+
+@pytest.mark.anyio("asyncio")
+async def test_runs_on_one_session_share_its_guard(browser):
+    config = _config(resource_types=frozenset({"Font"}))
+    first = await NetworkGuard.for_session(browser, config)
+    await first.ensure_attached()
+    paused = browser.client.handlers["Fetch.requestPaused"]
+    await paused({"requestId": "1", "resourceType": "Font"}, "tab-1")
+    browser.client.handlers["Network.loadingFinished"]({"encodedDataLength": 500}, "tab-1")
+
+    second = await NetworkGuard.for_session(browser, config)
+    await second.ensure_attached()
+
+    assert second is first
+    assert second.stats()["blocked_total"] == 0 and second.stats()["loaded_bytes"] == 0
+    methods = [(name, session) for name, _params, session in browser.client.sent]
+    # Configured again for the new run, but the handlers are registered once.
+    assert methods.count(("Fetch.enable", "tab-1")) == 2
+    assert browser.client.handlers["Fetch.requestPaused"] == first._on_request_paused
+
+    # A run that blocks nothing releases the targets an earlier run intercepted.
+    third = await NetworkGuard.for_session(browser, _config())
+    assert third is first and not third.enabled
+    assert [name for name, _p, _s in browser.client.sent[-2:]] == [
+        "Fetch.disable",
+        "Network.setBlockedURLs",
+    ]
@@ -0,0 +1,256 @@
+"""Tests for LLM-free page reading and the ``fetch_page`` tool."""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.browser import browser_manager, page_reader
+from mcp_browser_use.utils.metrics import PAGE_SETTLE_SECONDS
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeEvent:
+    def __init__(self, error=None):
+        self.error = error
+
+    def __await__(self):
+        yield from ()
+        return self
+
+    async def event_result(self, raise_if_any=True, raise_if_none=True):
+        if self.error and raise_if_any:
+            raise self.error
+        return None
+
+
+class FakeEventBus:
+    def __init__(self, page):
+        self.page = page
+
+    def dispatch(self, event):
+        self.page.events.append(event)
+        if event.url.startswith("blocked:"):
+            return FakeEvent(RuntimeError("navigation blocked"))
+        self.page.url = event.url
+        return FakeEvent()
+
+
+def _read_page_answer(session):
+    def evaluate(params, session_id):
+        expression = params["expression"]
+        if "__mcpSettle" in expression:
+            return {"result": {"value": {"settled": True, "loaded": True, "inflight": 0}}}
+        arguments = json.loads(expression[expression.rindex(")(") + 2 : -1])
+        text = "Main text " * 10
+        return {
+            "result": {
+                "value": {
+                    "url": session.url,
+                    "title": "Fixture",
+                    "text": text[: arguments["maxChars"]],
+                    "text_truncated": len(text) > arguments["maxChars"],
+                    "links": [{"text": "next", "href": "https://example.com/2"}]
+                    if arguments["includeLinks"]
+                    else [],
+                    "matches": [{"text": "match"}] if arguments["selector"] else [],
+                }
+            }
+        }
+
+    return evaluate
+
+
+class FakePageSession:
+    def __init__(self, cdp_session):
+        self.events = []
+        self.url = "about:blank"
+        self.lifecycle = []
+        self.event_bus = FakeEventBus(self)
+        self.cdp_session = cdp_session
+        cdp_session.cdp_client.responses["Runtime.evaluate"] = _read_page_answer(self)
+
+    async def get_or_create_cdp_session(self):
+        return self.cdp_session
+
+    async def start(self):
+        self.lifecycle.append("start")
+
+    async def stop(self):
+        self.lifecycle.append("stop")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_read_page_navigates_settles_and_reads(fake_cdp_session):
+    session = FakePageSession(fake_cdp_session())
+
+    page = await page_reader.read_page(
+        session, "https://example.com", selector="h2", max_chars=15
+    )
+
+    assert [event.url for event in session.events] == ["https://example.com"]
+    assert "__mcpSettle" in session.cdp_session.expressions()[0]
+    assert page.url == "https://example.com"
+    assert page.text == "Main text Main "
+    assert page.text_truncated is True
+    assert page.matches == [{"text": "match"}]
+    assert page.links[0]["href"] == "https://example.com/2"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fetch_page_tool_cleans_up_and_reports_errors(monkeypatch, fake_cdp_session):
+    monkeypatch.setattr(browser_manager, "_PRELAUNCHED_SESSIONS", [])
+    sessions = []
+
+    def create():
+        sessions.append(FakePageSession(fake_cdp_session()))
+        return sessions[-1]
+
+    monkeypatch.setattr(server, "create_browser_session", create)
+    fetch_page = getattr(server.fetch_page, "fn", server.fetch_page)
+
+    page = await fetch_page("https://example.com", include_links=False)
+    assert page["title"] == "Fixture"
+    assert page["links"] == []
+    assert sessions[0].lifecycle == ["start", "stop"]
+
+    with pytest.raises(ValueError, match="navigation blocked"):
+        await fetch_page("blocked:https://example.org")
+    assert sessions[1].lifecycle == ["start", "stop"]
+
+
+class FakePage:
+    """A page whose settle evaluations are answered from a script of values and errors."""
+
+    def __init__(self, cdp_session, answers):
+        answers = [
+            answer if isinstance(answer, Exception) else {"result": {"value": answer}}
+            for answer in answers
+        ]
+        cdp_session.cdp_client.responses["Runtime.evaluate"] = answers
+        self.cdp_session = cdp_session
+
+    @property
+    def evaluations(self):
+        return self.cdp_session.cdp_client.methods().count("Runtime.evaluate")
+
+    @property
+    def scripts(self):
+        return [
+            (params["source"], session_id)
+            for method, params, session_id in self.cdp_session.sent
+            if method == "Page.addScriptToEvaluateOnNewDocument"
+        ]
+
+    async def get_or_create_cdp_session(self):
+        return self.cdp_session
+
+
+def _settle_count(outcome):
+    samples = PAGE_SETTLE_SECONDS.snapshot()["samples"]
+    return sum(sample["count"] for sample in samples if sample["labels"]["outcome"] == outcome)
+
+
+SETTLED = {"settled": True, "loaded": True, "inflight": 0, "mutations": 3}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_wait_for_settle_follows_navigations_and_gives_up_on_other_errors(
+    fake_cdp_session,
+):
+    page = FakePage(
+        fake_cdp_session(), [RuntimeError("Execution context was destroyed."), SETTLED]
+    )
+
+    result = await page_reader.wait_for_settle(page, quiet_ms=10, timeout_ms=1_000)
+
+    assert result.settled and result.mutations == 3
+    assert page.evaluations == 2
+
+    broken = FakePage(fake_cdp_session(), [RuntimeError("Target closed"), SETTLED])
+    result = await page_reader.wait_for_settle(broken, timeout_ms=1_000)
+    assert not result.settled
+    assert broken.evaluations == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_page_settler_installs_hooks_once_and_records_outcome(fake_cdp_session):
+    timeout = {"settled": False, "loaded": True, "inflight": 2, "mutations": 0}
+    page = FakePage(fake_cdp_session(), [SETTLED, timeout])
+    settler = page_reader.PageSettler(page, page_reader.SettleConfig(quiet_ms=10, timeout_ms=100))
+    before = _settle_count("timeout")
+
+    assert (await settler.settle()).settled
+    second = await settler.settle()
+
+    assert not second.settled and second.inflight == 2
+    assert len(page.scripts) == 1 and "__mcpSettle" in page.scripts[0][0]
+    assert _settle_count("timeout") == before + 1
+
+
+def test_settle_config_from_env(monkeypatch):
+    monkeypatch.delenv("BROWSER_USE_SETTLE", raising=False)
+    monkeypatch.setenv("BROWSER_USE_SETTLE_TIMEOUT_MS", "oops")
+
+    config = page_reader.SettleConfig.from_env()
+
+    assert not config.enabled
+    assert config.timeout_ms == 5_000.0
+    monkeypatch.setenv("BROWSER_USE_SETTLE", "true")
+    assert page_reader.SettleConfig.from_env().enabled
+
+
+# Runs the settle hooks and check in node against a minimal document whose
+# MutationObserver delivers records the way browsers do for the options given.
+_SETTLE_HARNESS = """
+const observers = [];
+globalThis.window = globalThis;
+globalThis.MutationObserver = class {
+  constructor(callback) { this.callback = callback; }
+  observe(target, options) { this.options = options; observers.push(this); }
+};
+globalThis.PerformanceObserver = class { observe() { throw new Error("unsupported"); } };
+globalThis.XMLHttpRequest = function () {};
+XMLHttpRequest.prototype.send = function () {};
+globalThis.document = { readyState: "complete", documentElement: { scrollHeight: 800 } };
+const mutate = (record) => {
+  for (const observer of observers) {
+    if (observer.options[record.type]) observer.callback([record]);
+  }
+};
+eval(HOOKS);
+const churn = setInterval(() => mutate(RECORD), 20);
+(eval(SETTLE))(100, 600).then((result) => {
+  clearInterval(churn);
+  console.log(JSON.stringify(result));
+});
+"""
+
+
+def _settle_in_node(record):
+    script = (
+        _SETTLE_HARNESS.replace("HOOKS", json.dumps(page_reader._SETTLE_HOOKS_JS))
+        .replace("SETTLE", json.dumps(f"({page_reader._SETTLE_JS})"))
+        .replace("RECORD", json.dumps(record))
+    )
+    completed = subprocess.run(
+        ["node", "-e", script], capture_output=True, text=True, timeout=30, check=True
+    )
+    return json.loads(completed.stdout)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_attribute_churn_does_not_keep_a_page_from_settling():
+    toggled_class = _settle_in_node({"type": "attributes", "attributeName": "class"})
+    assert toggled_class["settled"] and toggled_class["elapsed_ms"] < 600
+
+    assert _settle_in_node({"type": "characterData"})["settled"]
+    assert not _settle_in_node({"type": "childList"})["settled"]
@@ -0,0 +1,115 @@
+"""Tests for per-run profile clones."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mcp_browser_use.browser import browser_manager
+from mcp_browser_use.browser.profile_clone import ProfileCloner
+
+
+@pytest.fixture
+def template(tmp_path):
+    root = tmp_path / "template"
+    files = {
+        "Local State": "{}",
+        "SingletonLock": "",
+        "Default/Cookies": "sqlite",
+        "Default/Preferences": "{}",
+        "Default/Cache/Cache_Data/data_0": "cached",
+        "Default/Extensions/abc/1.0/manifest.json": "{}",
+    }
+    for relative, content in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root
+
+
+def test_clone_copies_profile_and_skips_caches_and_locks(template, tmp_path):
+    cloner = ProfileCloner(str(template), str(tmp_path / "clones"))
+    cloner._reflink_ok = False
+
+    clone = cloner.clone()
+
+    assert os.path.isfile(os.path.join(clone.path, "Default", "Cookies"))
+    assert not os.path.exists(os.path.join(clone.path, "SingletonLock"))
+    assert not os.path.exists(os.path.join(clone.path, "Default", "Cache"))
+
+    manifest = "Default/Extensions/abc/1.0/manifest.json"
+    assert os.path.samefile(template / manifest, os.path.join(clone.path, manifest))
+    assert not os.path.samefile(template / "Default/Cookies", os.path.join(clone.path, "Default/Cookies"))
+    assert clone.methods == {"hardlink": 1, "copy": 3}
+
+    with open(os.path.join(clone.path, "Default", "Cookies"), "w") as handle:
+        handle.write("changed")
+    assert (template / "Default/Cookies").read_text() == "sqlite"
+
+    cloner.remove(clone.path)
+    assert not os.path.exists(clone.path)
+    with pytest.raises(ValueError):
+        cloner.remove(str(template))
+
+
+def test_clones_of_exited_processes_are_collected(template, tmp_path):
+    root = tmp_path / "clones"
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    stale = root / f"run-{finished.pid}-deadbeef"
+    mine = root / f"run-{os.getpid()}-cafe"
+    for directory in (stale, mine):
+        directory.mkdir(parents=True)
+
+    assert ProfileCloner(str(template), str(root)).collect_garbage() == [stale.name]
+    assert mine.exists()
+
+
+def test_missing_template_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ProfileCloner(str(tmp_path / "nope"), str(tmp_path)).clone()
+
+
+def test_browser_sessions_get_and_drop_their_own_clone(template, tmp_path, monkeypatch):
+    for key in ("BROWSER_USE_CDP_URL", "CHROME_PERSISTENT_SESSION", "BROWSER_USE_DISK_CACHE_DIR"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("CHROME_PROFILE_TEMPLATE", str(template))
+    monkeypatch.setenv("CHROME_PROFILE_CLONE_DIR", str(tmp_path / "clones"))
+
+    first = browser_manager.create_browser_session()
+    second = browser_manager.create_browser_session()
+    # Nothing is copied until the sessions start.
+    assert not (tmp_path / "clones").exists() or os.listdir(tmp_path / "clones") == []
+
+    asyncio.run(browser_manager.start_browser_session(first))
+    asyncio.run(browser_manager.start_browser_session(second))
+    first_dir = first.browser_profile.user_data_dir
+    second_dir = second.browser_profile.user_data_dir
+
+    assert first_dir != second_dir
+    assert os.path.isfile(os.path.join(first_dir, "Local State"))
+
+    asyncio.run(browser_manager.close_browser_session(first))
+    assert not os.path.exists(first_dir)
+    assert os.path.exists(second_dir)
+    asyncio.run(browser_manager.close_browser_session(second))
+    assert os.listdir(tmp_path / "clones") == []
+
+
+def test_failed_start_removes_the_clone(template, tmp_path, monkeypatch):
+    for key in ("BROWSER_USE_CDP_URL", "CHROME_PERSISTENT_SESSION", "BROWSER_USE_DISK_CACHE_DIR"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("CHROME_PROFILE_TEMPLATE", str(template))
+    monkeypatch.setenv("CHROME_PROFILE_CLONE_DIR", str(tmp_path / "clones"))
+
+    async def fail(self):
+        raise RuntimeError("launch failed")
+
+    monkeypatch.setattr(browser_manager.BrowserSession, "start", fail)
+    with pytest.raises(RuntimeError, match="launch failed"):
+        asyncio.run(browser_manager.prelaunch_browser_session())
+    assert os.listdir(tmp_path / "clones") == []
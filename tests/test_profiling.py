@@ -0,0 +1,90 @@
+"""Tests for per-run profiling."""
+
+from __future__ import annotations
+
+import logging
+import pstats
+import time
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.utils import profiling
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.parametrize(
+    ("value", "mode"),
+    [
+        (None, None),
+        ("", None),
+        ("off", None),
+        ("1", "sample"),
+        ("TRUE", "sample"),
+        ("sample", "sample"),
+        ("cprofile", "cprofile"),
+        ("bogus", None),
+    ],
+)
+def test_resolve_profile_mode(value, mode):
+    assert profiling.resolve_profile_mode(value) == mode
+
+
+@pytest.mark.anyio("asyncio")
+async def test_sample_profile_writes_folded_stacks(tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger=profiling.__name__)
+
+    async with profiling.profile_run(
+        "sample", str(tmp_path), name="test", interval_ms=1
+    ) as report:
+        _busy(0.1)
+
+    assert report.path.endswith(".folded")
+    with open(report.path, encoding="utf-8") as handle:
+        lines = handle.read().splitlines()
+    assert lines
+    _stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("_busy" in line for line in lines)
+    assert "top functions" in caplog.text
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cprofile_writes_pstats(tmp_path):
+    async with profiling.profile_run("cprofile", str(tmp_path)) as report:
+        _busy(0.01)
+
+    assert report.path.endswith(".prof")
+    stats = pstats.Stats(report.path)
+    assert any(func[2] == "_busy" for func in stats.stats)
+    assert "_busy" in report.summary
+
+
+@pytest.mark.anyio("asyncio")
+async def test_concurrent_cprofile_is_skipped(tmp_path):
+    async with profiling.profile_run("cprofile", str(tmp_path)) as outer:
+        async with profiling.profile_run("cprofile", str(tmp_path)) as inner:
+            pass
+        assert inner.path is None
+    assert outer.path is not None
+
+
+def test_run_profiler_is_noop_when_off(monkeypatch, tmp_path):
+    monkeypatch.delenv("MCP_PROFILE", raising=False)
+    assert server._profiler_for_run(None).__class__.__name__ == "nullcontext"
+
+    monkeypatch.setenv("MCP_PROFILE", "cprofile")
+    assert server._profiler_for_run(False).__class__.__name__ == "nullcontext"
+
+    monkeypatch.setenv("MCP_PROFILE_DIR", str(tmp_path))
+    assert server._profiler_for_run(None).__class__.__name__ != "nullcontext"
@@ -0,0 +1,170 @@
+"""Tests for the per-step metrics recorded by ``CustomAgent``."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+
+from mcp_browser_use.agent.custom_agent import (
+    CustomAgent,
+    _count_images,
+    _extract_time_to_first_token_ms,
+    _extract_token_usage,
+)
+from mcp_browser_use.agent.custom_views import RunMetrics, StepMetrics
+from mcp_browser_use.browser.page_reader import SettleResult
+from browser_use.browser.views import BrowserState
+from browser_use.controller.service import Controller
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+BRAIN = {
+    "prev_action_evaluation": "Unknown",
+    "important_contents": "",
+    "completed_contents": "",
+    "thought": "",
+    "summary": "",
+}
+
+
+class UsageReportingLLM(BaseChatModel):
+    model_name = "scripted-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_structured_output(self, schema, include_raw=False):
+        llm = self
+
+        class Structured:
+            async def ainvoke(self, messages):
+                llm.calls += 1
+                payload = {"current_state": BRAIN, "action": [{"done": {"text": "ok"}}]}
+                raw = AIMessage(content=json.dumps(payload))
+                raw.usage_metadata = {"input_tokens": 120, "output_tokens": 30}
+                return {"parsed": schema.model_validate(payload), "raw": raw}
+
+        return Structured()
+
+
+class ElementTree:
+    def clickable_elements_to_string(self, include_attributes=None):
+        return "1[:]<button>Go</button>"
+
+
+class StaticBrowser:
+    async def get_state(self, use_vision=True):
+        return BrowserState(
+            url="https://example.com", screenshot="aGVsbG8=", element_tree=ElementTree()
+        )
+
+
+@pytest.mark.anyio("asyncio")
+async def test_execute_agent_task_records_step_metrics():
+    agent = CustomAgent(
+        task="Finish immediately",
+        llm=UsageReportingLLM(),
+        browser_session=StaticBrowser(),
+        controller=Controller(),
+    )
+
+    history = await agent.execute_agent_task(max_steps=3)
+
+    assert history.run_metrics is agent.run_metrics
+    assert agent.run_metrics.model == "scripted-model"
+    assert agent.run_metrics.total_ms is not None
+    [step] = agent.run_metrics.steps
+    assert step.state_capture_ms is not None
+    assert step.llm_latency_ms is not None
+    assert step.action_execution_ms is not None
+    assert (step.input_tokens, step.output_tokens) == (120, 30)
+    assert step.image_count == 1
+    assert step.action_count == 1
+    assert step.estimated_input_tokens > 0
+    assert step.error is None
+    assert step.settle_ms is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_page_settle_is_recorded_per_step():
+    class Settler:
+        def __init__(self):
+            self.calls = 0
+
+        async def settle(self):
+            self.calls += 1
+            return SettleResult(settled=False, elapsed_ms=42.0, inflight=1)
+
+    agent = CustomAgent(
+        task="Finish immediately",
+        llm=UsageReportingLLM(),
+        browser_session=StaticBrowser(),
+        controller=Controller(),
+    )
+    agent.page_settler = Settler()
+
+    await agent.execute_agent_task(max_steps=3)
+
+    [step] = agent.run_metrics.steps
+    assert agent.page_settler.calls == 1
+    assert (step.settle_ms, step.settled) == (42.0, False)
+
+
+def test_run_metrics_totals_skip_unknown_values():
+    metrics = RunMetrics(
+        steps=[
+            StepMetrics(step_number=1, llm_latency_ms=10.0, input_tokens=100),
+            StepMetrics(step_number=2, llm_latency_ms=5.0, input_tokens=None),
+        ]
+    )
+
+    data = metrics.to_dict()
+
+    assert data["totals"]["llm_latency_ms"] == 15.0
+    assert data["totals"]["input_tokens"] == 100
+    assert data["totals"]["output_tokens"] is None
+    assert len(data["steps"]) == 2
+
+
+def test_token_usage_extraction_supports_provider_shapes():
+    message = AIMessage(content="")
+    message.usage_metadata = {"input_tokens": 5, "output_tokens": 7}
+    assert _extract_token_usage(message) == (5, 7)
+
+    class Usage:
+        prompt_tokens = 11
+        completion_tokens = 3
+
+    class OpenAIResponse:
+        usage = Usage()
+
+    assert _extract_token_usage(OpenAIResponse()) == (11, 3)
+
+    legacy = AIMessage(content="")
+    legacy.response_metadata = {"token_usage": {"prompt_tokens": 2, "completion_tokens": 1}}
+    assert _extract_token_usage(legacy) == (2, 1)
+    assert _extract_token_usage(None) == (None, None)
+
+
+def test_time_to_first_token_from_ollama_durations():
+    message = AIMessage(content="")
+    message.response_metadata = {"load_duration": 2_000_000, "prompt_eval_duration": 3_000_000}
+
+    assert _extract_time_to_first_token_ms(message) == 5.0
+    assert _extract_time_to_first_token_ms(AIMessage(content="")) is None
+
+
+def test_count_images_in_multipart_messages():
+    messages = [
+        AIMessage(content="text only"),
+        AIMessage(content=[{"type": "text", "text": "a"}, {"type": "image_url", "image_url": {}}]),
+    ]
+
+    assert _count_images(messages) == 1
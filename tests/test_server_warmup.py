@@ -0,0 +1,131 @@
+"""Tests for the server warm-up and concurrent run initialisation."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.agent.custom_views import RunMetrics
+from mcp_browser_use.browser import browser_manager
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class DummySession:
+    def __init__(self):
+        self.events: list[str] = []
+
+    async def start(self):
+        self.events.append("start")
+        await asyncio.sleep(0)
+
+    async def stop(self):
+        self.events.append("stop")
+
+
+class DummyHistory:
+    def final_result(self):
+        return "finished"
+
+    def is_done(self):
+        return True
+
+
+class DummyAgent:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.run_metrics = RunMetrics()
+
+    async def execute_agent_task(self, max_steps):
+        return DummyHistory()
+
+
+@pytest.fixture(autouse=True)
+def reset_server_state(monkeypatch):
+    monkeypatch.setattr(server, "_LLM_CACHE", {})
+    monkeypatch.setattr(browser_manager, "_PRELAUNCHED_SESSIONS", [])
+    monkeypatch.setattr(server, "CustomAgent", DummyAgent)
+    monkeypatch.setattr(server, "build_action_models", lambda controller: None)
+    monkeypatch.setattr(
+        server.utils, "get_llm_model", lambda **kwargs: object()
+    )
+
+
+def _tool_fn(tool):
+    return getattr(tool, "fn", tool)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_run_browser_agent_starts_browser_and_cleans_up(monkeypatch):
+    session = DummySession()
+    monkeypatch.setattr(server, "create_browser_session", lambda: session)
+
+    result = await _tool_fn(server.run_browser_agent)("task")
+
+    assert result == "finished"
+    assert session.events == ["start", "stop"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_run_browser_agent_reuses_prelaunched_session(monkeypatch):
+    session = DummySession()
+    monkeypatch.setattr(browser_manager, "create_browser_session", lambda: session)
+
+    def fail_create():
+        raise AssertionError("a new browser should not be created")
+
+    monkeypatch.setattr(server, "create_browser_session", fail_create)
+
+    await server.warm_up()
+    assert session.events == ["start"]
+
+    await _tool_fn(server.run_browser_agent)("task")
+
+    # The pre-launched browser is not started twice and is consumed by the run.
+    assert session.events == ["start", "stop"]
+    assert browser_manager.take_prelaunched_browser_session() is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_warm_up_caches_llm_and_tolerates_browser_failure(monkeypatch):
+    class FailingSession(DummySession):
+        async def start(self):
+            raise RuntimeError("no chromium")
+
+    monkeypatch.setattr(
+        browser_manager, "create_browser_session", lambda: FailingSession()
+    )
+
+    await server.warm_up()
+
+    settings = server.AgentRunSettings.from_env()
+    assert len(server._LLM_CACHE) == 1
+    assert server._get_llm(settings) is next(iter(server._LLM_CACHE.values()))
+    assert browser_manager.take_prelaunched_browser_session() is None
+
+
+def test_llm_cache_follows_api_key_changes(monkeypatch):
+    settings = server.AgentRunSettings(model_provider="openai", model_name="gpt-4o")
+    monkeypatch.setenv("OPENAI_API_KEY", "first")
+    first = server._get_llm(settings)
+    assert server._get_llm(settings) is first
+
+    monkeypatch.setenv("OPENAI_API_KEY", "second")
+    assert server._get_llm(settings) is not first
+
+
+@pytest.mark.anyio("asyncio")
+async def test_run_browser_agent_returns_metrics_when_requested(monkeypatch):
+    monkeypatch.setattr(server, "create_browser_session", DummySession)
+
+    response = await _tool_fn(server.run_browser_agent)("task", include_metrics=True)
+
+    assert response["result"] == "finished"
+    assert response["metrics"]["provider"] == server.AgentRunSettings().model_provider
+    assert response["metrics"]["setup_ms"] >= 0
+    assert response["metrics"]["totals"]["steps"] == 0
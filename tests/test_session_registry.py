@@ -0,0 +1,173 @@
+"""Tests for named browser sessions kept across tool calls."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.agent.custom_views import RunMetrics
+from mcp_browser_use.browser import session_registry
+from mcp_browser_use.browser.session_registry import SessionRegistry
+from mcp_browser_use.utils.metrics import OPEN_SESSIONS
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeSession:
+    def __init__(self):
+        self.events: list[str] = []
+
+    async def start(self):
+        self.events.append("start")
+
+    async def stop(self):
+        self.events.append("stop")
+
+    async def kill(self):
+        self.events.append("kill")
+
+
+@pytest.fixture
+def sessions():
+    return []
+
+
+@pytest.fixture
+def registry(sessions):
+    def factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    return SessionRegistry(max_handles=2, idle_timeout=60, session_factory=factory)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_open_is_idempotent_and_concurrent_safe(registry, sessions):
+    first, second = await asyncio.gather(registry.open("a"), registry.open("a"))
+
+    assert first is second
+    assert len(sessions) == 1
+    assert sessions[0].events == ["start"]
+    assert OPEN_SESSIONS.value() == 1
+    await registry.close_all()
+    assert sessions[0].events == ["start", "kill"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cap_evicts_least_recently_used_idle_handle(registry, sessions):
+    await registry.open("a")
+    await registry.open("b")
+    async with registry.use("a"):
+        pass
+
+    await registry.open("c")
+
+    assert {item["name"] for item in registry.list()} == {"a", "c"}
+    assert sessions[1].events == ["start", "kill"]
+    await registry.close_all()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cap_refuses_when_every_handle_is_busy(registry):
+    await registry.open("a")
+    await registry.open("b")
+
+    async with registry.use("a"), registry.use("b"):
+        with pytest.raises(ValueError, match="in use"):
+            await registry.open("c")
+    await registry.close_all()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_idle_handles_are_evicted(registry, sessions):
+    registry.idle_timeout = 0.0
+    await registry.open("a")
+    await asyncio.sleep(0.01)
+
+    assert await registry.evict_idle() == ["a"]
+    assert "a" not in registry
+    assert sessions[0].events == ["start", "kill"]
+
+    with pytest.raises(KeyError):
+        async with registry.use("a"):
+            pass
+
+
+class DummyHistory:
+    def final_result(self):
+        return "finished"
+
+    def is_done(self):
+        return True
+
+
+@pytest.mark.anyio("asyncio")
+async def test_run_browser_agent_reuses_named_session(monkeypatch, registry, sessions):
+    seen = []
+
+    class DummyAgent:
+        def __init__(self, **kwargs):
+            seen.append(kwargs["browser_session"])
+            self.run_metrics = RunMetrics()
+
+        async def execute_agent_task(self, max_steps):
+            return DummyHistory()
+
+    monkeypatch.setattr(session_registry, "_REGISTRY", registry)
+    monkeypatch.setattr(server, "CustomAgent", DummyAgent)
+    monkeypatch.setattr(server, "_prepare_agent_components", lambda settings: (None, None))
+
+    def fail_create():
+        raise AssertionError("a named session must not launch a new browser")
+
+    monkeypatch.setattr(server, "create_browser_session", fail_create)
+    tool = lambda t: getattr(t, "fn", t)  # noqa: E731
+
+    opened = await tool(server.open_session)("work")
+    assert opened["session"]["name"] == "work"
+
+    assert await tool(server.run_browser_agent)("log in", session="work") == "finished"
+    assert await tool(server.run_browser_agent)("do x", session="work") == "finished"
+
+    assert seen == [sessions[0], sessions[0]]
+    assert sessions[0].events == ["start"]
+    assert (await tool(server.list_sessions)())[0]["uses"] == 2
+
+    assert (await tool(server.close_session)("work"))["closed"] is True
+    assert sessions[0].events == ["start", "kill"]
+
+    with pytest.raises(ValueError, match="No open browser session"):
+        await tool(server.run_browser_agent)("do y", session="work")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_close_waits_for_the_running_call(registry, sessions):
+    await registry.open("a")
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def call():
+        async with registry.use("a") as session:
+            entered.set()
+            await release.wait()
+            session.events.append("call done")
+
+    running = asyncio.create_task(call())
+    await entered.wait()
+    closing = asyncio.create_task(registry.close("a"))
+    await asyncio.sleep(0.01)
+
+    assert "a" not in registry
+    assert sessions[0].events == ["start"]
+    release.set()
+    assert await closing is True
+    await running
+    assert sessions[0].events == ["start", "call done", "kill"]
+    with pytest.raises(KeyError):
+        async with registry.use("a"):
+            pass
@@ -0,0 +1,137 @@
+"""Tests for storage-state export and injection."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from mcp_browser_use import server
+from mcp_browser_use.browser import browser_manager, session_registry, storage_state
+from mcp_browser_use.browser.session_registry import SessionRegistry
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeBrowserSession:
+    def __init__(self, cdp_session):
+        self.cdp_session = cdp_session
+        self.calls = cdp_session.sent
+        self.events = []
+
+    async def get_or_create_cdp_session(self):
+        return self.cdp_session
+
+    async def start(self):
+        self.events.append("start")
+
+    async def stop(self):
+        self.events.append("stop")
+
+
+@pytest.fixture
+def make_browser(fake_cdp_session):
+    return lambda responses=None: FakeBrowserSession(fake_cdp_session(responses))
+
+
+LOGGED_IN = {
+    "Storage.getCookies": {
+        "cookies": [
+            {"name": "sid", "value": "abc", "domain": ".example.com", "path": "/",
+             "expires": -1, "session": True, "size": 6, "httpOnly": True},
+            {"name": "pref", "value": "1", "domain": "example.com", "path": "/",
+             "expires": 1900000000, "session": False, "size": 5},
+        ]
+    },
+    "Runtime.evaluate": {
+        "result": {"value": {"origin": "https://example.com", "items": [["token", "t0k"]]}}
+    },
+}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_export_write_load_and_apply_round_trip(tmp_path, make_browser):
+    state = await storage_state.export_storage_state(make_browser(LOGGED_IN))
+
+    assert state["cookies"][0] == {
+        "name": "sid", "value": "abc", "domain": ".example.com", "path": "/", "httpOnly": True
+    }
+    assert state["cookies"][1]["expires"] == 1900000000
+    assert state["origins"] == [
+        {"origin": "https://example.com", "localStorage": [{"name": "token", "value": "t0k"}]}
+    ]
+
+    path = storage_state.write_storage_state(state, str(tmp_path / "auth" / "state.json"))
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert storage_state.load_storage_state(path) is storage_state.load_storage_state(path)
+
+    fresh = make_browser()
+    await storage_state.apply_storage_state(fresh, storage_state.load_storage_state(path))
+
+    names = [name for name, _params, _session in fresh.calls]
+    assert names == ["Storage.setCookies", "Page.addScriptToEvaluateOnNewDocument"]
+    assert fresh.calls[0][1]["cookies"] == state["cookies"]
+    script = fresh.calls[1][1]["source"]
+    assert json.dumps({"https://example.com": [["token", "t0k"]]}) in script
+
+
+@pytest.mark.anyio("asyncio")
+async def test_started_sessions_load_the_configured_state(tmp_path, monkeypatch, make_browser):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"cookies": [{"name": "a", "value": "b", "domain": "x.test"}]}))
+    monkeypatch.delenv("MCP_SESSION_STATE_DIR", raising=False)
+    monkeypatch.setenv("BROWSER_USE_STORAGE_STATE", str(path))
+
+    session = await browser_manager.start_browser_session(make_browser())
+    assert [name for name, _p, _s in session.calls] == ["Storage.setCookies"]
+
+    path.write_text("not json")
+    broken = await browser_manager.start_browser_session(make_browser())
+    assert broken.events == ["start"] and broken.calls == []
+
+
+def test_state_files_stay_in_the_state_directory(tmp_path, monkeypatch):
+    state_dir = tmp_path / "states"
+    state_dir.mkdir()
+    monkeypatch.setenv("MCP_SESSION_STATE_DIR", str(state_dir))
+
+    assert storage_state.resolve_state_file("work") == str(state_dir / "work.json")
+    assert storage_state.resolve_state_file("work.json") == str(state_dir / "work.json")
+    for name in ("../escape", "/etc/passwd", ".hidden", "a/b", ""):
+        with pytest.raises(ValueError, match="Invalid state name"):
+            storage_state.resolve_state_file(name)
+    os.symlink(tmp_path / "outside.json", state_dir / "link.json")
+    with pytest.raises(ValueError, match="outside"):
+        storage_state.resolve_state_file("link")
+
+    monkeypatch.setenv("BROWSER_USE_STORAGE_STATE", "work")
+    assert storage_state.storage_state_path() == str(state_dir / "work.json")
+    monkeypatch.setenv("BROWSER_USE_STORAGE_STATE", str(tmp_path / "outside.json"))
+    assert storage_state.storage_state_path() is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_save_session_state_tool(tmp_path, monkeypatch, make_browser):
+    monkeypatch.delenv("BROWSER_USE_STORAGE_STATE", raising=False)
+    monkeypatch.setenv("MCP_SESSION_STATE_DIR", str(tmp_path))
+    registry = SessionRegistry(session_factory=lambda: make_browser(LOGGED_IN))
+    monkeypatch.setattr(session_registry, "_REGISTRY", registry)
+    save = getattr(server.save_session_state, "fn", server.save_session_state)
+
+    with pytest.raises(ValueError, match="BROWSER_USE_STORAGE_STATE"):
+        await save("work")
+
+    await registry.open("work")
+    result = await save("work", "state")
+
+    assert result == {"path": str(tmp_path / "state.json"), "cookies": 2, "origins": 1}
+    with pytest.raises(ValueError, match="Invalid state name"):
+        await save("work", str(tmp_path.parent / "other.json"))
+    assert not (tmp_path.parent / "other.json").exists()
+    with pytest.raises(ValueError, match="No open browser session"):
+        await save("missing", "other")
+    await registry.close_all()
@@ -0,0 +1,156 @@
+"""Tests for trace spans and the local file exporters."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from mcp_browser_use.controller.custom_controller import CustomController
+from mcp_browser_use.utils import tracing
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    tracer = tracing.Tracer(sample_rate=1.0, directory=str(tmp_path), fmt="jsonl")
+    tracing.configure_tracer(tracer)
+    yield tracer
+    tracing.configure_tracer(None)
+
+
+def _read_spans(directory):
+    with open(directory / "spans.jsonl", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_nested_spans_share_trace_and_link_parents(tracer, tmp_path):
+    with tracing.span("run", task="t") as root:
+        with tracing.span("step") as step:
+            step.set_attribute("step", 1)
+            with tracing.span("llm"):
+                pass
+
+    spans = {item["name"]: item for item in _read_spans(tmp_path)}
+    assert set(spans) == {"run", "step", "llm"}
+    assert {item["trace_id"] for item in spans.values()} == {root.trace_id}
+    assert spans["run"]["parent_id"] is None
+    assert spans["step"]["parent_id"] == spans["run"]["span_id"]
+    assert spans["llm"]["parent_id"] == spans["step"]["span_id"]
+    assert spans["step"]["attributes"] == {"step": 1}
+    assert spans["run"]["duration_ms"] >= spans["llm"]["duration_ms"]
+
+
+def test_span_records_error(tracer, tmp_path):
+    with pytest.raises(RuntimeError):
+        with tracing.span("run"):
+            raise RuntimeError("boom")
+
+    (span,) = _read_spans(tmp_path)
+    assert span["error"] == "RuntimeError: boom"
+
+
+def test_concurrent_exports_write_whole_lines(tracer, tmp_path):
+    def record(index):
+        with tracing.span("run", index=index, padding="x" * 4096):
+            for _ in range(5):
+                with tracing.span("step", padding="y" * 4096):
+                    pass
+
+    threads = [threading.Thread(target=record, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    spans = _read_spans(tmp_path)
+    assert len(spans) == 8 * 6
+    assert {span["attributes"]["index"] for span in spans if span["name"] == "run"} == set(range(8))
+
+
+def test_unsampled_trace_suppresses_children(tmp_path):
+    tracing.configure_tracer(tracing.Tracer(sample_rate=0.0, directory=str(tmp_path)))
+    try:
+        with tracing.span("run"):
+            child = tracing.span("step")
+            assert tracing.current_span() is child
+            with child:
+                child.set_attribute("ignored", True)
+        # Outside any trace the next root is sampled independently again.
+        assert tracing.current_span().set_attribute("x", 1) is None
+    finally:
+        tracing.configure_tracer(None)
+
+    assert not (tmp_path / "spans.jsonl").exists()
+
+
+def test_chrome_trace_format(tmp_path):
+    tracing.configure_tracer(
+        tracing.Tracer(sample_rate=1.0, directory=str(tmp_path), fmt="chrome")
+    )
+    try:
+        with tracing.span("run") as root:
+            with tracing.span("agent.step"):
+                pass
+    finally:
+        tracing.configure_tracer(None)
+
+    data = json.loads((tmp_path / f"trace-{root.trace_id}.json").read_text())
+    events = data["traceEvents"]
+    assert [event["name"] for event in events] == ["run", "agent.step"]
+    assert all(event["ph"] == "X" for event in events)
+    assert events[1]["cat"] == "agent"
+    assert events[1]["args"]["parent_id"] == root.span_id
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("MCP_TRACE_SAMPLE_RATE", "0.25")
+    monkeypatch.setenv("MCP_TRACE_FORMAT", "CHROME")
+    monkeypatch.setenv("MCP_TRACE_DIR", "/tmp/traces")
+
+    tracer = tracing.Tracer.from_env()
+
+    assert (tracer.sample_rate, tracer.format, tracer.directory) == (
+        0.25,
+        "chrome",
+        "/tmp/traces",
+    )
+
+    monkeypatch.setenv("MCP_TRACE_SAMPLE_RATE", "lots")
+    monkeypatch.setenv("MCP_TRACE_FORMAT", "xml")
+    tracer = tracing.Tracer.from_env()
+    assert (tracer.sample_rate, tracer.format) == (0.0, "jsonl")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_spans_follow_tasks_and_controller_actions(tracer, tmp_path):
+    controller = CustomController()
+    action_model = controller.registry.create_action_model()
+
+    @tracing.traced("agent.step")
+    async def step():
+        return await controller.multi_act(
+            [action_model(done={"text": "ok"})], None
+        )
+
+    with tracing.span("run"):
+        await asyncio.gather(step(), step())
+
+    # The exporter writes from the default executor while a loop is running.
+    for _ in range(50):
+        if (tmp_path / "spans.jsonl").exists():
+            break
+        await asyncio.sleep(0.01)
+
+    spans = _read_spans(tmp_path)
+    by_id = {item["span_id"]: item for item in spans}
+    acts = [item for item in spans if item["name"] == "controller.act"]
+    assert len(acts) == 2
+    assert all(item["attributes"] == {"action": "done"} for item in acts)
+    assert all(by_id[item["parent_id"]]["name"] == "agent.step" for item in acts)
@@ -0,0 +1,171 @@
+"""Tests for the multi-process worker mode."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import types
+
+import pytest
+from fastmcp import Client
+
+from mcp_browser_use.workers import WorkerPool, build_front_app, merge_prometheus
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeWorkerClient:
+    def __init__(self, index, gate=None):
+        self.index = index
+        self.gate = gate
+        self.calls = []
+
+    async def call_tool(self, tool, arguments, progress_handler=None):
+        self.calls.append((tool, arguments))
+        if self.gate is not None:
+            await self.gate.wait()
+        return types.SimpleNamespace(data={"worker": self.index}, content=[])
+
+
+def _fake_pool(count=2):
+    pool = WorkerPool(count)
+    for worker in pool.workers:
+        worker.client = FakeWorkerClient(worker.index)
+        worker.ready.set()
+    return pool
+
+
+@pytest.mark.anyio("asyncio")
+async def test_calls_go_to_the_least_busy_worker():
+    pool = _fake_pool()
+    gate = asyncio.Event()
+    pool.workers[0].client.gate = gate
+
+    slow = asyncio.create_task(pool.call("fetch_page", {"url": "https://a.example"}))
+    await asyncio.sleep(0)
+
+    assert await pool.call("fetch_page", {"url": "https://b.example"}) == {"worker": 1}
+    gate.set()
+    assert await slow == {"worker": 0}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_named_sessions_stick_to_the_worker_that_opened_them():
+    pool = _fake_pool()
+    pool.workers[0].in_flight = 5
+
+    assert await pool.call("open_session", {"name": "shop"}) == {"worker": 1}
+    pool.workers[0].in_flight = 0
+    pool.workers[1].in_flight = 5
+
+    assert await pool.call("run_browser_agent", {"task": "buy", "session": "shop"}) == {"worker": 1}
+    assert await pool.call("save_session_state", {"name": "shop"}) == {"worker": 1}
+    assert await pool.call("close_session", {"name": "shop"}) == {"worker": 1}
+    # Closed sessions are routed like any other call again.
+    assert await pool.call("run_browser_agent", {"task": "x", "session": "shop"}) == {"worker": 0}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_concurrent_opens_of_one_name_go_to_one_worker():
+    pool = _fake_pool()
+    gate = asyncio.Event()
+    for worker in pool.workers:
+        worker.client.gate = gate
+
+    first = asyncio.create_task(pool.call("open_session", {"name": "shop"}))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(pool.call("open_session", {"name": "shop"}))
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await first == await second == {"worker": 0}
+    assert pool._sticky == {"shop": 0}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_failed_open_releases_the_name():
+    pool = _fake_pool()
+
+    async def fail(tool, arguments, progress_handler=None):
+        raise RuntimeError("launch failed")
+
+    pool.workers[0].client.call_tool = fail
+    with pytest.raises(RuntimeError):
+        await pool.call("open_session", {"name": "shop"})
+    assert pool._sticky == {}
+
+
+def test_merge_prometheus_labels_samples_by_worker():
+    text = (
+        "# HELP runs_total Runs.\n"
+        "# TYPE runs_total counter\n"
+        'runs_total{outcome="ok"} 2\n'
+        "# HELP active Active.\n"
+        "# TYPE active gauge\n"
+        "active 1\n"
+    )
+
+    merged = merge_prometheus([text, text]).splitlines()
+
+    assert merged == [
+        "# HELP runs_total Runs.",
+        "# TYPE runs_total counter",
+        'runs_total{worker="0",outcome="ok"} 2',
+        'runs_total{worker="1",outcome="ok"} 2',
+        "# HELP active Active.",
+        "# TYPE active gauge",
+        'active{worker="0"} 1',
+        'active{worker="1"} 1',
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_front_serves_sessions_from_worker_processes(tmp_path):
+    # Workers import the stubs and provider shims the same way the tests do.
+    (tmp_path / "sitecustomize.py").write_text(
+        f"import sys\nsys.path.insert(0, {TESTS_DIR!r})\nimport conftest\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(tmp_path))
+    env.pop("MCP_METRICS_PORT", None)
+    pool = WorkerPool(2, env=env)
+    await pool.start()
+    try:
+        front = await build_front_app(pool)
+        logged = []
+
+        async def log_handler(message):
+            logged.append(message)
+
+        async with Client(front, log_handler=log_handler) as client:
+            # Pages a worker streams as log messages reach the front's client.
+            crawl = await client.call_tool(
+                "crawl_urls", {"seeds": ["https://example.com/"], "max_depth": 0}
+            )
+            assert [entry.logger for entry in logged] == ["crawl_urls"]
+            assert json.loads(logged[0].data["msg"]) == crawl.data["pages"][0]
+
+            await client.call_tool("open_session", {"name": "a"})
+            await client.call_tool("open_session", {"name": "b"})
+            sessions = (await client.call_tool("list_sessions", {})).data
+            assert {(entry["name"], entry["worker"]) for entry in sessions} == {
+                ("a", pool._sticky["a"]),
+                ("b", pool._sticky["b"]),
+            }
+
+            owner = pool.workers[pool._sticky["a"]]
+            owner.process.kill()
+            await owner.process.wait()
+            await asyncio.sleep(0.1)
+            assert "a" not in pool._sticky
+
+            await asyncio.wait_for(owner.ready.wait(), 60)
+            names = [entry["name"] for entry in (await client.call_tool("list_sessions", {})).data]
+            assert names == ["b"]
+    finally:
+        await pool.stop()